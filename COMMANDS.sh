@@ -12,6 +12,9 @@ export XAI_API_KEY="your-xai-key-here"   # Get from console.x.ai
 # python app.py
 # Open http://localhost:5000
 
+# Production mode (async, hundreds of concurrent chats, 503 + Retry-After when full):
+# python asgi_app.py --port 5000
+
 # ── OPTION B: COMMAND LINE ─────────────────────────────
 # ── STEP 1: SETUP ──────────────────────────────────────
 pip install -r requirements.txt
@@ -24,18 +27,45 @@ export XAI_API_KEY="your-xai-key-here"   # Get from console.x.ai
 
 # ── STEP 3: RUN INDIVIDUAL AGENTS ──────────────────────
 
+# Every agent below is also a `career-agents` subcommand (same arguments, faster startup):
+./career-agents --help
+./career-agents gap --resume my_resume.txt --jds jd1.txt jd2.txt jd3.txt
+./career-agents tailor --resume my_resume.txt --jd jd_target.txt --output tailored_resume.txt
+./career-agents pipeline --resume my_resume.txt --jd jd_target.txt --profile linkedin_profile.txt
+./career-agents serve --asgi --port 5000
+
+# Check CLI startup time against its budget (fails if --help pulls in openai/httpx/numpy)
+python benchmark.py --only startup
+
 # Agent 1: Gap Analysis (compare resume vs multiple JDs)
 python agent_1_gap_analyst.py --resume my_resume.txt --jds jd1.txt jd2.txt jd3.txt
 
+# Agent 1: Rank a folder of saved JDs by fit to your resume (local, no API calls)
+python agent_1_gap_analyst.py --resume my_resume.txt --jd_folder ./jds/ --rank --top_k 10
+
+# Search saved JDs / profiles (local BM25 index, refreshed incrementally) and feed the hits to the agents
+python search_index.py --jd_folder ./jds/ --profiles_folder ./profiles/ --update
+python agent_1_gap_analyst.py --resume my_resume.txt --jds $(python search_index.py --jd_folder ./jds/ --query 'playwright fintech' --paths)
+python search_index.py --profiles_folder ./profiles/ --query '"engineering manager" payments' --link_dir ./matched_profiles/
+
 # Agent 1: Also generate a 3-day learning crash course for a skill gap
 python agent_1_gap_analyst.py --resume my_resume.txt --jds jd1.txt --learn "OpenTelemetry"
 
 # Agent 2: Tailor resume to a specific JD
 python agent_2_resume_tailor.py --resume my_resume.txt --jd jd_target.txt --output tailored_resume.txt
 
+# Agent 2: Batch mode — tailor to every JD in a folder, 4 at a time, into ./tailored/<jd>.txt
+python agent_2_resume_tailor.py --resume my_resume.txt --jd_folder ./jds/ --concurrency 4
+
+# Agent 2: Preview which resume bullets would be sent for rewriting (local, no API calls)
+python resume_model.py --resume my_resume.txt --jd jd_target.txt
+
 # Agent 3: Generate LinkedIn outreach for a specific person
 python agent_3_outreach.py --profile linkedin_profile.txt --your_skills "Selenium, CI/CD, Azure DevOps, Test Management"
 
+# Agent 3: Batch mode — a folder of profiles, 8 drafted in parallel
+python agent_3_outreach.py --profiles_folder ./profiles/ --your_skills "Selenium, CI/CD" --concurrency 8
+
 # Agent 3: Interactive mode (paste profile manually)
 python agent_3_outreach.py --interactive
 
@@ -54,6 +84,18 @@ python agent_4_interview.py --mode code_review --code old_selenium_test.py
 # ── STEP 4: RUN THE FULL PIPELINE ──────────────────────
 python run_all.py --resume my_resume.txt --jd jd_target.txt --profile linkedin_profile.txt
 
+# Full pipeline for the 3 best-fit JDs in a folder (ranked locally first)
+python run_all.py --resume my_resume.txt --jd_folder ./jds/ --top_k 3 --output_dir out/
+
+# ── OFFLINE BENCHMARKS (no API key needed) ─────────────
+# Runs the pipeline, batch outreach and /api/chat against a local mock server
+python benchmark.py --output baseline.json
+python benchmark.py --baseline baseline.json --fail_on_regression
+
+# Or run the mock server yourself and point any agent at it
+python mock_server.py --port 8099 --latency lognormal:0.8,0.5 --error_rate 0.02
+XAI_BASE_URL=http://127.0.0.1:8099/v1 XAI_API_KEY=mock python run_all.py --resume my_resume.txt --jd jd_target.txt
+
 # ── INTERVIEW PERSONAS AVAILABLE ───────────────────────
 # principal_engineer   → Deep technical, edge cases, architecture
 # engineering_manager  → People, process, STAR format
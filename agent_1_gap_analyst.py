@@ -10,17 +10,53 @@ Compares your resume against multiple JDs and outputs:
 Usage:
     python agent_1_gap_analyst.py --resume my_resume.txt --jds jd1.txt jd2.txt jd3.txt
     python agent_1_gap_analyst.py --resume my_resume.txt --jd_folder ./jds/
+    python agent_1_gap_analyst.py --resume my_resume.txt --jd_folder ./jds/ --rank --top_k 10
+
+Large JD sets (more than 8, or with --map_reduce) are analyzed per JD in
+parallel; keyword frequencies are then counted locally and one small final
+call writes the priorities and market insight.
+
+With --jd_folder, per-JD results are kept in <folder>.gap_manifest.json next
+to the folder, so reruns only analyze new or changed JDs (deleted files are
+pruned). Use --no_manifest to re-analyze everything.
+
+JDs are stripped of boilerplate (EEO, benefits, "About us", ...) before
+analysis; see jd_cleaner.py. Near-duplicate reposts are merged into one JD
+that counts once per posting (jd_dedup.py); --no_dedupe turns this off.
+
+--rank ranks the JDs against the resume locally (TF-IDF, no LLM calls; see
+jd_ranker.py) and prints the best fits with their keyword overlap. --top_k N
+without --rank analyzes only the N best-fit JDs.
 """
 
-from openai import OpenAI
+from __future__ import annotations
+
 import argparse
-import os
+import hashlib
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING
+from llm_cache import cached_completion
+from xai_client import get_client, load_env
+from jd_cleaner import clean_jds, load_jd_text
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+RECRUITER_SYSTEM_PROMPT = """You are a deeply technical QA recruiter with 15+ years of experience 
+hiring in India's top product companies and GCCs (Global Capability Centres) in Gurugram, 
+Bangalore, and remote. You have reviewed thousands of QA Manager, Test Lead, and SDET resumes.
 
-# Load environment variables from .env file if it exists
-load_dotenv()
+You understand Indian tech hiring deeply — including what Naukri ATS, LinkedIn, and 
+enterprise HR tools scan for. You know the Gurugram corridor companies: Publicis Sapient, 
+EXL, Genpact, MakeMyTrip, Info Edge, PolicyBazaar, etc.
+
+Always be brutally honest and specific. No vague advice. Give concrete, actionable gaps."""
+
+# JD sets larger than this go through map-reduce instead of one giant prompt
+MAP_REDUCE_THRESHOLD = 8
 
 
 def load_text(filepath: str) -> str:
@@ -28,33 +64,33 @@ def load_text(filepath: str) -> str:
         return f.read().strip()
 
 
-def load_jds_from_folder(folder: str) -> dict:
-    jd_files = Path(folder).glob("*.txt")
-    return {f.stem: load_text(str(f)) for f in jd_files}
+def load_jds_from_folder(folder: str, verbose: bool = True) -> dict:
+    jd_files = sorted(Path(folder).glob("*.txt"))
+    return clean_jds({f.stem: load_text(str(f)) for f in jd_files}, verbose=verbose)
 
 
-def run_gap_analysis(resume: str, jds: dict) -> dict:
-    client = OpenAI(
-        api_key=os.environ.get("XAI_API_KEY"),
-        base_url="https://api.x.ai/v1"
-    )
+def run_gap_analysis(resume: str, jds: dict, client: OpenAI = None,
+                     map_reduce: bool = None, concurrency: int = 8, weights: dict = None) -> dict:
+    """`weights` maps a JD title to how many times it was posted (see jd_dedup.py)"""
+    client = client or get_client()
+    weights = weights or {}
 
-    # Build combined JD block
+    if map_reduce is None:
+        map_reduce = len(jds) > MAP_REDUCE_THRESHOLD
+    if map_reduce:
+        return run_map_reduce_gap_analysis(resume, jds, client, concurrency, weights)
+
+    # Build combined JD block; reposted JDs appear once with their posting count
     jd_block = "\n\n".join(
-        [f"--- JD: {title} ---\n{content}" for title, content in jds.items()]
+        [f"--- JD: {title}{_posted_note(weights.get(title, 1))} ---\n{content}" for title, content in jds.items()]
     )
+    postings = sum(weights.get(title, 1) for title in jds)
+    count_note = ""
+    if postings > len(jds):
+        count_note = (f" ({postings} postings; near-duplicate reposts are merged, so count a JD marked "
+                      f"\"posted Nx\" as N JDs when judging frequency)")
 
-    system_prompt = """You are a deeply technical QA recruiter with 15+ years of experience 
-hiring in India's top product companies and GCCs (Global Capability Centres) in Gurugram, 
-Bangalore, and remote. You have reviewed thousands of QA Manager, Test Lead, and SDET resumes.
-
-You understand Indian tech hiring deeply — including what Naukri ATS, LinkedIn, and 
-enterprise HR tools scan for. You know the Gurugram corridor companies: Publicis Sapient, 
-EXL, Genpact, MakeMyTrip, Info Edge, PolicyBazaar, etc.
-
-Always be brutally honest and specific. No vague advice. Give concrete, actionable gaps."""
-
-    user_prompt = f"""Act as a senior QA recruiter. Analyze my resume against these {len(jds)} job descriptions.
+    user_prompt = f"""Act as a senior QA recruiter. Analyze my resume against these {len(jds)} job descriptions{count_note}.
 
 MY RESUME:
 {resume}
@@ -82,30 +118,339 @@ Return ONLY valid JSON. No markdown, no explanation outside JSON."""
 
     print("🔍 Running gap analysis... (this may take 20-30 seconds)")
 
-    response = client.chat.completions.create(
+    raw = cached_completion(
+        client,
         model="grok-beta",
         max_tokens=4000,
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": RECRUITER_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ],
-    )
+    ).strip()
 
-    raw = response.choices[0].message.content.strip()
+    return parse_json(raw)
 
-    # Parse and return
+
+def _posted_note(weight: int) -> str:
+    return f" (posted {weight}x)" if weight > 1 else ""
+
+
+def parse_json(raw: str) -> dict:
     try:
-        result = json.loads(raw)
+        return json.loads(raw)
     except json.JSONDecodeError:
         # Try to extract JSON if wrapped in markdown
-        import re
         match = re.search(r"\{.*\}", raw, re.DOTALL)
         if match:
-            result = json.loads(match.group())
-        else:
-            raise ValueError("Could not parse JSON from Claude response")
+            return json.loads(match.group())
+        raise ValueError("Could not parse JSON from model response")
+
+
+# ── Map-reduce mode (large JD sets) ───────────────────────
+# Map: one small call per JD extracts its requirements (in parallel).
+# Reduce: count real per-keyword JD frequency locally, canonicalizing names.
+# Final: one small call writes only the narrative fields.
+
+SKILL_ALIASES = {
+    "ci cd": "ci/cd", "cicd": "ci/cd", "continuous integration": "ci/cd",
+    "k8s": "kubernetes", "js": "javascript", "ts": "typescript",
+    "rest api": "rest apis", "restful apis": "rest apis", "api testing": "rest apis",
+    "amazon web services": "aws", "google cloud": "gcp", "ado": "azure devops",
+    "selenium webdriver": "selenium", "appium automation": "appium",
+    "load testing": "performance testing", "apache jmeter": "jmeter",
+    "istqb certified": "istqb", "istqb certification": "istqb",
+    "agile scrum": "agile", "scrum": "agile",
+    "shift left": "shift-left", "shift left testing": "shift-left",
+    "gh actions": "github actions",
+}
+
+
+def canonical_skill(name: str) -> str:
+    key = re.sub(r"[^a-z0-9+#/.]+", " ", name.lower()).strip()
+    key = re.sub(r"\s+", " ", key)
+    return SKILL_ALIASES.get(key, SKILL_ALIASES.get(key.replace("/", " "), key))
+
+
+def _find_in_resume(skill: str, resume_lines: list) -> str:
+    """Resume line mentioning the skill (or one of its aliases), else ''"""
+    terms = {skill} | {alias for alias, canon in SKILL_ALIASES.items() if canon == skill}
+    patterns = [re.compile(r"(?<![a-z0-9])" + re.escape(t) + r"(?![a-z0-9])") for t in terms]
+    for line in resume_lines:
+        norm = re.sub(r"[^a-z0-9+#/.]+", " ", line.lower())
+        if any(p.search(norm) for p in patterns):
+            return line.strip()
+    return ""
+
+
+def extract_jd_requirements(client: OpenAI, title: str, jd: str) -> dict:
+    """Map phase: requirements of a single JD
+
+    An unparseable reply is asked for once more, bypassing the cache; if that
+    fails too the result is empty and marked "error": True.
+    """
+    messages = [{
+        "role": "user",
+        "content": f"""List the requirements of this job description.
+Return ONLY a JSON object:
+{{
+  "skills": ["tools, technologies, methodologies and certifications the role requires"],
+  "keywords": ["other ATS keywords: domains, practices, leadership terms"],
+  "title": "the role title"
+}}
 
-    return result
+JOB DESCRIPTION ({title}):
+{jd}
+
+Return ONLY valid JSON."""
+    }]
+    for use_cache in (True, False):
+        raw = cached_completion(client, model="grok-beta", max_tokens=800, messages=messages,
+                                use_cache=use_cache).strip()
+        try:
+            return parse_json(raw)
+        except (ValueError, json.JSONDecodeError):
+            continue
+    return {"skills": [], "keywords": [], "title": title, "error": True}
+
+
+def reduce_jd_requirements(resume: str, per_jd: dict, weights: dict = None) -> dict:
+    """Reduce phase: real JD frequencies per canonical skill/keyword, split by resume coverage"""
+    weights = weights or {}
+    total = sum(weights.get(title, 1) for title in per_jd) or 1
+    counts, spellings, kinds = {}, {}, {}
+
+    for title, req in per_jd.items():
+        seen = set()
+        for kind in ("skills", "keywords"):
+            for name in req.get(kind, []) or []:
+                if not isinstance(name, str) or not name.strip():
+                    continue
+                canon = canonical_skill(name)
+                spellings.setdefault(canon, {}).setdefault(name.strip(), 0)
+                spellings[canon][name.strip()] += 1
+                # A term listed as a skill anywhere is treated as a skill
+                if kind == "skills" or canon not in kinds:
+                    kinds[canon] = kind
+                if canon not in seen:
+                    seen.add(canon)
+                    counts[canon] = counts.get(canon, 0) + weights.get(title, 1)
+
+    resume_lines = [line for line in resume.splitlines() if line.strip()]
+    have, lack, keywords = [], [], []
+    for canon, n in sorted(counts.items(), key=lambda kv: -kv[1]):
+        display = max(spellings[canon].items(), key=lambda kv: kv[1])[0]
+        ratio = n / total
+        evidence = _find_in_resume(canon, resume_lines)
+        if evidence:
+            have.append({
+                "skill": display,
+                "evidence_in_resume": evidence,
+                "frequency_in_jds": "high" if ratio >= 0.5 else "medium" if ratio >= 0.2 else "low",
+            })
+        elif kinds[canon] == "skills":
+            lack.append({
+                "skill": display,
+                "why_it_matters": f"Required in {n} of {total} JDs",
+                "urgency": "critical" if ratio >= 0.5 else "important" if ratio >= 0.2 else "nice-to-have",
+                "learning_effort": "",
+            })
+        if not evidence:
+            keywords.append({"keyword": display, "appears_in_n_jds": n, "where_to_add_in_resume": ""})
+
+    return {"skills_i_have": have, "skills_i_lack": lack, "ats_keywords_to_add": keywords, "total_jds": total}
+
+
+def summarize_gap(client: OpenAI, resume: str, reduced: dict, top_n: int = 15) -> dict:
+    """Final phase: one small call for the narrative fields only"""
+    lack = reduced["skills_i_lack"][:top_n]
+    keywords = reduced["ats_keywords_to_add"][:top_n]
+    table = "\n".join(
+        [f"- HAVE {s['skill']} ({s['frequency_in_jds']} demand)" for s in reduced["skills_i_have"][:top_n]]
+        + [f"- LACK {s['skill']} ({s['why_it_matters']})" for s in lack]
+        + [f"- MISSING KEYWORD {k['keyword']} (in {k['appears_in_n_jds']} JDs)" for k in keywords]
+    )
+
+    raw = cached_completion(
+        client,
+        model="grok-beta",
+        max_tokens=1500,
+        messages=[
+            {"role": "system", "content": RECRUITER_SYSTEM_PROMPT},
+            {"role": "user", "content": f"""I analyzed my resume against {reduced['total_jds']} job descriptions.
+Measured demand (number of JDs that ask for each item):
+{table}
+
+MY RESUME:
+{resume}
+
+Output a JSON object with this EXACT structure:
+{{
+  "title_mismatch": "string explaining if your current title may hurt or help",
+  "top_3_priorities": ["string", "string", "string"],
+  "india_market_insight": "string with Gurugram/remote market specific advice",
+  "learning_effort": {{"<skill I lack>": "1-3 days / 1-2 weeks / 1 month+"}},
+  "where_to_add": {{"<missing keyword>": "resume section to add it to"}}
+}}
+
+Return ONLY valid JSON. No markdown, no explanation outside JSON."""}
+        ],
+    ).strip()
+    return parse_json(raw)
+
+
+def map_jd_requirements(client: OpenAI, jds: dict, concurrency: int = 8, errors: dict = None) -> dict:
+    """Map phase over many JDs in parallel: {title: requirements}
+
+    Every JD runs to completion even when others fail. Upstream errors are
+    collected into `errors` ({title: exception}) when it is given; otherwise
+    the first one is raised once all JDs are done.
+    """
+    results, failed = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {title: pool.submit(extract_jd_requirements, client, title, jd) for title, jd in jds.items()}
+        for title, future in futures.items():
+            try:
+                results[title] = future.result()
+            except Exception as e:
+                failed[title] = e
+    unparsed = [title for title, req in results.items() if req.get("error")]
+    if unparsed:
+        print(f"⚠️  Could not parse the requirements of {len(unparsed)} JD(s): {', '.join(unparsed)}")
+    if failed and errors is None:
+        raise next(iter(failed.values()))
+    if failed:
+        errors.update(failed)
+    return results
+
+
+def aggregate_gap_analysis(resume: str, per_jd: dict, client: OpenAI, weights: dict = None) -> dict:
+    """Reduce + final phases: local frequency counts, then one small narrative call"""
+    print("🧮 Reduce phase: counting keyword frequency across JDs...")
+    reduced = reduce_jd_requirements(resume, per_jd, weights)
+
+    print("📝 Summarizing priorities...")
+    narrative = summarize_gap(client, resume, reduced)
+
+    effort = {canonical_skill(k): v for k, v in (narrative.get("learning_effort") or {}).items()}
+    placement = {canonical_skill(k): v for k, v in (narrative.get("where_to_add") or {}).items()}
+    for s in reduced["skills_i_lack"]:
+        s["learning_effort"] = effort.get(canonical_skill(s["skill"]), "")
+    for k in reduced["ats_keywords_to_add"]:
+        k["where_to_add_in_resume"] = placement.get(canonical_skill(k["keyword"]), "")
+
+    return {
+        "skills_i_have": reduced["skills_i_have"],
+        "skills_i_lack": reduced["skills_i_lack"],
+        "ats_keywords_to_add": reduced["ats_keywords_to_add"],
+        "title_mismatch": narrative.get("title_mismatch", ""),
+        "top_3_priorities": narrative.get("top_3_priorities", []),
+        "india_market_insight": narrative.get("india_market_insight", ""),
+    }
+
+
+def run_map_reduce_gap_analysis(resume: str, jds: dict, client: OpenAI = None,
+                                concurrency: int = 8, weights: dict = None) -> dict:
+    client = client or get_client()
+
+    print(f"🔍 Map phase: extracting requirements from {len(jds)} JDs ({concurrency} at a time)...")
+    per_jd = map_jd_requirements(client, jds, concurrency)
+    return aggregate_gap_analysis(resume, per_jd, client, weights)
+
+
+# ── Incremental folder analysis ───────────────────────────
+# A manifest next to the JD folder stores a hash of each JD file's raw bytes
+# and its map-phase result, so reruns only send new or changed JDs to the
+# model. The hash is taken before cleaning: cleaning learns from the whole
+# corpus, so a new JD must not change an old JD's key.
+
+# Bump when the map prompt or the hashed content changes so stale per-JD results are recomputed
+MANIFEST_VERSION = 2
+
+
+def manifest_path(folder: str) -> Path:
+    folder = Path(folder).resolve()
+    return folder.parent / f"{folder.name}.gap_manifest.json"
+
+
+def load_manifest(folder: str) -> dict:
+    path = manifest_path(folder)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": MANIFEST_VERSION, "jds": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "jds": {}}
+    return manifest
+
+
+def save_manifest(folder: str, manifest: dict):
+    path = manifest_path(folder)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    tmp.replace(path)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def sync_folder_requirements(folder: str, jds: dict, client: OpenAI, concurrency: int = 8) -> dict:
+    """Per-JD requirements for every JD in the folder, analyzing only new/changed files
+
+    `jds` holds the (cleaned) text to send; change detection uses the raw files.
+    """
+    manifest = load_manifest(folder)
+    entries = manifest["jds"]
+
+    removed = [stem for stem in entries if stem not in jds]
+    for stem in removed:
+        del entries[stem]
+
+    hashes = {stem: file_hash(Path(folder) / f"{stem}.txt") for stem in jds}
+    changed = {stem: jds[stem] for stem in jds if entries.get(stem, {}).get("sha256") != hashes[stem]}
+
+    print(f"♻️  Manifest: {len(jds) - len(changed)} unchanged, {len(changed)} new/changed, "
+          f"{len(removed)} removed ({manifest_path(folder).name})")
+
+    results, errors = {}, {}
+    if changed:
+        print(f"🔍 Map phase: extracting requirements from {len(changed)} JDs ({concurrency} at a time)...")
+        results = map_jd_requirements(client, changed, concurrency, errors)
+        for stem, req in results.items():
+            # Unparseable replies are not saved, so the next run analyzes those JDs again
+            if not req.get("error"):
+                entries[stem] = {"sha256": hashes[stem], "requirements": req}
+
+    # Saved even if some JDs failed: the next run only redoes those
+    if changed or removed:
+        save_manifest(folder, manifest)
+    if errors:
+        print(f"❌ {len(errors)} JD(s) failed and will be retried next run: {', '.join(errors)}")
+        raise next(iter(errors.values()))
+
+    return {stem: results[stem] if stem in results else entries[stem]["requirements"] for stem in jds}
+
+
+def run_incremental_gap_analysis(resume: str, folder: str, client: OpenAI = None, concurrency: int = 8,
+                                 extra_jds: dict = None, weights: dict = None, dedupe: bool = True) -> dict:
+    client = client or get_client()
+    jds = load_jds_from_folder(folder, verbose=False)
+    if dedupe:
+        from jd_dedup import dedupe_jds   # numpy; loaded only when JDs are actually analyzed
+        kept, repost_weights = dedupe_jds({**jds, **(extra_jds or {})})
+        jds = {title: text for title, text in kept.items() if title in jds}
+        extra_jds = {title: text for title, text in kept.items() if title not in jds}
+        weights = {**repost_weights, **(weights or {})}
+    per_jd = sync_folder_requirements(folder, jds, client, concurrency)
+    if extra_jds:
+        per_jd.update(map_jd_requirements(client, extra_jds, concurrency))
+    return aggregate_gap_analysis(resume, per_jd, client, weights)
 
 
 def print_gap_report(data: dict):
@@ -144,7 +489,8 @@ def print_gap_report(data: dict):
 
 def generate_learning_syllabus(skill: str, client: OpenAI) -> str:
     """Bonus: generate a crash course for a specific gap skill"""
-    response = client.chat.completions.create(
+    return cached_completion(
+        client,
         model="grok-beta",
         max_tokens=1500,
         messages=[{
@@ -172,7 +518,6 @@ Top 5 interview questions you'll be asked about {skill}:
 Keep it practical and India-market relevant."""
         }]
     )
-    return response.choices[0].message.content
 
 
 def main():
@@ -182,7 +527,19 @@ def main():
     parser.add_argument("--jd_folder", help="Folder containing JD .txt files")
     parser.add_argument("--learn", help="Generate 3-day syllabus for a specific skill")
     parser.add_argument("--output", help="Save JSON report to this file")
+    parser.add_argument("--map_reduce", action="store_true",
+                        help=f"Analyze JDs one by one and aggregate locally (automatic above {MAP_REDUCE_THRESHOLD} JDs)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel per-JD calls in map-reduce mode")
+    parser.add_argument("--no_manifest", action="store_true",
+                        help="Re-analyze every JD in --jd_folder instead of only new/changed ones")
+    parser.add_argument("--no_dedupe", action="store_true",
+                        help="Analyze near-duplicate JDs (reposts) separately instead of merging them")
+    parser.add_argument("--rank", action="store_true",
+                        help="Only rank the JDs by fit to the resume (local, no LLM calls) and exit")
+    parser.add_argument("--top_k", type=int,
+                        help="Keep the N best-fit JDs (default with --rank: 10; otherwise all JDs are analyzed)")
     args = parser.parse_args()
+    load_env()
 
     resume = load_text(args.resume)
 
@@ -190,19 +547,44 @@ def main():
     jds = {}
     if args.jd_folder:
         jds.update(load_jds_from_folder(args.jd_folder))
+    extra_jds = {}
     if args.jds:
         for jd_path in args.jds:
             stem = Path(jd_path).stem
-            jds[stem] = load_text(jd_path)
+            extra_jds[stem] = load_jd_text(jd_path)
+    jds.update(extra_jds)
 
     if not jds:
         print("❌ Error: Provide at least one JD via --jds or --jd_folder")
         return
 
+    if args.rank:
+        from jd_ranker import DEFAULT_TOP_K, print_ranking, rank_jds
+        ranking = rank_jds(resume, jds, args.top_k or DEFAULT_TOP_K)
+        print_ranking(ranking, len(jds))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(ranking, f, indent=2)
+            print(f"\n💾 Ranking saved to: {args.output}")
+        return
+
+    if args.top_k:
+        from jd_ranker import top_jds
+        jds = top_jds(resume, jds, args.top_k)
+
     print(f"📄 Loaded resume + {len(jds)} JDs: {list(jds.keys())}")
 
     # Run gap analysis
-    result = run_gap_analysis(resume, jds)
+    if args.jd_folder and not args.no_manifest and not args.top_k:
+        result = run_incremental_gap_analysis(resume, args.jd_folder, concurrency=args.concurrency,
+                                              extra_jds=extra_jds, dedupe=not args.no_dedupe)
+    else:
+        weights = None
+        if not args.no_dedupe:
+            from jd_dedup import dedupe_jds
+            jds, weights = dedupe_jds(jds)
+        result = run_gap_analysis(resume, jds, map_reduce=args.map_reduce or None, concurrency=args.concurrency,
+                                  weights=weights)
     print_gap_report(result)
 
     # Save JSON
@@ -213,10 +595,7 @@ def main():
 
     # Optional: generate syllabus
     if args.learn:
-        client = OpenAI(
-            api_key=os.environ.get("XAI_API_KEY"),
-            base_url="https://api.x.ai/v1"
-        )
+        client = get_client()
         print(f"\n📚 Generating 3-day crash course for: {args.learn}")
         syllabus = generate_learning_syllabus(args.learn, client)
         print(syllabus)
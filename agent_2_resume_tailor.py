@@ -7,21 +7,55 @@ to maximize ATS match score. Outputs:
 - Match score estimate
 - Missing keywords inserted naturally
 
+Only the bullets worth rewriting are sent: the resume is split into sections
+and bullets (resume_model.py), up to TAILOR_MAX_BULLETS (default 12) bullets
+that relate to the JD's requirements are picked locally, and the rewrites are
+spliced back into the original layout. Education, contact details and
+unrelated roles never round-trip through the model. --full_rewrite (or a
+resume with no recognizable bullets) sends the whole resume instead.
+
+The response is streamed: the score and each bullet rewrite are printed as
+soon as the model finishes them (--no_stream waits for the full reply).
+
+Batch mode (--jds / --jd_folder) reads the resume once and tailors it to every
+JD, `--concurrency` JDs at a time (keyword extraction + rewrite per JD). Each
+tailored resume is written to <output_dir>/<jd_stem>.txt as soon as it is
+ready, followed by one summary table sorted by match score.
+
 Usage:
     python agent_2_resume_tailor.py --resume my_resume.txt --jd target_jd.txt
     python agent_2_resume_tailor.py --resume my_resume.txt --jd target_jd.txt --output tailored_resume.txt
+
+    # Batch mode: every JD in a folder, 4 at a time, into ./tailored/
+    python agent_2_resume_tailor.py --resume my_resume.txt --jd_folder ./jds/ --concurrency 4
+    python agent_2_resume_tailor.py --resume my_resume.txt --jds jd1.txt jd2.txt --output_dir ./tailored/
 """
 
-from openai import OpenAI
+from __future__ import annotations
+
 import argparse
 import json
-import re
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING
+from llm_cache import cached_completion, cached_stream
+from xai_client import get_client, load_env, print_connection_stats
+from resilience import print_resilience_stats
+from ats_scorer import ATSScorer, normalize
+from keyword_extractor import extract_keywords
+from jd_cleaner import clean_jds, load_jd_text
+from json_stream import IncrementalJSONParser
+from resume_model import parse_resume, requirement_lines, select_bullets
+from metrics import percentile
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
-# Load environment variables from .env file if it exists
-load_dotenv()
+# Leading number of a model score: "82", "82%", "85.5", "85/100"
+_SCORE = re.compile(r"\s*(\d+(?:\.\d+)?)")
 
 
 def load_text(filepath: str) -> str:
@@ -29,9 +63,17 @@ def load_text(filepath: str) -> str:
         return f.read().strip()
 
 
-def extract_keywords_from_jd(client: OpenAI, jd: str) -> dict:
-    """First pass: extract all critical keywords from JD"""
-    response = client.chat.completions.create(
+def extract_keywords_from_jd(client: OpenAI, jd: str, local_first: bool = True) -> dict:
+    """First pass: extract all critical keywords from JD.
+
+    By default the bundled skill taxonomy fills what it can locally and the
+    model is only asked for categories it can't fill confidently.
+    """
+    if local_first:
+        return extract_keywords(jd, client)
+
+    raw = cached_completion(
+        client,
         model="grok-beta",
         max_tokens=1000,
         messages=[{
@@ -53,8 +95,7 @@ JOB DESCRIPTION:
 
 Return ONLY valid JSON."""
         }]
-    )
-    raw = response.choices[0].message.content.strip()
+    ).strip()
     try:
         return json.loads(raw)
     except:
@@ -62,21 +103,21 @@ Return ONLY valid JSON."""
         return json.loads(match.group()) if match else {}
 
 
-def tailor_resume(client: OpenAI, resume: str, jd: str, keywords: dict) -> dict:
-    """Second pass: rewrite resume to match JD"""
-
-    keyword_summary = json.dumps(keywords, indent=2)
-
-    response = client.chat.completions.create(
-        model="grok-beta",
-        max_tokens=5000,
-        messages=[
-            {"role": "system", "content": """You are an expert resume writer for senior tech professionals in India.
+TAILOR_SYSTEM_PROMPT = """You are an expert resume writer for senior tech professionals in India.
 You specialize in QA, Testing, and Engineering Management roles at product companies and GCCs.
 You understand Naukri.com and LinkedIn India ATS systems deeply.
 You NEVER fabricate experience. You reframe REAL experience using better language.
-You write in a confident, executive tone appropriate for Director/Principal level roles."""},
-            {"role": "user", "content": f"""Rewrite my resume to maximize ATS match for this specific JD. 
+You write in a confident, executive tone appropriate for Director/Principal level roles."""
+
+
+def build_tailor_messages(resume: str, jd: str, keywords: dict) -> list:
+    keyword_summary = json.dumps(keywords, indent=2)
+
+    # The score and bullet rewrites come before the long tailored_resume field
+    # so a streaming reader can show them first
+    return [
+        {"role": "system", "content": TAILOR_SYSTEM_PROMPT},
+        {"role": "user", "content": f"""Rewrite my resume to maximize ATS match for this specific JD. 
 
 RULES:
 1. Never fabricate experience — only rephrase and reframe real experience
@@ -95,23 +136,24 @@ MY ORIGINAL RESUME:
 TARGET JOB DESCRIPTION:
 {jd}
 
-Return a JSON object:
+Return a JSON object with the fields in this order:
 {{
-  "tailored_resume": "Full rewritten resume text, preserving sections",
   "ats_match_score": "estimated score 0-100",
   "score_reasoning": "why this score",
   "bullets_rewritten": [
     {{"original": "string", "rewritten": "string", "keywords_added": ["list"]}}
   ],
   "gaps_flagged": ["list of JD requirements with no resume match"],
-  "summary_rewrite": "Rewritten professional summary targeting this JD"
+  "summary_rewrite": "Rewritten professional summary targeting this JD",
+  "tailored_resume": "Full rewritten resume text, preserving sections"
 }}
 
 Return ONLY valid JSON."""}
-        ]
-    )
+    ]
 
-    raw = response.choices[0].message.content.strip()
+
+def parse_tailor_output(raw: str) -> dict:
+    raw = raw.strip()
     try:
         return json.loads(raw)
     except:
@@ -119,9 +161,206 @@ Return ONLY valid JSON."""}
         return json.loads(match.group()) if match else {"tailored_resume": raw}
 
 
+def plan_section_tailor(resume: str, jd: str, keywords: dict):
+    """(resume model, [(bullet, keywords it has)]) to rewrite, or None if no bullet relates to the JD"""
+    model = parse_resume(resume)
+    selected = select_bullets(model, jd, keywords, int(os.environ.get("TAILOR_MAX_BULLETS", 12)))
+    return (model, selected) if selected else None
+
+
+def build_section_tailor_messages(resume: str, jd: str, keywords: dict, plan) -> list:
+    model, selected = plan
+    coverage = ATSScorer(keywords).score(resume)["categories"]
+    have = sorted({kw for c in coverage.values() for kw in c["matched"]})
+    missing = {category: c["missing"] for category, c in coverage.items() if c["missing"]}
+    bullets = "\n".join(f"{bullet.id}. {bullet.text}" for bullet, _ in selected)
+    requirements = "\n".join(requirement_lines(jd))
+
+    return [
+        {"role": "system", "content": TAILOR_SYSTEM_PROMPT},
+        {"role": "user", "content": f"""Rewrite only the numbered resume bullets below to maximize ATS match for this JD.
+The rest of my resume stays as it is.
+
+RULES:
+1. Never fabricate experience — only rephrase and reframe real experience
+2. Inject missing keywords NATURALLY, only where the bullet supports them
+3. Lead every bullet with a strong action verb from the JD where possible
+4. Add metrics/impact where implied (e.g., "managed team" → "Led team of 8 SDETs")
+5. Keep each rewrite to one line; leave out bullets that need no change
+6. Flag any JD requirement that has NO match in my resume
+
+KEYWORDS MY RESUME ALREADY HAS: {", ".join(have) or "none"}
+
+MISSING ATS KEYWORDS:
+{json.dumps(missing, indent=2)}
+
+MY CURRENT SUMMARY:
+{model.summary or "(none)"}
+
+BULLETS TO REWRITE:
+{bullets}
+
+JD REQUIREMENTS:
+{requirements}
+
+Return a JSON object with the fields in this order:
+{{
+  "ats_match_score": "estimated score 0-100 for the whole resume after these rewrites",
+  "score_reasoning": "why this score",
+  "bullets_rewritten": [
+    {{"id": bullet number, "rewritten": "string", "keywords_added": ["list"]}}
+  ],
+  "gaps_flagged": ["list of JD requirements with no resume match"],
+  "summary_rewrite": "Rewritten professional summary targeting this JD"
+}}
+
+Return ONLY valid JSON."""}
+    ]
+
+
+def _section_rewrite(item, bullets: dict):
+    """A model rewrite {"id", ...} as a bullets_rewritten entry {"original", "rewritten", "keywords_added"}"""
+    if not isinstance(item, dict):
+        return None
+    try:
+        bullet = bullets.get(int(str(item.get("id")).strip().rstrip(".")))
+    except ValueError:
+        return None
+    if bullet is None or not str(item.get("rewritten") or "").strip():
+        return None
+    return {"original": bullet.text, "rewritten": item["rewritten"], "keywords_added": item.get("keywords_added") or []}
+
+
+def finish_section_tailor(data: dict, plan) -> dict:
+    """Splice the rewritten bullets and summary back into the original resume
+
+    Raises ValueError if the reply has neither bullets_rewritten nor
+    summary_rewrite (e.g. it was not JSON), instead of passing off the
+    untouched resume as tailored.
+    """
+    if not any(key in data for key in ("bullets_rewritten", "summary_rewrite")):
+        raise ValueError("section rewrite reply has no bullets_rewritten or summary_rewrite")
+    model, selected = plan
+    bullets = {bullet.id: bullet for bullet, _ in selected}
+    rewrites, entries = {}, []
+    for item in data.get("bullets_rewritten") or []:
+        entry = _section_rewrite(item, bullets)
+        if entry:
+            rewrites[int(str(item["id"]).strip().rstrip("."))] = entry["rewritten"]
+            entries.append(entry)
+    data["bullets_rewritten"] = entries
+    data["tailored_resume"] = model.splice(rewrites, data.get("summary_rewrite"))
+    return data
+
+
+def _tailor_request(resume: str, jd: str, keywords: dict, full_rewrite: bool):
+    """(plan or None, messages, max_tokens) for a section-level or full-resume rewrite"""
+    plan = None if full_rewrite else plan_section_tailor(resume, jd, keywords)
+    if plan is None:
+        return None, build_tailor_messages(resume, jd, keywords), 5000
+    # Room for the score, summary and gaps plus one line per bullet
+    return plan, build_section_tailor_messages(resume, jd, keywords, plan), min(5000, 600 + 150 * len(plan[1]))
+
+
+def tailor_resume(client: OpenAI, resume: str, jd: str, keywords: dict, on_event=None,
+                  full_rewrite: bool = False) -> dict:
+    """Second pass: rewrite resume to match JD
+
+    With `on_event`, the response is streamed and on_event(event) is called for
+    each completed field / bullet rewrite (see json_stream.py) as it arrives.
+    """
+    if on_event is not None:
+        result = {}
+        for event in stream_tailor_resume(client, resume, jd, keywords, full_rewrite):
+            if event[0] == "done":
+                result = event[1]
+            else:
+                on_event(event)
+        return result
+
+    plan, messages, max_tokens = _tailor_request(resume, jd, keywords, full_rewrite)
+    raw = cached_completion(client, model="grok-beta", max_tokens=max_tokens, messages=messages)
+    data = parse_tailor_output(raw)
+    if not plan:
+        return data
+    try:
+        return finish_section_tailor(data, plan)
+    except ValueError as e:
+        print(f"   ⚠️  {e}; retrying with a full rewrite")
+        return tailor_resume(client, resume, jd, keywords, full_rewrite=True)
+
+
+def stream_tailor_resume(client: OpenAI, resume: str, jd: str, keywords: dict, full_rewrite: bool = False):
+    """Yields ("field", ...) / ("item", ...) events while the model writes, then ("done", result).
+
+    The final result is parsed from the full text exactly like tailor_resume does.
+    Section-level rewrites arrive in the same shape as full ones; the spliced
+    tailored_resume is sent as a last field event before "done". If the
+    section reply is unusable, ("reset", reason) tells consumers to discard
+    every event so far, and the events of a full rewrite follow.
+    """
+    plan, messages, max_tokens = _tailor_request(resume, jd, keywords, full_rewrite)
+    bullets = {bullet.id: bullet for bullet, _ in plan[1]} if plan else {}
+    parser = IncrementalJSONParser()
+    parts = []
+    deltas = cached_stream(client, model="grok-beta", max_tokens=max_tokens, messages=messages)
+    try:
+        for delta in deltas:
+            parts.append(delta)
+            for event in parser.feed(delta):
+                if plan and event[1] == "bullets_rewritten":
+                    if event[0] == "item":
+                        entry = _section_rewrite(event[3], bullets)
+                        if entry:
+                            yield (event[0], event[1], event[2], entry)
+                    elif isinstance(event[2], list):
+                        entries = [_section_rewrite(item, bullets) for item in event[2]]
+                        yield (event[0], event[1], [entry for entry in entries if entry])
+                else:
+                    yield event
+    finally:
+        deltas.close()
+    result = parse_tailor_output("".join(parts))
+    if plan:
+        try:
+            result = finish_section_tailor(result, plan)
+        except ValueError as e:
+            yield ("reset", f"{e}; retrying with a full rewrite")
+            yield from stream_tailor_resume(client, resume, jd, keywords, full_rewrite=True)
+            return
+        yield ("field", "tailored_resume", result["tailored_resume"])
+    yield ("done", result)
+
+
+def print_tailor_event(event):
+    """Progress line for a streamed tailor event"""
+    if event[0] == "field" and event[1] == "ats_match_score":
+        print(f"   📊 Model ATS score: {event[2]}%")
+    elif event[0] == "item" and event[1] == "bullets_rewritten" and isinstance(event[3], dict):
+        print(f"   ✍️  Rewrite {event[2] + 1}: {event[3].get('rewritten', '')}")
+    elif event[0] == "field" and event[1] == "tailored_resume":
+        print("   📄 Tailored resume received")
+    elif event[0] == "reset":
+        print(f"   ⚠️  {event[1]}")
+
+
+def attach_local_scores(data: dict, resume: str, keywords: dict, normalized_resume: str = None) -> dict:
+    """Deterministic local ATS score of the original and tailored resume, next to the model's estimate
+
+    `normalized_resume` (ats_scorer.normalize(resume)) skips re-normalizing a resume scored many times.
+    """
+    scorer = ATSScorer(keywords)
+    before = scorer.score(normalized_resume, normalized=True) if normalized_resume else scorer.score(resume)
+    data["local_ats_score"] = {
+        "before": before["score"],
+        "after": scorer.score(data.get("tailored_resume", "") or resume)["score"],
+    }
+    return data
+
+
 def print_tailor_report(data: dict, output_path: str = None):
     score = data.get("ats_match_score", "?")
-    score_num = int(str(score).replace("%", "")) if str(score).replace("%", "").isdigit() else 0
+    score_num = min(100, _score_value(score))
     score_bar = "█" * (score_num // 10) + "░" * (10 - score_num // 10)
 
     print("\n" + "=" * 60)
@@ -131,6 +370,9 @@ def print_tailor_report(data: dict, output_path: str = None):
     print(f"\n📊 ATS MATCH SCORE: {score}%")
     print(f"   [{score_bar}]")
     print(f"   {data.get('score_reasoning', '')}")
+    local = data.get("local_ats_score")
+    if local:
+        print(f"   🧮 Local keyword score: {local['before']}% before → {local['after']}% after tailoring (model says {score}%)")
 
     target = 80
     if score_num >= target:
@@ -164,32 +406,150 @@ def print_tailor_report(data: dict, output_path: str = None):
     print("\n" + "=" * 60)
 
 
+def _score_value(score) -> int:
+    """The model's score as an int: "82", "82%", "85.5" and "85/100" all count, anything else is 0"""
+    match = _SCORE.match(str(score))
+    return round(float(match.group(1))) if match else 0
+
+
+def load_jds(jd_paths: list = None, jd_folder: str = None) -> dict:
+    """{jd_stem: cleaned JD text} from a folder and/or explicit paths"""
+    jds = {}
+    if jd_folder:
+        jds.update(clean_jds({f.stem: load_text(str(f)) for f in sorted(Path(jd_folder).glob("*.txt"))}))
+    for jd_path in jd_paths or []:
+        jds[Path(jd_path).stem] = load_jd_text(jd_path)
+    return jds
+
+
+def batch_tailor(client: OpenAI, resume: str, jds: dict, output_dir: str = "tailored",
+                 concurrency: int = 4, local_first: bool = True, full_rewrite: bool = False) -> list:
+    """Tailor one resume to every JD in `jds` ({stem: text}), `concurrency` JDs at a time.
+
+    The resume is read and normalized once; each worker extracts its JD's
+    keywords, tailors, scores locally and writes <output_dir>/<stem>.txt.
+    A failed JD is reported and skipped. Returns one result per JD, in order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    normalized_resume = normalize(resume)
+    concurrency = max(1, concurrency)
+    stems = list(jds)
+
+    print(f"\n📋 Tailoring for {len(stems)} JDs (concurrency: {concurrency}) → {output_dir}/")
+
+    def work(stem: str) -> dict:
+        started = time.perf_counter()
+        try:
+            keywords = extract_keywords_from_jd(client, jds[stem], local_first=local_first)
+            data = tailor_resume(client, resume, jds[stem], keywords, full_rewrite=full_rewrite)
+            attach_local_scores(data, resume, keywords, normalized_resume)
+            output_file = None
+            if data.get("tailored_resume"):
+                output_file = os.path.join(output_dir, f"{stem}.txt")
+                with open(output_file, "w", encoding="utf-8") as f:
+                    f.write(data["tailored_resume"])
+            return {"jd": stem, "data": data, "file": output_file, "seconds": time.perf_counter() - started}
+        except Exception as e:
+            return {"jd": stem, "error": str(e), "seconds": time.perf_counter() - started}
+
+    results = [None] * len(stems)
+    latencies = []
+    failed = 0
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(work, stem): i for i, stem in enumerate(stems)}
+        for done_count, future in enumerate(as_completed(futures), 1):
+            r = results[futures[future]] = future.result()
+            latencies.append(r["seconds"])
+            if "error" in r:
+                failed += 1
+                status = f"❌ {r['error']}"
+            else:
+                status = f"📊 {r['data'].get('ats_match_score', '?')}%"
+            elapsed = time.perf_counter() - t0
+            print(f"   [{done_count}/{len(stems)}] {r['jd']}: {status} ({r['seconds']:.1f}s) | "
+                  f"p50 {percentile(latencies, 50):.1f}s | {elapsed:.1f}s elapsed", flush=True)
+
+    print_batch_summary(results, output_dir)
+    if failed:
+        print(f"\n⚠️  {failed} of {len(stems)} JDs failed — rerun with --jds to retry them")
+    print_connection_stats()
+    print_resilience_stats()
+    return results
+
+
+def print_batch_summary(results: list, output_dir: str):
+    """One table for the batch, best match first"""
+    done = sorted((r for r in results if "error" not in r),
+                  key=lambda r: (_score_value(r["data"].get("ats_match_score")),
+                                 r["data"].get("local_ats_score", {}).get("after", 0)), reverse=True)
+    width = max([len(r["jd"]) for r in done] + [6])
+
+    print("\n" + "=" * 60)
+    print("🎯 BATCH TAILOR SUMMARY (best match first)")
+    print("=" * 60)
+    print(f"   {'JD':<{width}}  {'Model':>5}  {'Local before → after':>20}  {'Gaps':>4}")
+    for r in done:
+        data = r["data"]
+        local = data.get("local_ats_score", {})
+        change = f"{local.get('before', '?')}% → {local.get('after', '?')}%"
+        print(f"   {r['jd']:<{width}}  {str(_score_value(data.get('ats_match_score'))) + '%':>5}  "
+              f"{change:>20}  {len(data.get('gaps_flagged') or []):>4}")
+    for r in results:
+        if "error" in r:
+            print(f"   {r['jd']:<{width}}  ❌ {r['error']}")
+    print(f"\n💾 Tailored resumes saved to: {output_dir}/")
+    print("=" * 60)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Resume Tailor Agent")
     parser.add_argument("--resume", required=True, help="Path to base resume .txt")
-    parser.add_argument("--jd", required=True, help="Path to target JD .txt")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--jd", help="Path to target JD .txt")
+    target.add_argument("--jds", nargs="+", help="Batch mode: paths to several JD .txt files")
+    target.add_argument("--jd_folder", help="Batch mode: folder of JD .txt files")
     parser.add_argument("--output", default="tailored_resume.txt", help="Output file for tailored resume")
+    parser.add_argument("--output_dir", default="tailored",
+                        help="Batch mode: folder for the tailored resumes (<jd_stem>.txt)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batch mode: JDs tailored in parallel")
+    parser.add_argument("--llm_keywords", action="store_true",
+                        help="Extract all keywords with the LLM instead of the local taxonomy first")
+    parser.add_argument("--no_stream", action="store_true",
+                        help="Wait for the full response instead of showing the score and rewrites as they arrive")
+    parser.add_argument("--full_rewrite", action="store_true",
+                        help="Send the whole resume and get it all back instead of only the bullets that need work")
     args = parser.parse_args()
+    load_env()
 
-    client = OpenAI(
-        api_key=os.environ.get("XAI_API_KEY"),
-        base_url="https://api.x.ai/v1"
-    )
+    client = get_client()
 
     resume = load_text(args.resume)
-    jd = load_text(args.jd)
-
     print(f"📄 Resume loaded: {args.resume}")
+
+    if not args.jd:
+        jds = load_jds(args.jds, args.jd_folder)
+        if not jds:
+            print(f"❌ Error: No JD .txt files in {args.jd_folder}")
+            return
+        batch_tailor(client, resume, jds, args.output_dir, args.concurrency, local_first=not args.llm_keywords,
+                     full_rewrite=args.full_rewrite)
+        return
+
+    jd = load_jd_text(args.jd)
     print(f"📋 JD loaded: {args.jd}")
 
     # Step 1: Extract keywords
     print("\n🔑 Extracting ATS keywords from JD...")
-    keywords = extract_keywords_from_jd(client, jd)
+    keywords = extract_keywords_from_jd(client, jd, local_first=not args.llm_keywords)
     print(f"   Found: {sum(len(v) for v in keywords.values() if isinstance(v, list))} keywords across {len(keywords)} categories")
 
     # Step 2: Tailor resume
     print("\n✍️  Tailoring your resume... (30-45 seconds)")
-    result = tailor_resume(client, resume, jd, keywords)
+    result = tailor_resume(client, resume, jd, keywords, on_event=None if args.no_stream else print_tailor_event,
+                           full_rewrite=args.full_rewrite)
+    attach_local_scores(result, resume, keywords)
 
     # Step 3: Print report
     print_tailor_report(result, args.output)
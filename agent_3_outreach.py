@@ -11,18 +11,27 @@ Usage:
     # Batch mode: process multiple profiles
     python agent_3_outreach.py --profiles_folder ./profiles/ --your_skills "Selenium, CI/CD"
 
+    # Batch mode, 8 profiles in flight at once
+    python agent_3_outreach.py --profiles_folder ./profiles/ --your_skills "Selenium, CI/CD" --concurrency 8
+
     # With a specific angle (e.g., referral, job interest)
     python agent_3_outreach.py --profile profile.txt --your_skills "..." --angle "job_interest"
 """
 
-from openai import OpenAI
+from __future__ import annotations
+
 import argparse
-import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING
+from llm_cache import cached_completion
+from xai_client import get_client, load_env, print_connection_stats
+from resilience import print_resilience_stats
+from metrics import percentile
 
-# Load environment variables from .env file if it exists
-load_dotenv()
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 def load_text(filepath: str) -> str:
@@ -49,7 +58,8 @@ def generate_outreach(
 
     angle_desc = OUTREACH_ANGLES.get(angle, angle)
 
-    response = client.chat.completions.create(
+    return cached_completion(
+        client,
         model="grok-beta",
         max_tokens=2000,
         messages=[
@@ -95,39 +105,84 @@ Keep all messages:
         ]
     )
 
-    return response.choices[0].message.content
 
+def save_outreach(person_name: str, stem: str, result: str) -> str:
+    output_file = f"outreach_{stem}.txt"
+    with open(output_file, "w") as f:
+        f.write(f"OUTREACH MESSAGES FOR: {person_name}\n")
+        f.write("="*60 + "\n\n")
+        f.write(result)
+    return output_file
 
-def batch_outreach(profiles_folder: str, your_skills: str, angle: str, your_name: str):
-    client = OpenAI(
-        api_key=os.environ.get("XAI_API_KEY"),
-        base_url="https://api.x.ai/v1"
-    )
-    profiles = list(Path(profiles_folder).glob("*.txt"))
 
-    print(f"\n📋 Processing {len(profiles)} profiles from {profiles_folder}")
-    
-    results = []
-    for profile_path in profiles:
+def batch_outreach(profiles_folder: str, your_skills: str, angle: str, your_name: str, concurrency: int = 1):
+    """Draft outreach for every profile in the folder, `concurrency` profiles at a time.
+
+    Each outreach_<stem>.txt is written as soon as its profile finishes; console
+    output is printed in profile order. A failed profile is reported and skipped.
+    """
+    client = get_client()
+    profiles = sorted(Path(profiles_folder).glob("*.txt"))
+    concurrency = max(1, concurrency)
+
+    print(f"\n📋 Processing {len(profiles)} profiles from {profiles_folder} (concurrency: {concurrency})")
+
+    def work(profile_path: Path) -> dict:
         person_name = profile_path.stem.replace("_", " ").title()
-        print(f"\n{'='*50}")
-        print(f"👤 Generating outreach for: {person_name}")
-        print("="*50)
-        
-        profile_text = load_text(str(profile_path))
-        result = generate_outreach(client, profile_text, your_skills, angle, your_name)
-        
-        print(result)
-        results.append({"person": person_name, "messages": result})
-        
+        started = time.perf_counter()
+        try:
+            profile_text = load_text(str(profile_path))
+            result = generate_outreach(client, profile_text, your_skills, angle, your_name)
+            output_file = save_outreach(person_name, profile_path.stem, result)
+            return {"person": person_name, "messages": result, "file": output_file,
+                    "seconds": time.perf_counter() - started}
+        except Exception as e:
+            return {"person": person_name, "error": str(e), "seconds": time.perf_counter() - started}
+
+    results = [None] * len(profiles)
+    latencies = []
+    failed = 0
+    next_to_print = 0
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(work, p): i for i, p in enumerate(profiles)}
+        for done_count, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            results[i] = future.result()
+            latencies.append(results[i]["seconds"])
+            if "error" in results[i]:
+                failed += 1
+
+            # Print every finished profile whose predecessors are already printed
+            while next_to_print < len(results) and results[next_to_print] is not None:
+                r = results[next_to_print]
+                print(f"\n{'='*50}")
+                print(f"👤 Outreach for: {r['person']}")
+                print("="*50)
+                if "error" in r:
+                    print(f"❌ Failed: {r['error']}")
+                else:
+                    print(r["messages"])
+                    print(f"\n💾 Messages saved to: {r['file']}")
+                next_to_print += 1
+
+            elapsed = time.perf_counter() - t0
+            rate = done_count / elapsed * 60 if elapsed else 0.0
+            print(f"\n⏱️  [{done_count}/{len(profiles)}] {rate:.1f} profiles/min | "
+                  f"p50 {percentile(latencies, 50):.1f}s | p95 {percentile(latencies, 95):.1f}s | "
+                  f"{failed} failed", flush=True)
+
+    if failed:
+        print(f"\n⚠️  {failed} of {len(profiles)} profiles failed — rerun to retry them")
+    print_connection_stats()
+    print_resilience_stats()
+
     return results
 
 
 def single_outreach(profile_path: str, your_skills: str, angle: str, your_name: str):
-    client = OpenAI(
-        api_key=os.environ.get("XAI_API_KEY"),
-        base_url="https://api.x.ai/v1"
-    )
+    client = get_client()
     profile_text = load_text(profile_path)
     
     person_name = Path(profile_path).stem.replace("_", " ").title()
@@ -139,20 +194,13 @@ def single_outreach(profile_path: str, your_skills: str, angle: str, your_name:
     print(result)
 
     # Save to file
-    output_file = f"outreach_{Path(profile_path).stem}.txt"
-    with open(output_file, "w") as f:
-        f.write(f"OUTREACH MESSAGES FOR: {person_name}\n")
-        f.write("="*60 + "\n\n")
-        f.write(result)
+    output_file = save_outreach(person_name, Path(profile_path).stem, result)
     print(f"\n💾 Messages saved to: {output_file}")
 
 
 def interactive_mode():
     """Run as an interactive CLI agent"""
-    client = OpenAI(
-        api_key=os.environ.get("XAI_API_KEY"),
-        base_url="https://api.x.ai/v1"
-    )
+    client = get_client()
     
     print("\n🤝 LinkedIn Outreach Drafter — Interactive Mode")
     print("="*50)
@@ -194,13 +242,16 @@ def main():
                         choices=list(OUTREACH_ANGLES.keys()),
                         help="Outreach angle/goal")
     parser.add_argument("--your_name", default="QA Professional", help="Your name")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Profiles to draft in parallel in --profiles_folder mode")
     parser.add_argument("--interactive", action="store_true", help="Run in interactive mode")
     args = parser.parse_args()
+    load_env()
 
     if args.interactive:
         interactive_mode()
     elif args.profiles_folder:
-        batch_outreach(args.profiles_folder, args.your_skills, args.angle, args.your_name)
+        batch_outreach(args.profiles_folder, args.your_skills, args.angle, args.your_name, args.concurrency)
     elif args.profile:
         single_outreach(args.profile, args.your_skills, args.angle, args.your_name)
     else:
@@ -19,14 +19,17 @@ Usage:
     python agent_4_interview.py --mode behavioral --role "QA Manager"
 """
 
-from openai import OpenAI
+from __future__ import annotations
+
 import argparse
-import os
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING
+from llm_cache import cached_completion
+from xai_client import get_client, load_env
+from conversation_memory import ConversationMemory
 
-# Load environment variables from .env file if it exists
-load_dotenv()
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 def load_text(filepath: str) -> str:
@@ -63,7 +66,8 @@ def run_mock_interview(
     role: str,
     company: str,
     topic: str = None,
-    persona_key: str = "principal_engineer"
+    persona_key: str = "principal_engineer",
+    memory_turns: int = 4
 ):
     persona = INTERVIEWER_PERSONAS.get(persona_key, INTERVIEWER_PERSONAS["principal_engineer"])
 
@@ -85,7 +89,9 @@ TOPIC FOR TODAY: {topic or f"General {role} interview covering technical depth a
 
 Start the interview now. Introduce yourself briefly, then ask Question 1."""
 
-    conversation_history = [{"role": "system", "content": system_prompt}]
+    # Last `memory_turns` exchanges verbatim, older ones folded into a running summary
+    memory = ConversationMemory(client, system_prompt, keep_turns=memory_turns)
+    scorecard = []
 
     print(f"\n🎙️  MOCK INTERVIEW SESSION")
     print(f"   Role: {role} | Company: {company}")
@@ -96,60 +102,83 @@ Start the interview now. Introduce yourself briefly, then ask Question 1."""
     print("="*60 + "\n")
 
     # Initial message
-    initial_response = client.chat.completions.create(
+    interviewer_msg = cached_completion(
+        client,
         model="grok-beta",
         max_tokens=500,
-        messages=conversation_history + [{"role": "user", "content": "Start the interview."}]
+        messages=memory.messages([{"role": "user", "content": "Start the interview."}])
     )
-
-    interviewer_msg = initial_response.choices[0].message.content
     print(f"🧑‍💼 Interviewer: {interviewer_msg}\n")
-    conversation_history.append({"role": "user", "content": "Start the interview."})
-    conversation_history.append({"role": "assistant", "content": interviewer_msg})
+    memory.add("user", "Start the interview.")
+    memory.add("assistant", interviewer_msg)
 
     while True:
         candidate_input = input("You: ").strip()
 
         if candidate_input.lower() == "quit":
             print("\n📝 Requesting final assessment...")
-            conversation_history.append({"role": "user", "content": candidate_input})
-            conversation_history.append({"role": "user", "content": "Give me your final assessment. Hire/No Hire and why. Be specific."})
+            memory.add("user", candidate_input)
+            memory.flush()
 
-            final = client.chat.completions.create(
+            final = cached_completion(
+                client,
                 model="grok-beta",
                 max_tokens=800,
-                messages=conversation_history
+                messages=memory.messages([{"role": "user", "content": f"""Here is the complete scorecard of every question in this interview:
+
+{format_scorecard(scorecard)}
+
+Give me your final assessment. Hire/No Hire and why. Be specific."""}])
             )
-            print(f"\n🧑‍💼 Final Assessment:\n{final.choices[0].message.content}")
+            print(f"\n🧑‍💼 Final Assessment:\n{final}")
+            memory.close()
             break
 
         if candidate_input.lower() == "hint":
-            hint_messages = conversation_history + [
-                {"role": "user", "content": "Give me a hint — what key points should a strong candidate cover in their answer to your last question? Don't give the full answer, just the framework."}
-            ]
-            hint = client.chat.completions.create(
+            hint = cached_completion(
+                client,
                 model="grok-beta",
                 max_tokens=400,
-                messages=hint_messages
+                messages=memory.messages([
+                    {"role": "user", "content": "Give me a hint — what key points should a strong candidate cover in their answer to your last question? Don't give the full answer, just the framework."}
+                ])
             )
-            print(f"\n💡 Hint: {hint.choices[0].message.content}\n")
+            print(f"\n💡 Hint: {hint}\n")
             continue
 
         if candidate_input.lower() == "skip":
             candidate_input = "I'll skip this question and move to the next."
 
-        conversation_history.append({"role": "user", "content": candidate_input})
+        question = interviewer_msg
+        memory.add("user", candidate_input)
 
-        response = client.chat.completions.create(
+        interviewer_msg = cached_completion(
+            client,
             model="grok-beta",
             max_tokens=600,
-            messages=conversation_history
+            messages=memory.messages()
         )
+        memory.add("assistant", interviewer_msg)
+        scorecard.append({"question": question, "answer": candidate_input, "feedback": interviewer_msg})
+
+        print(f"\n🧑‍💼 Interviewer: {interviewer_msg}\n")
 
-        interviewer_response = response.choices[0].message.content
-        conversation_history.append({"role": "assistant", "content": interviewer_response})
 
-        print(f"\n🧑‍💼 Interviewer: {interviewer_response}\n")
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def format_scorecard(scorecard: list) -> str:
+    """Compact record of every question, answer and the feedback given"""
+    if not scorecard:
+        return "(no questions answered)"
+    return "\n\n".join(
+        f"Q{i}: {_clip(entry['question'], 300)}\n"
+        f"ANSWER: {_clip(entry['answer'], 600)}\n"
+        f"FEEDBACK: {_clip(entry['feedback'], 300)}"
+        for i, entry in enumerate(scorecard, 1)
+    )
 
 
 def run_code_review(client: OpenAI, code: str, language: str = "python"):
@@ -159,7 +188,8 @@ def run_code_review(client: OpenAI, code: str, language: str = "python"):
     print("="*60)
     print("Analyzing your code as a Staff/Principal Engineer would...\n")
 
-    response = client.chat.completions.create(
+    review = cached_completion(
+        client,
         model="grok-beta",
         max_tokens=4000,
         messages=[
@@ -193,7 +223,7 @@ CODE TO REVIEW ({language}):
         ]
     )
 
-    print(response.choices[0].message.content)
+    print(review)
 
 
 def run_behavioral_prep(client: OpenAI, role: str):
@@ -202,7 +232,8 @@ def run_behavioral_prep(client: OpenAI, role: str):
     print("\n🎯 BEHAVIORAL INTERVIEW PREP")
     print("="*60)
 
-    response = client.chat.completions.create(
+    questions = cached_completion(
+        client,
         model="grok-beta",
         max_tokens=3000,
         messages=[
@@ -230,7 +261,8 @@ Focus on these themes:
         ]
     )
 
-    print(response.choices[0].message.content)
+    print(questions)
+    return questions
 
 
 def run_system_design(client: OpenAI, role: str, system_to_design: str):
@@ -239,7 +271,8 @@ def run_system_design(client: OpenAI, role: str, system_to_design: str):
     print(f"\n🏗️  SYSTEM DESIGN INTERVIEW: {system_to_design}")
     print("="*60)
 
-    response = client.chat.completions.create(
+    challenge = cached_completion(
+        client,
         model="grok-beta",
         max_tokens=3000,
         messages=[
@@ -266,7 +299,7 @@ PART 5 — FOLLOW-UP QUESTIONS TO PROBE DEEPER"""}
         ]
     )
 
-    print(response.choices[0].message.content)
+    print(challenge)
 
 
 def main():
@@ -280,17 +313,17 @@ def main():
     parser.add_argument("--persona", default="principal_engineer",
                        choices=list(INTERVIEWER_PERSONAS.keys()),
                        help="Interviewer persona")
+    parser.add_argument("--memory_turns", type=int, default=4,
+                       help="Interview exchanges kept verbatim; older ones are summarized")
     parser.add_argument("--code", help="Path to code file for review")
     parser.add_argument("--system", help="System to design (for system_design mode)")
     args = parser.parse_args()
+    load_env()
 
-    client = OpenAI(
-        api_key=os.environ.get("XAI_API_KEY"),
-        base_url="https://api.x.ai/v1"
-    )
+    client = get_client()
 
     if args.mode == "interview":
-        run_mock_interview(client, args.role, args.company, args.topic, args.persona)
+        run_mock_interview(client, args.role, args.company, args.topic, args.persona, args.memory_turns)
 
     elif args.mode == "code_review":
         if not args.code:
@@ -4,25 +4,42 @@ Flask backend for Career Agents UI
 Securely handles API key from environment variables and proxies requests to xAI
 """
 
+import json
 import os
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from openai import OpenAI
+from jobs import JobNotFound, QueueFull, get_jobs
+from llm_cache import add_call_observer, cached_completion, cached_stream, get_cache
+from metrics import agent_context, agent_label, observe_llm_call, render as render_metrics, track_request
+from xai_client import connection_stats, get_client, load_env
+from resilience import resilience_stats
+from session_store import SessionBusy, SessionNotFound, get_store
+from singleflight import SingleFlight, StreamFlight, coalescing_enabled, flight_key
+from agent_2_resume_tailor import attach_local_scores, extract_keywords_from_jd, stream_tailor_resume
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for local development
 
 # Initialize xAI client
+load_env()
 XAI_API_KEY = os.environ.get("XAI_API_KEY")
 
 if not XAI_API_KEY:
     print("⚠️  WARNING: XAI_API_KEY not found in environment variables!")
     print("   Set it with: export XAI_API_KEY='your-key-here'")
 
-client = OpenAI(
-    api_key=XAI_API_KEY,
-    base_url="https://api.x.ai/v1"
-) if XAI_API_KEY else None
+# Shared pooled client: keep-alive connections are reused across requests
+client = get_client() if XAI_API_KEY else None
+
+# Per-call latency/token telemetry for /api/metrics
+add_call_observer(observe_llm_call)
+
+# Identical concurrent chats (a double-submit, a popular starter prompt) share one upstream call
+chat_flights = SingleFlight()
+stream_flights = StreamFlight()
+
+# Server-side chat history: the UI sends a session id and only the new message
+sessions = get_store()
 
 
 @app.route('/')
@@ -36,6 +53,15 @@ def chat():
     """
     Proxy endpoint for xAI chat completions
     Keeps the API key secure on the server
+
+    With "stream": true in the body, the reply is relayed as Server-Sent Events
+    in OpenAI chunk format, terminated by "data: [DONE]".
+
+    Identical requests already in flight are joined instead of sent again;
+    "coalesce": false asks for a fresh completion (no sharing, no cache).
+
+    With "session_id" (from POST /api/sessions) send only the new "message";
+    the server adds the system prompt and history and records the reply.
     """
     if not client:
         return jsonify({
@@ -44,42 +70,306 @@ def chat():
             }
         }), 500
 
-    try:
-        data = request.json
+    data = request.json or {}
+
+    # Extract request parameters
+    model = data.get('model', 'grok-beta')
+    messages = data.get('messages', [])
+    max_tokens = data.get('max_tokens', 2000)
+    temperature = data.get('temperature', 0.7)
+    fresh = data.get('coalesce') is False
+    share = not fresh and coalescing_enabled()
+
+    session = None
+    if data.get('session_id'):
+        user_content = data.get('message')
+        if not isinstance(user_content, str) or not user_content:
+            return jsonify({'error': {'message': '"message" is required with "session_id".'}}), 400
+        try:
+            session, messages = sessions.begin_turn(data['session_id'], user_content)
+        except SessionNotFound:
+            return jsonify({'error': {'message': 'Session not found or expired; create a new one.',
+                                      'code': 'session_not_found'}}), 404
+        except SessionBusy as e:
+            return jsonify({'error': {'message': str(e), 'code': 'session_busy'}}), 409
+
+        def finish(reply=None):
+            sessions.end_turn(session, user_content, reply)
+
+    agent = agent_label(data.get('agent', '') or (session.agent if session else ''), messages)
 
-        # Extract request parameters
-        model = data.get('model', 'grok-beta')
-        messages = data.get('messages', [])
-        max_tokens = data.get('max_tokens', 2000)
-        temperature = data.get('temperature', 0.7)
+    if data.get('stream'):
+        return stream_chat(model, messages, max_tokens, temperature, agent, fresh, share,
+                           on_finish=finish if session else None)
 
-        # Make request to xAI
-        response = client.chat.completions.create(
+    with track_request('/api/chat') as info, agent_context(agent):
+        info['model'] = model
+        try:
+            # Make request to xAI (served from the shared cache when possible)
+            def call():
+                return cached_completion(
+                    client,
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    use_cache=not fresh
+                )
+
+            content = None
+            try:
+                if share:
+                    content = chat_flights.do(flight_key(model, messages, max_tokens, temperature), call)
+                else:
+                    content = call()
+            finally:
+                if session:
+                    finish(content)
+
+            # Return response in OpenAI format
+            return jsonify({
+                'choices': [
+                    {
+                        'message': {
+                            'role': 'assistant',
+                            'content': content
+                        }
+                    }
+                ]
+            })
+
+        except Exception as e:
+            info['status'] = 500
+            return jsonify({
+                'error': {
+                    'message': str(e)
+                }
+            }), 500
+
+
+def sse_event(payload) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def stream_chat(model, messages, max_tokens, temperature, agent='', fresh=False, share=False, on_finish=None):
+    """Relay upstream deltas as SSE; a client disconnect closes the upstream stream
+    (a shared stream is closed when its last client disconnects).
+
+    on_finish(reply) is called once at the end: with the full text, or with
+    None if the stream failed or the client went away.
+    """
+    def open_stream():
+        return cached_stream(
+            client,
             model=model,
             messages=messages,
             max_tokens=max_tokens,
-            temperature=temperature
+            temperature=temperature,
+            use_cache=not fresh
         )
 
-        # Return response in OpenAI format
+    if share:
+        deltas = stream_flights.stream(flight_key(model, messages, max_tokens, temperature, stream=True),
+                                       open_stream)
+    else:
+        deltas = open_stream()
+
+    def generate():
+        # Timed from the first byte served to the last, since the view itself returns immediately
+        with track_request('/api/chat') as info, agent_context(agent):
+            info['model'] = model
+            parts, reply = [], None
+            try:
+                for delta in deltas:
+                    parts.append(delta)
+                    yield sse_event({'choices': [{'delta': {'content': delta}}]})
+                reply = "".join(parts)
+                yield "data: [DONE]\n\n"
+            except Exception as e:
+                info['status'] = 500
+                yield sse_event({'error': {'message': str(e)}})
+            finally:
+                # Runs on GeneratorExit too, i.e. when the browser goes away mid-stream
+                deltas.close()
+                if on_finish:
+                    on_finish(reply)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/tailor', methods=['POST'])
+def tailor():
+    """
+    Structured resume tailoring, streamed as Server-Sent Events
+
+    Each completed top-level field and each finished bullet rewrite is sent as
+    soon as the model closes it, then the full result (with local ATS scores).
+    """
+    if not client:
         return jsonify({
-            'choices': [
-                {
-                    'message': {
-                        'role': 'assistant',
-                        'content': response.choices[0].message.content
-                    }
-                }
-            ]
-        })
+            'error': {
+                'message': 'XAI_API_KEY not configured on server. Please set the environment variable.'
+            }
+        }), 500
+
+    data = request.json or {}
+    resume = data.get('resume', '')
+    jd = data.get('jd', '')
+    if not resume or not jd:
+        return jsonify({'error': {'message': 'Both "resume" and "jd" are required.'}}), 400
+
+    def generate():
+        events = None
+        with track_request('/api/tailor') as info, agent_context('tailor'):
+            info['model'] = 'grok-beta'
+            try:
+                keywords = data.get('keywords') or extract_keywords_from_jd(client, jd)
+                events = stream_tailor_resume(client, resume, jd, keywords)
+                for event in events:
+                    if event[0] == 'field':
+                        yield sse_event({'event': 'field', 'key': event[1], 'value': event[2]})
+                    elif event[0] == 'item':
+                        yield sse_event({'event': 'item', 'key': event[1], 'index': event[2], 'value': event[3]})
+                    elif event[0] == 'reset':
+                        yield sse_event({'event': 'reset', 'reason': event[1]})
+                    else:
+                        result = attach_local_scores(event[1], resume, keywords)
+                        yield sse_event({'event': 'done', 'result': result})
+                yield "data: [DONE]\n\n"
+            except Exception as e:
+                info['status'] = 500
+                yield sse_event({'error': {'message': str(e)}})
+            finally:
+                if events is not None:
+                    events.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """
+    Start a server-side conversation: {"agent", "system", "messages" (optional
+    history to seed it with)}. Returns the session id to pass to /api/chat.
+    """
+    data = request.json or {}
+    try:
+        session = sessions.create(agent=data.get('agent', ''), system=data.get('system', ''),
+                                  history=data.get('messages'))
+    except ValueError as e:
+        return jsonify({'error': {'message': str(e)}}), 400
+    return jsonify({
+        'session_id': session.id,
+        'messages': len(session.turns),
+        'max_chars': sessions.max_chars,
+        'idle_timeout_seconds': sessions.idle_seconds
+    }), 201
+
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    """Forget a conversation (the UI's "clear chat")"""
+    return jsonify({'deleted': sessions.delete(session_id)})
+
+
+@app.route('/api/sessions', methods=['GET'])
+def session_stats():
+    """Session store size and eviction counters"""
+    return jsonify(sessions.stats())
 
-    except Exception as e:
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue a full pipeline run (gap analysis, tailoring, outreach, interview prep)
+    on the background worker pool: {"resume", "jd", "profile" (optional)}.
+    Returns 202 with the job; poll GET /api/jobs/<id> or stream its events.
+    """
+    if not client:
         return jsonify({
             'error': {
-                'message': str(e)
+                'message': 'XAI_API_KEY not configured on server. Please set the environment variable.'
             }
         }), 500
 
+    data = request.json or {}
+    resume = data.get('resume', '')
+    jd = data.get('jd', '')
+    if not resume or not jd:
+        return jsonify({'error': {'message': 'Both "resume" and "jd" are required.'}}), 400
+    try:
+        job = get_jobs().submit(resume, jd, data.get('profile') or None)
+    except QueueFull as e:
+        return jsonify({'error': {'message': str(e)}}), 503, {'Retry-After': '30'}
+    return jsonify(job), 202, {'Location': f"/api/jobs/{job['id']}"}
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Recent jobs (newest first) and queue counters"""
+    jobs = get_jobs()
+    return jsonify({'jobs': jobs.recent(), 'stats': jobs.stats()})
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Job status, per-step progress, summary and available artifacts"""
+    try:
+        return jsonify(get_jobs().get(job_id))
+    except JobNotFound:
+        return jsonify({'error': {'message': 'Job not found.'}}), 404
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Job progress as Server-Sent Events: past events are replayed, then each
+    step start/finish is sent as it happens, ending with "data: [DONE]".
+    """
+    jobs = get_jobs()
+    try:
+        jobs.get(job_id)
+    except JobNotFound:
+        return jsonify({'error': {'message': 'Job not found.'}}), 404
+
+    def generate():
+        index, finished = 0, False
+        while not finished:
+            events, finished = jobs.events_since(job_id, index, timeout=15)
+            index += len(events)
+            for event in events:
+                yield sse_event(event)
+            if not events:
+                yield ": keep-alive\n\n"
+        yield "data: [DONE]\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/jobs/<job_id>/artifacts/<name>', methods=['GET'])
+def job_artifact(job_id, name):
+    """A job's output: gap (JSON), tailored_resume, outreach, interview_prep or log"""
+    try:
+        path = get_jobs().artifact_path(job_id, name)
+    except JobNotFound:
+        return jsonify({'error': {'message': 'Job not found.'}}), 404
+    if path is None:
+        return jsonify({'error': {'message': f'No "{name}" artifact for this job.'}}), 404
+    mimetype = 'application/json' if path.endswith('.json') else 'text/plain; charset=utf-8'
+    return send_file(path, mimetype=mimetype)
+
 
 @app.route('/api/health', methods=['GET'])
 def health():
@@ -90,11 +380,46 @@ def health():
     })
 
 
-if __name__ == '__main__':
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    """LLM response cache hit/miss statistics"""
+    cache = get_cache()
+    return jsonify({
+        'enabled': cache is not None,
+        'stats': cache.stats() if cache else {}
+    })
+
+
+@app.route('/api/connections', methods=['GET'])
+def connections():
+    """Upstream connection-pool reuse statistics"""
+    return jsonify(connection_stats())
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Request, upstream latency, token, cache and resilience metrics in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/resilience', methods=['GET'])
+def resilience():
+    """Retry, hedge and circuit-breaker counters for upstream calls"""
+    return jsonify(resilience_stats())
+
+
+def main():
     port = int(os.environ.get('PORT', 5000))
     print(f"\n🚀 Career Agents UI Server")
     print(f"   → Running on http://localhost:{port}")
     print(f"   → API Key configured: {bool(XAI_API_KEY)}")
     print(f"\n   Press Ctrl+C to stop\n")
 
+    if os.environ.get('WERKZEUG_RUN_MAIN'):
+        get_jobs()  # serving process (not the reloader): resume jobs interrupted by the last restart
+
     app.run(host='0.0.0.0', port=port, debug=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+ASGI Server for Career Agents UI
+================================
+Production serving mode for the web UI. Same routes and response formats as
+app.py (`/`, `/api/chat` incl. SSE streaming, `/api/jobs`, `/api/health`, ...), but every
+request runs as a coroutine on one event loop with the async xAI client, so an
+in-flight chat holds a socket, not a worker thread.
+
+Backpressure: at most CHAT_MAX_CONCURRENCY chats are sent upstream at once and
+up to CHAT_MAX_QUEUE more wait for a slot (for at most CHAT_QUEUE_TIMEOUT
+seconds). Anything beyond that is answered straight away with 503 and a
+Retry-After header instead of piling up in memory. A client that disconnects
+cancels its upstream call.
+
+Configuration (environment variables):
+    PORT                  listen port (default: 5000)
+    CHAT_MAX_CONCURRENCY  concurrent upstream chats (default: 256)
+    CHAT_MAX_QUEUE        chats allowed to wait for a slot (default: 512)
+    CHAT_QUEUE_TIMEOUT    seconds a chat may wait for a slot (default: 30)
+    CHAT_RETRY_AFTER      Retry-After seconds sent with a 503 (default: 5)
+    MAX_BODY_KB           request body limit in KB (default: 1024)
+    XAI_ASYNC_MAX_CONNECTIONS  upstream connection pool (see xai_client.py)
+
+Usage:
+    python asgi_app.py --port 5000
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from agent_2_resume_tailor import attach_local_scores, extract_keywords_from_jd, stream_tailor_resume
+from jobs import JobNotFound, QueueFull, get_jobs
+from llm_cache import add_call_observer, async_cached_completion, async_cached_stream, get_cache
+from metrics import (agent_context, agent_label, counter, gauge, observe_llm_call,
+                     render as render_metrics, track_request)
+from resilience import resilience_stats
+from session_store import SessionBusy, SessionNotFound, get_store
+from singleflight import AsyncSingleFlight, AsyncStreamFlight, coalescing_enabled, flight_key
+from xai_client import close_async_client, connection_stats, get_async_client, get_client, load_env
+
+load_env()
+XAI_API_KEY = os.environ.get("XAI_API_KEY")
+UI_FILE = Path(__file__).resolve().parent / "career_agents_ui.html"
+
+NO_KEY_ERROR = {'error': {'message': 'XAI_API_KEY not configured on server. Please set the environment variable.'}}
+SSE_HEADERS = [(b"content-type", b"text/event-stream; charset=utf-8"), (b"cache-control", b"no-cache"),
+               (b"x-accel-buffering", b"no")]
+CORS_HEADERS = [(b"access-control-allow-origin", b"*")]
+
+CHAT_QUEUED = gauge("career_agents_chat_queued_requests", "Chats waiting for an upstream slot")
+CHAT_REJECTED = counter("career_agents_chat_rejected_total", "Chats answered 503 because the queue was full")
+
+add_call_observer(observe_llm_call)
+
+chat_flights = AsyncSingleFlight()
+stream_flights = AsyncStreamFlight()
+sessions = get_store()
+
+
+# How often an SSE job-progress stream checks for new events
+JOB_POLL_INTERVAL = 0.5
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Overloaded(Exception):
+    """No upstream slot became free in time"""
+
+
+class ClientDisconnected(Exception):
+    """The client went away before sending its whole request"""
+
+
+class ChatLimiter:
+    """Bounded concurrency with a bounded, time-limited wait queue"""
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            CHAT_REJECTED.inc(reason="queue_full")
+            raise Overloaded("queue full")
+        self.waiting += 1
+        CHAT_QUEUED.inc()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            CHAT_REJECTED.inc(reason="queue_timeout")
+            raise Overloaded("timed out waiting for a slot") from None
+        finally:
+            self.waiting -= 1
+            CHAT_QUEUED.dec()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+
+limiter = ChatLimiter(
+    max_concurrency=_env_int("CHAT_MAX_CONCURRENCY", 256),
+    max_queue=_env_int("CHAT_MAX_QUEUE", 512),
+    queue_timeout=float(os.environ.get("CHAT_QUEUE_TIMEOUT", 30)),
+)
+RETRY_AFTER = _env_int("CHAT_RETRY_AFTER", 5)
+MAX_BODY = _env_int("MAX_BODY_KB", 1024) * 1024
+
+
+# ── Response helpers ───────────────────────────────────────
+async def send_response(send, status: int, body: bytes, content_type: bytes, headers: list = ()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+                   + CORS_HEADERS + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_json(send, status: int, payload, headers: list = ()):
+    await send_response(send, status, json.dumps(payload).encode("utf-8"), b"application/json", headers)
+
+
+async def send_overloaded(send):
+    await send_json(send, 503, {'error': {'message': 'Server is busy, please retry shortly.'}},
+                    [(b"retry-after", str(RETRY_AFTER).encode())])
+
+
+async def start_sse(send):
+    await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS + CORS_HEADERS})
+
+
+async def send_sse(send, payload):
+    await send({"type": "http.response.body", "body": f"data: {json.dumps(payload)}\n\n".encode("utf-8"),
+                "more_body": True})
+
+
+async def end_sse(send):
+    await send({"type": "http.response.body", "body": b"data: [DONE]\n\n", "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def read_json(receive):
+    """Request body as JSON ({} when empty); None if it exceeds MAX_BODY"""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnected
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    body = b"".join(chunks)
+    return json.loads(body) if body.strip() else {}
+
+
+# ── Routes ─────────────────────────────────────────────────
+async def chat(data: dict, send):
+    """Same contract as app.py's /api/chat: "stream", "coalesce" and "session_id" + "message" """
+    if not XAI_API_KEY:
+        return await send_json(send, 500, NO_KEY_ERROR)
+
+    model = data.get('model', 'grok-beta')
+    messages = data.get('messages', [])
+    max_tokens = data.get('max_tokens', 2000)
+    temperature = data.get('temperature', 0.7)
+
+    session, user_content, reply = None, data.get('message'), None
+    if data.get('session_id'):
+        if not isinstance(user_content, str) or not user_content:
+            return await send_json(send, 400, {'error': {'message': '"message" is required with "session_id".'}})
+        try:
+            session, messages = sessions.begin_turn(data['session_id'], user_content)
+        except SessionNotFound:
+            return await send_json(send, 404, {'error': {'message': 'Session not found or expired; create a new one.',
+                                                         'code': 'session_not_found'}})
+        except SessionBusy as e:
+            return await send_json(send, 409, {'error': {'message': str(e), 'code': 'session_busy'}})
+
+    agent = agent_label(data.get('agent', '') or (session.agent if session else ''), messages)
+    fresh = data.get('coalesce') is False
+    share = not fresh and coalescing_enabled()
+    client = get_async_client()
+    params = dict(model=model, messages=messages, max_tokens=max_tokens, temperature=temperature,
+                  use_cache=not fresh)
+
+    with track_request('/api/chat') as info, agent_context(agent):
+        info['model'] = model
+        try:
+            async with limiter.slot():
+                if data.get('stream'):
+                    await start_sse(send)
+                    if share:
+                        deltas = stream_flights.stream(
+                            flight_key(model, messages, max_tokens, temperature, stream=True),
+                            lambda: async_cached_stream(client, **params))
+                    else:
+                        deltas = async_cached_stream(client, **params)
+                    parts = []
+                    try:
+                        async for delta in deltas:
+                            parts.append(delta)
+                            await send_sse(send, {'choices': [{'delta': {'content': delta}}]})
+                        reply = "".join(parts)
+                    except Exception as e:
+                        info['status'] = 500
+                        await send_sse(send, {'error': {'message': str(e)}})
+                        await send({"type": "http.response.body", "body": b""})
+                        return
+                    finally:
+                        await deltas.aclose()
+                    return await end_sse(send)
+
+                try:
+                    if share:
+                        content = await chat_flights.do(flight_key(model, messages, max_tokens, temperature),
+                                                        lambda: async_cached_completion(client, **params))
+                    else:
+                        content = await async_cached_completion(client, **params)
+                    reply = content
+                except Exception as e:
+                    info['status'] = 500
+                    return await send_json(send, 500, {'error': {'message': str(e)}})
+                await send_json(send, 200, {'choices': [{'message': {'role': 'assistant', 'content': content}}]})
+        except Overloaded:
+            info['status'] = 503
+            await send_overloaded(send)
+        except asyncio.CancelledError:
+            info['status'] = 499   # client closed the connection
+            raise
+        finally:
+            if session:
+                sessions.end_turn(session, user_content, reply)
+
+
+async def tailor(data: dict, send):
+    """app.py's /api/tailor; the agent code is synchronous, so each step runs in a worker thread"""
+    if not XAI_API_KEY:
+        return await send_json(send, 500, NO_KEY_ERROR)
+    resume = data.get('resume', '')
+    jd = data.get('jd', '')
+    if not resume or not jd:
+        return await send_json(send, 400, {'error': {'message': 'Both "resume" and "jd" are required.'}})
+
+    client = get_client()
+    with track_request('/api/tailor') as info, agent_context('tailor'):
+        info['model'] = 'grok-beta'
+        events = None
+        try:
+            async with limiter.slot():
+                await start_sse(send)
+                try:
+                    keywords = data.get('keywords') or await asyncio.to_thread(extract_keywords_from_jd, client, jd)
+                    events = stream_tailor_resume(client, resume, jd, keywords)
+                    while (event := await asyncio.to_thread(next, events, None)) is not None:
+                        if event[0] == 'field':
+                            await send_sse(send, {'event': 'field', 'key': event[1], 'value': event[2]})
+                        elif event[0] == 'item':
+                            await send_sse(send, {'event': 'item', 'key': event[1], 'index': event[2],
+                                                  'value': event[3]})
+                        elif event[0] == 'reset':
+                            await send_sse(send, {'event': 'reset', 'reason': event[1]})
+                        else:
+                            result = attach_local_scores(event[1], resume, keywords)
+                            await send_sse(send, {'event': 'done', 'result': result})
+                except Exception as e:
+                    info['status'] = 500
+                    await send_sse(send, {'error': {'message': str(e)}})
+                    return await send({"type": "http.response.body", "body": b""})
+                await end_sse(send)
+        except Overloaded:
+            info['status'] = 503
+            await send_overloaded(send)
+        except asyncio.CancelledError:
+            info['status'] = 499
+            raise
+        finally:
+            if events is not None:
+                await asyncio.to_thread(_close_generator, events)
+
+
+def _close_generator(gen):
+    try:
+        gen.close()
+    except ValueError:
+        pass   # still running in a cancelled worker thread; it is closed when garbage collected
+
+
+async def create_job(data: dict, send):
+    """app.py's POST /api/jobs; the pipeline runs on the job worker threads, not the event loop"""
+    if not XAI_API_KEY:
+        return await send_json(send, 500, NO_KEY_ERROR)
+    resume = data.get('resume', '')
+    jd = data.get('jd', '')
+    if not resume or not jd:
+        return await send_json(send, 400, {'error': {'message': 'Both "resume" and "jd" are required.'}})
+    try:
+        job = await asyncio.to_thread(get_jobs().submit, resume, jd, data.get('profile') or None)
+    except QueueFull as e:
+        return await send_json(send, 503, {'error': {'message': str(e)}}, [(b"retry-after", b"30")])
+    await send_json(send, 202, job, [(b"location", f"/api/jobs/{job['id']}".encode())])
+
+
+async def job_events(job_id: str, send):
+    """app.py's GET /api/jobs/<id>/events, polling instead of holding a thread per stream"""
+    jobs = get_jobs()
+    index, finished, idle = 0, False, 0.0
+    await start_sse(send)
+    while not finished:
+        events, finished = jobs.events_since(job_id, index)
+        index += len(events)
+        for event in events:
+            await send_sse(send, event)
+        if not events and not finished:
+            idle += JOB_POLL_INTERVAL
+            if idle >= 15:
+                idle = 0.0
+                await send({"type": "http.response.body", "body": b": keep-alive\n\n", "more_body": True})
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+        else:
+            idle = 0.0
+    await end_sse(send)
+
+
+async def job_route(path: str, send):
+    """GET /api/jobs, /api/jobs/<id>, /api/jobs/<id>/events, /api/jobs/<id>/artifacts/<name>"""
+    jobs = get_jobs()
+    parts = path[len('/api/jobs'):].strip('/').split('/')
+    try:
+        if parts == ['']:
+            return await send_json(send, 200, {'jobs': jobs.recent(), 'stats': jobs.stats()})
+        job_id = parts[0]
+        if len(parts) == 1:
+            return await send_json(send, 200, jobs.get(job_id))
+        if parts[1:] == ['events']:
+            jobs.get(job_id)
+            return await job_events(job_id, send)
+        if len(parts) == 3 and parts[1] == 'artifacts':
+            artifact = jobs.artifact_path(job_id, parts[2])
+            if artifact is None:
+                return await send_json(send, 404, {'error': {'message': f'No "{parts[2]}" artifact for this job.'}})
+            body = await asyncio.to_thread(Path(artifact).read_bytes)
+            content_type = b"application/json" if artifact.endswith('.json') else b"text/plain; charset=utf-8"
+            return await send_response(send, 200, body, content_type)
+    except JobNotFound:
+        return await send_json(send, 404, {'error': {'message': 'Job not found.'}})
+    await send_json(send, 404, {'error': {'message': 'Not found'}})
+
+
+async def get_route(path: str, send):
+    if path == '/':
+        return await send_response(send, 200, UI_FILE.read_bytes(), b"text/html; charset=utf-8")
+    if path == '/api/health':
+        return await send_json(send, 200, {'status': 'ok', 'api_key_configured': bool(XAI_API_KEY)})
+    if path == '/api/cache':
+        cache = get_cache()
+        stats = await asyncio.to_thread(cache.stats) if cache else {}
+        return await send_json(send, 200, {'enabled': cache is not None, 'stats': stats})
+    if path == '/api/connections':
+        return await send_json(send, 200, connection_stats())
+    if path == '/api/resilience':
+        return await send_json(send, 200, resilience_stats())
+    if path == '/api/sessions':
+        return await send_json(send, 200, sessions.stats())
+    if path == '/api/jobs' or path.startswith('/api/jobs/'):
+        return await job_route(path, send)
+    if path == '/api/load':
+        return await send_json(send, 200, {'active': limiter.active, 'queued': limiter.waiting,
+                                           'max_concurrency': limiter.max_concurrency,
+                                           'max_queue': limiter.max_queue})
+    if path == '/api/metrics':
+        body = (await asyncio.to_thread(render_metrics)).encode("utf-8")
+        return await send_response(send, 200, body, b"text/plain; version=0.0.4; charset=utf-8")
+    if path in POST_ROUTES:
+        return await send_json(send, 405, {'error': {'message': 'Method not allowed'}})
+    await send_json(send, 404, {'error': {'message': 'Not found'}})
+
+
+async def create_session(data: dict, send):
+    """app.py's POST /api/sessions"""
+    try:
+        session = sessions.create(agent=data.get('agent', ''), system=data.get('system', ''),
+                                  history=data.get('messages'))
+    except ValueError as e:
+        return await send_json(send, 400, {'error': {'message': str(e)}})
+    await send_json(send, 201, {'session_id': session.id, 'messages': len(session.turns),
+                                'max_chars': sessions.max_chars, 'idle_timeout_seconds': sessions.idle_seconds})
+
+
+POST_ROUTES = {'/api/chat': chat, '/api/tailor': tailor, '/api/sessions': create_session, '/api/jobs': create_job}
+
+
+async def _cancel_on_disconnect(receive, task: asyncio.Task, finished: asyncio.Event):
+    # Servers also report "http.disconnect" once the response is complete; that is not a hang-up
+    while (await receive())["type"] != "http.disconnect":
+        pass
+    if not finished.is_set():
+        task.cancel()
+
+
+async def handle_http(scope, receive, send):
+    method, path = scope["method"], scope["path"]
+    if method == "OPTIONS":
+        return await send_response(send, 204, b"", b"text/plain", [
+            (b"access-control-allow-methods", b"GET, POST, DELETE, OPTIONS"),
+            (b"access-control-allow-headers", b"Content-Type"),
+        ])
+    if method in ("GET", "HEAD"):
+        if path.startswith('/api/jobs/') and path.endswith('/events'):
+            # Long-lived stream: stop polling once the client hangs up
+            return await run_until_disconnect(lambda tracked_send: get_route(path, tracked_send), receive, send)
+        return await get_route(path, send)
+    if method == "DELETE" and path.startswith("/api/sessions/"):
+        return await send_json(send, 200, {'deleted': sessions.delete(path[len("/api/sessions/"):])})
+    if path not in POST_ROUTES:
+        return await send_json(send, 404, {'error': {'message': 'Not found'}})
+    if method != "POST":
+        return await send_json(send, 405, {'error': {'message': 'Method not allowed'}})
+
+    try:
+        data = await read_json(receive)
+    except ClientDisconnected:
+        return
+    except (ValueError, UnicodeDecodeError):
+        return await send_json(send, 400, {'error': {'message': 'Request body must be JSON.'}})
+    if data is None:
+        return await send_json(send, 413, {'error': {'message': 'Request body too large.'}})
+
+    # Body fully read: the next message on receive() can only be the disconnect
+    await run_until_disconnect(lambda tracked_send: POST_ROUTES[path](data, tracked_send), receive, send)
+
+
+async def run_until_disconnect(handler, receive, send):
+    """Await handler(send), cancelling it if the client disconnects first"""
+    finished = asyncio.Event()
+
+    async def tracked_send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            finished.set()
+        await send(message)
+
+    watcher = asyncio.create_task(_cancel_on_disconnect(receive, asyncio.current_task(), finished))
+    try:
+        await handler(tracked_send)
+    except asyncio.CancelledError:
+        if not watcher.done():
+            raise   # server shutdown, not a client disconnect
+    finally:
+        watcher.cancel()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await asyncio.to_thread(get_jobs)   # resume jobs interrupted by the last restart
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_client()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "http":
+        await handle_http(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await lifespan(receive, send)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Career Agents UI server (ASGI, for many concurrent users)")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)), help="Port to listen on")
+    parser.add_argument("--log_level", default="warning", help="uvicorn log level")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    print(f"\n🚀 Career Agents UI Server (ASGI)")
+    print(f"   → Running on http://localhost:{args.port}")
+    print(f"   → API Key configured: {bool(XAI_API_KEY)}")
+    print(f"   → Up to {limiter.max_concurrency} concurrent chats, {limiter.max_queue} queued")
+    print(f"\n   Press Ctrl+C to stop\n")
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Local ATS Match Scorer
+======================
+Deterministic, millisecond-fast ATS score for any resume text against the
+keyword dict produced by `extract_keywords_from_jd` (hard_skills,
+methodologies, certifications, ...). No LLM call, so it can check the
+model's own `ats_match_score` and score thousands of resume/JD pairs.
+
+- Text is normalized (lowercase, punctuation folded to spaces) so
+  "CI/CD", "ci-cd" style variants line up with the keyword list.
+- All keyword phrases are matched in one pass with an Aho-Corasick automaton,
+  on whole-word boundaries.
+- Category coverage is combined with per-category weights into a 0-100 score.
+
+Usage:
+    python ats_scorer.py --resume my_resume.txt --keywords jd_keywords.json
+    python ats_scorer.py --resume a.txt b.txt --keywords jd1.json jd2.json
+"""
+
+import argparse
+import json
+import re
+from collections import deque
+
+CATEGORY_WEIGHTS = {
+    "hard_skills": 0.35,
+    "methodologies": 0.15,
+    "certifications": 0.10,
+    "domain_keywords": 0.10,
+    "title_variants": 0.10,
+    "soft_skills": 0.10,
+    "action_verbs": 0.10,
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and fold punctuation to single spaces, padded for boundary checks"""
+    return " " + _NON_WORD.sub(" ", text.lower()).strip() + " "
+
+
+class KeywordMatcher:
+    """Aho-Corasick multi-pattern matcher over normalized text (whole words only)"""
+
+    def __init__(self, patterns):
+        self.patterns = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for p in patterns:
+            self._add(normalize(p).strip())
+        self._build()
+
+    def _add(self, pattern: str):
+        pid = len(self.patterns)
+        self.patterns.append(pattern)
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(pid)
+
+    def _build(self):
+        # Breadth-first: depth-1 nodes fail to the root, deeper ones follow their parent's failure link
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                if node:
+                    self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str, normalized: bool = False) -> set:
+        """Ids of patterns that occur in `text` as whole words"""
+        text = text if normalized else normalize(text)
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        found = set()
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node] and text[i + 1:i + 2] in (" ", ""):
+                for pid in out[node]:
+                    start = i - len(patterns[pid])
+                    if start < 0 or text[start] == " ":
+                        found.add(pid)
+        return found
+
+
+class ATSScorer:
+    """Scores resumes against one JD's keyword dict; build once, score many"""
+
+    def __init__(self, keywords: dict, weights: dict = None):
+        self.weights = weights or CATEGORY_WEIGHTS
+        self.categories = {}
+        phrases = []
+        for category in self.weights:
+            terms = []
+            for kw in keywords.get(category, []) or []:
+                if isinstance(kw, str) and normalize(kw).strip():
+                    terms.append((kw, len(phrases)))
+                    phrases.append(kw)
+            if terms:
+                self.categories[category] = terms
+        self.matcher = KeywordMatcher(phrases)
+
+    def score(self, resume: str, normalized: bool = False) -> dict:
+        found = self.matcher.find(resume, normalized)
+        total_weight = sum(self.weights[c] for c in self.categories) or 1.0
+        score = 0.0
+        breakdown = {}
+        for category, terms in self.categories.items():
+            matched = [kw for kw, pid in terms if pid in found]
+            missing = [kw for kw, pid in terms if pid not in found]
+            coverage = len(matched) / len(terms)
+            score += self.weights[category] * coverage
+            breakdown[category] = {"matched": matched, "missing": missing, "coverage": round(coverage, 3)}
+        return {"score": round(score / total_weight * 100), "categories": breakdown}
+
+
+def score_resume(resume: str, keywords: dict, weights: dict = None) -> dict:
+    return ATSScorer(keywords, weights).score(resume)
+
+
+def batch_score(resumes: dict, keyword_sets: dict, weights: dict = None) -> dict:
+    """Score every resume against every JD: {(resume_name, jd_name): score}"""
+    normalized = {name: normalize(text) for name, text in resumes.items()}
+    results = {}
+    for jd_name, keywords in keyword_sets.items():
+        scorer = ATSScorer(keywords, weights)
+        total_weight = sum(scorer.weights[c] for c in scorer.categories) or 1.0
+        for resume_name, text in normalized.items():
+            found = scorer.matcher.find(text, normalized=True)
+            score = sum(
+                scorer.weights[c] * sum(pid in found for _, pid in terms) / len(terms)
+                for c, terms in scorer.categories.items()
+            )
+            results[(resume_name, jd_name)] = round(score / total_weight * 100)
+    return results
+
+
+def print_score_breakdown(result: dict, label: str = "LOCAL ATS SCORE"):
+    print(f"\n🧮 {label}: {result['score']}%")
+    for category, info in result["categories"].items():
+        bar = "█" * round(info["coverage"] * 10) + "░" * (10 - round(info["coverage"] * 10))
+        print(f"   {category:<16}[{bar}] {len(info['matched'])}/{len(info['matched']) + len(info['missing'])}")
+        if info["missing"]:
+            print(f"      missing: {', '.join(info['missing'][:8])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ATS match scorer")
+    parser.add_argument("--resume", nargs="+", required=True, help="Resume .txt file(s)")
+    parser.add_argument("--keywords", nargs="+", required=True,
+                        help="JD keyword JSON file(s) in extract_keywords_from_jd format")
+    args = parser.parse_args()
+
+    resumes = {}
+    for path in args.resume:
+        with open(path, "r", encoding="utf-8") as f:
+            resumes[path] = f.read()
+    keyword_sets = {}
+    for path in args.keywords:
+        with open(path, "r", encoding="utf-8") as f:
+            keyword_sets[path] = json.load(f)
+
+    if len(resumes) == 1 and len(keyword_sets) == 1:
+        print_score_breakdown(score_resume(next(iter(resumes.values())), next(iter(keyword_sets.values()))))
+        return
+
+    scores = batch_score(resumes, keyword_sets)
+    for (resume_name, jd_name), score in sorted(scores.items(), key=lambda kv: -kv[1]):
+        print(f"  {score:3d}%  {resume_name}  ↔  {jd_name}")
+
+
+if __name__ == "__main__":
+    main()
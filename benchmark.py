@@ -0,0 +1,406 @@
+"""
+Offline Benchmark Suite
+=======================
+Measures the pipeline's own overhead and concurrency behaviour against the
+bundled mock server (mock_server.py), so no API key or network is needed:
+
+- orchestrate: `run_all.orchestrate` wall time per run
+- outreach:    `batch_outreach` throughput (profiles/min)
+- chat:        `/api/chat` requests/sec and p50/p95/p99 latency under
+               concurrent load (plain JSON and SSE streaming), served by the
+               Flask app or, with --chat_server asgi, by asgi_app.py, plus
+               the share of upstream calls that reported token usage
+- startup:     `career_agents.py <command> --help` in a fresh interpreter,
+               measured above a bare `python -c pass`. Fails the run if any
+               command exceeds --startup_budget_ms or loads openai, httpx,
+               numpy, flask, uvicorn or dotenv before it has real work to do
+
+The LLM cache is disabled during the run so every call reaches the mock.
+Results are saved as JSON; pass a previous file as --baseline to print the
+change per metric and flag regressions beyond --tolerance.
+
+Usage:
+    python benchmark.py --output baseline.json
+    python benchmark.py --latency lognormal:0.3,0.5 --error_rate 0.02 --baseline baseline.json
+    python benchmark.py --only chat --chat_requests 500 --chat_concurrency 32
+    python benchmark.py --only chat --chat_server asgi --chat_requests 1000 --chat_concurrency 300
+    python benchmark.py --only startup --startup_budget_ms 150
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from metrics import percentile
+from mock_server import MockServer, add_mock_arguments, config_from_args
+
+BENCHMARKS = ["orchestrate", "outreach", "chat", "startup"]
+
+CLI = Path(__file__).resolve().with_name("career_agents.py")
+STARTUP_COMMANDS = ["--help", "gap --help", "tailor --help", "outreach --help", "interview --help",
+                    "pipeline --help", "search --help"]
+# Packages a --help must never import: they belong to the first API call or server start
+HEAVY_MODULES = ("openai", "httpx", "numpy", "flask", "uvicorn", "dotenv")
+
+# Metric name suffixes that get worse as they grow (rates like *_per_s are "higher is better")
+LOWER_IS_BETTER = ("_s", "_ms", "errors")
+
+
+def lower_is_better(metric: str) -> bool:
+    return "_per_" not in metric and metric.endswith(LOWER_IS_BETTER)
+
+SAMPLE_RESUME = """QA MANAGER — 12 years
+- Managed QA team of 8 SDETs across payments and checkout
+- Built Selenium + TestNG automation framework with 1,200 tests in Jenkins
+- Introduced API testing with REST Assured and Postman
+"""
+
+SAMPLE_JD = """QA Manager — Fintech, Gurugram
+
+Responsibilities:
+- Lead a team of SDETs; own test strategy and quality metrics
+- Build Playwright and Selenium frameworks in CI/CD (Jenkins, GitHub Actions)
+- Drive Shift-Left practices and API testing for microservices on Kubernetes
+
+Requirements:
+- 10+ years in QA, 3+ managing teams; ISTQB preferred
+"""
+
+SAMPLE_PROFILE = """Priya Sharma — Director of Quality Engineering at a Gurugram fintech GCC.
+Scaling the QA org, hiring test leads, interested in Shift-Left and AI in testing.
+"""
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the agents' console output while timing them"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_orchestrate(workdir: Path, runs: int, workers: int) -> dict:
+    from run_all import orchestrate
+
+    resume, jd = workdir / "resume.txt", workdir / "jd.txt"
+    resume.write_text(SAMPLE_RESUME, encoding="utf-8")
+    jd.write_text(SAMPLE_JD, encoding="utf-8")
+    profile = workdir / "profile.txt"
+    profile.write_text(SAMPLE_PROFILE, encoding="utf-8")
+
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        with quiet():
+            orchestrate(str(resume), str(jd), str(profile), max_workers=workers)
+        times.append(time.perf_counter() - started)
+    return {
+        "runs": runs,
+        "workers": workers,
+        "wall_mean_s": round(sum(times) / len(times), 3),
+        "wall_p50_s": round(percentile(times, 50), 3),
+        "wall_max_s": round(max(times), 3),
+    }
+
+
+def bench_outreach(workdir: Path, profiles: int, concurrency: int) -> dict:
+    from agent_3_outreach import batch_outreach
+
+    folder = workdir / "profiles"
+    folder.mkdir(exist_ok=True)
+    for i in range(profiles):
+        (folder / f"person_{i:03d}.txt").write_text(SAMPLE_PROFILE.replace("Priya", f"Person {i}"), encoding="utf-8")
+
+    started = time.perf_counter()
+    with quiet():
+        results = batch_outreach(str(folder), "QA leadership, Selenium, Playwright", "peer", "Benchmark User",
+                                 concurrency=concurrency)
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for r in results if r and r.get("error"))
+    return {
+        "profiles": profiles,
+        "concurrency": concurrency,
+        "wall_s": round(elapsed, 3),
+        "profiles_per_min": round(profiles / elapsed * 60, 1),
+        "errors": errors,
+    }
+
+
+def start_flask_server():
+    """Flask app on a background thread; returns (port, stop)"""
+    from werkzeug.serving import make_server
+    import app as web
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)   # no per-request access log
+    server = make_server("127.0.0.1", 0, web.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port, server.shutdown
+
+
+def start_asgi_server():
+    """asgi_app under uvicorn on a background thread; returns (port, stop)"""
+    import socket
+    import uvicorn
+    import asgi_app
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(asgi_app.app, log_level="warning", backlog=2048))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+
+    return sock.getsockname()[1], stop
+
+
+_upstream = {"calls": 0, "with_usage": 0}
+
+
+def _count_usage(event: dict):
+    if event.get("phase") == "end" and not event.get("error"):
+        _upstream["calls"] += 1
+        _upstream["with_usage"] += bool(event.get("usage"))
+
+
+def bench_chat(requests: int, concurrency: int, stream: bool, server: str = "flask") -> dict:
+    import httpx
+    from llm_cache import add_call_observer
+
+    add_call_observer(_count_usage)
+    _upstream.update(calls=0, with_usage=0)
+    port, stop = start_asgi_server() if server == "asgi" else start_flask_server()
+    url = f"http://127.0.0.1:{port}/api/chat"
+    local = threading.local()
+
+    def one(i: int):
+        http = getattr(local, "http", None)
+        if http is None:
+            http = local.http = httpx.Client(timeout=120)
+        body = {"model": "grok-beta", "max_tokens": 300, "stream": stream,
+                "messages": [{"role": "user", "content": f"Benchmark question {i}"}]}
+        started = time.perf_counter()
+        first = None
+        try:
+            if stream:
+                with http.stream("POST", url, json=body) as response:
+                    for line in response.iter_lines():
+                        if first is None and line.startswith("data:"):
+                            first = time.perf_counter() - started
+                        if '"error"' in line:
+                            return None, None
+                ok = response.status_code == 200
+            else:
+                response = http.post(url, json=body)
+                ok = response.status_code == 200 and "error" not in response.json()
+        except httpx.HTTPError:
+            ok = False
+        return (time.perf_counter() - started, first) if ok else (None, None)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    stop()
+
+    latencies = [r[0] for r in results if r[0] is not None]
+    result = {
+        "server": server,
+        "requests": requests,
+        "concurrency": concurrency,
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "errors": requests - len(latencies),
+        "usage_reported_pct": round(100 * _upstream["with_usage"] / max(1, _upstream["calls"]), 1),
+    }
+    if stream:
+        first_bytes = [r[1] for r in results if r[1] is not None]
+        result["ttfb_p50_ms"] = _ms(percentile(first_bytes, 50))
+        result["ttfb_p95_ms"] = _ms(percentile(first_bytes, 95))
+    return result
+
+
+def _startup_p50(cmd: list, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(cmd, capture_output=True)
+        times.append(time.perf_counter() - started)
+    return percentile(times, 50)
+
+
+def bench_startup(runs: int, budget_ms: float) -> dict:
+    """Median startup overhead per CLI command over a bare interpreter, plus heavy imports it pulled in"""
+    baseline = _startup_p50([sys.executable, "-c", "pass"], runs)
+    results = {"runs": runs, "budget_ms": budget_ms, "python_ms": _ms(baseline)}
+    over_budget, heavy = [], set()
+    for command in STARTUP_COMMANDS:
+        args = command.split()
+        traced = subprocess.run([sys.executable, "-X", "importtime", str(CLI), *args],
+                                capture_output=True, text=True)
+        loaded = {line.rsplit("|", 1)[-1].strip() for line in traced.stderr.splitlines()
+                  if line.startswith("import time:")}
+        pulled = {name.split(".")[0] for name in loaded} & set(HEAVY_MODULES)
+        overhead = _ms(_startup_p50([sys.executable, str(CLI), *args], runs) - baseline)
+        results[("cli" if args[0] == "--help" else args[0]) + "_overhead_ms"] = overhead
+        if overhead > budget_ms:
+            over_budget.append(f"{command} ({overhead} ms)")
+        if pulled:
+            heavy |= pulled
+            over_budget.append(f"{command} imports {', '.join(sorted(pulled))}")
+    results["max_overhead_ms"] = max(v for k, v in results.items() if k.endswith("_overhead_ms"))
+    results["heavy_imports"] = len(heavy)
+    results["budget_violations"] = over_budget
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print per-metric change vs the baseline; returns the regressed metric names"""
+    regressions = []
+    print(f"\n📈 Compared with baseline from {baseline.get('meta', {}).get('timestamp', '?')}:")
+    for bench, metrics in results.items():
+        if bench == "meta" or bench not in baseline:
+            continue
+        for name, value in metrics.items():
+            old = baseline[bench].get(name)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            if name in ("runs", "workers", "profiles", "concurrency", "requests", "budget_ms"):
+                continue
+            change = (value - old) / old
+            worse = change > tolerance if lower_is_better(name) else change < -tolerance
+            flag = "❌" if worse else "  "
+            print(f"   {flag} {bench + '.' + name:<30} {old:>10} → {value:<10} ({change:+.1%})")
+            if worse:
+                regressions.append(f"{bench}.{name}")
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite (runs against a local mock xAI server)")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Run only these benchmarks")
+    parser.add_argument("--base_url", help="Use an already running mock server instead of starting one")
+    parser.add_argument("--runs", type=int, default=3, help="orchestrate: number of pipeline runs")
+    parser.add_argument("--workers", type=int, default=4, help="orchestrate: max parallel steps")
+    parser.add_argument("--profiles", type=int, default=40, help="outreach: number of profiles")
+    parser.add_argument("--outreach_concurrency", type=int, default=8, help="outreach: parallel profiles")
+    parser.add_argument("--chat_requests", type=int, default=200, help="chat: total requests per mode")
+    parser.add_argument("--chat_concurrency", type=int, default=16, help="chat: concurrent clients")
+    parser.add_argument("--chat_server", choices=["flask", "asgi"], default="flask",
+                        help="chat: serve /api/chat with app.py (Flask) or asgi_app.py (uvicorn)")
+    parser.add_argument("--startup_runs", type=int, default=5, help="startup: launches per command (median)")
+    parser.add_argument("--startup_budget_ms", type=float, default=250,
+                        help="startup: max milliseconds a command may add to a bare interpreter start")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to save the results JSON")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Relative change counted as a regression")
+    parser.add_argument("--fail_on_regression", action="store_true", help="Exit 1 if any metric regressed")
+    add_mock_arguments(parser, latency="lognormal:0.2,0.4")
+    args = parser.parse_args()
+
+    mock = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        mock = MockServer(config_from_args(args))
+        base_url = mock.start()
+
+    # Must be set before the agents (and their shared client/cache) are imported
+    os.environ["XAI_BASE_URL"] = base_url
+    os.environ["XAI_API_KEY"] = "mock"
+    os.environ["LLM_CACHE_DISABLE"] = "1"
+    from xai_client import reset_client
+    reset_client()
+
+    selected = args.only or BENCHMARKS
+    results = {"meta": {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+    }}
+
+    print(f"\n🏁 Benchmarking against {base_url} (latency {args.latency}, error rate {args.error_rate})")
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)   # the agents write their output files to the working directory
+        try:
+            if "orchestrate" in selected:
+                print(f"   ⏱️  run_all.orchestrate x{args.runs}...")
+                results["orchestrate"] = bench_orchestrate(Path(tmp), args.runs, args.workers)
+            if "outreach" in selected:
+                print(f"   ⏱️  batch_outreach ({args.profiles} profiles)...")
+                results["outreach"] = bench_outreach(Path(tmp), args.profiles, args.outreach_concurrency)
+            if "chat" in selected:
+                print(f"   ⏱️  /api/chat ({args.chat_requests} requests, {args.chat_concurrency} concurrent)...")
+                results["chat"] = bench_chat(args.chat_requests, args.chat_concurrency, stream=False,
+                                             server=args.chat_server)
+                results["chat_stream"] = bench_chat(args.chat_requests, args.chat_concurrency, stream=True,
+                                                    server=args.chat_server)
+            if "startup" in selected:
+                print(f"   ⏱️  CLI startup ({len(STARTUP_COMMANDS)} commands x{args.startup_runs})...")
+                results["startup"] = bench_startup(args.startup_runs, args.startup_budget_ms)
+        finally:
+            os.chdir(original_cwd)
+
+    if mock:
+        results["meta"]["mock_stats"] = mock.stats()
+        mock.stop()
+
+    for bench, metrics in results.items():
+        if bench != "meta":
+            print(f"\n📊 {bench}: " + ", ".join(f"{k}={v}" for k, v in metrics.items()))
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} metric(s) regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+
+    violations = results.get("startup", {}).get("budget_violations")
+    if violations:
+        print(f"\n❌ CLI startup over budget ({args.startup_budget_ms:g} ms above a bare interpreter):")
+        for violation in violations:
+            print(f"   • {violation}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Career Agents CLI
+=================
+One entry point for every agent, with fast startup: this module imports only
+argparse, and the agent behind a subcommand (plus openai, httpx, numpy or
+flask behind it) is loaded only when that subcommand runs. `--help`, bad
+arguments and local-only commands never pay for the API client, which
+matters when the agents run hundreds of times from cron or shell loops.
+
+Each subcommand takes exactly the arguments of the script it wraps
+(`career-agents tailor --help` is `agent_2_resume_tailor.py --help`).
+`python benchmark.py --only startup` checks the startup time against a budget.
+
+Usage:
+    ./career-agents gap --resume my_resume.txt --jds jd1.txt jd2.txt
+    ./career-agents tailor --resume my_resume.txt --jd_folder ./jds/ --concurrency 4
+    ./career-agents outreach --profile director_profile.txt --your_skills "Selenium, CI/CD"
+    ./career-agents interview --mode behavioral --role "QA Director"
+    ./career-agents pipeline --resume my_resume.txt --jd target_jd.txt --profile linkedin.txt
+    ./career-agents search --jd_folder ./jds/ --query '"test automation" fintech'
+    ./career-agents serve --asgi --port 5000
+
+    # or, without the wrapper script
+    python career_agents.py tailor --help
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+PROG = "career-agents"
+
+# subcommand -> (module whose main() runs it, one-line help)
+COMMANDS = {
+    "gap": ("agent_1_gap_analyst", "Skill gap analysis of your resume against one or more JDs"),
+    "tailor": ("agent_2_resume_tailor", "Tailor your resume to a JD, or to a whole folder of JDs"),
+    "outreach": ("agent_3_outreach", "Personalized LinkedIn connection requests and follow-ups"),
+    "interview": ("agent_4_interview", "Interview practice: behavioral, code review, system design"),
+    "pipeline": ("run_all", "All four agents as one pipeline for a JD (or the best fits in a folder)"),
+    "search": ("search_index", "Search saved JDs and profiles (local index, no API calls)"),
+    "serve": (None, "Start the web UI server (Flask, or --asgi for many concurrent users)"),
+}
+
+
+def serve(argv: list):
+    parser = argparse.ArgumentParser(prog=f"{PROG} serve", description=COMMANDS["serve"][1])
+    parser.add_argument("--asgi", action="store_true",
+                        help="Run asgi_app.py (uvicorn) instead of the Flask development server")
+    parser.add_argument("--port", type=int, help="Port to listen on (default: $PORT or 5000)")
+    args, rest = parser.parse_known_args(argv)
+    if args.port:
+        os.environ["PORT"] = str(args.port)
+    if args.asgi:
+        from asgi_app import main as asgi_main
+        sys.argv = [f"{PROG} serve --asgi", *rest]
+        asgi_main()
+        return
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)} (--host and --log_level need --asgi)")
+    # sys.argv is left alone: Flask's reloader restarts the process with it
+    from app import main as flask_main
+    flask_main()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Career agents for your job search. Run `%(prog)s <command> --help` for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<10} {text}" for name, (_, text) in COMMANDS.items()),
+    )
+    parser.add_argument("command", choices=list(COMMANDS), metavar="command", help="One of the commands below")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the command")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.args)
+        return
+    module = importlib.import_module(COMMANDS[args.command][0])
+    sys.argv = [f"{PROG} {args.command}", *args.args]   # the agent's own parser reads sys.argv
+    module.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Conversation Memory
+===================
+Bounded chat history for long multi-turn sessions. Keeps the system prompt
+and the last K exchanges verbatim; older turns are folded into a running
+summary by a small background LLM call, so the prompt sent on every turn
+stays roughly the same size however long the session runs.
+
+    memory = ConversationMemory(client, system_prompt, keep_turns=4)
+    memory.add("user", "Start the interview.")
+    reply = cached_completion(client, model=..., messages=memory.messages())
+    memory.add("assistant", reply)
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_cache import cached_completion
+
+SUMMARY_PROMPT = """You maintain the memory of an ongoing conversation.
+Update the running summary with the new turns below. Keep: topics and questions
+already covered (so they are not repeated), key facts the user shared, and the
+strengths and weaknesses observed so far. Max 150 words, plain text.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW TURNS:
+{turns}
+
+Return only the updated summary."""
+
+
+class ConversationMemory:
+    def __init__(self, client, system_prompt: str, keep_turns: int = 4,
+                 model: str = "grok-beta", summarize: bool = True):
+        self.client = client
+        self.system_prompt = system_prompt
+        self.keep_messages = max(1, keep_turns) * 2   # one turn = user + assistant
+        self.model = model
+        self.summarize = summarize
+        self.turns = []          # every message after the system prompt, in order
+        self.summary = ""
+        self.folded = 0          # turns[:folded] are already in the summary
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1) if summarize else None
+        self._pending = None
+
+    def add(self, role: str, content: str):
+        with self._lock:
+            self.turns.append({"role": role, "content": content})
+        self._schedule_fold()
+
+    def messages(self, extra: list = None) -> list:
+        """System prompt + running summary + unfolded older turns + last K turns verbatim"""
+        with self._lock:
+            msgs = [{"role": "system", "content": self.system_prompt}]
+            if self.summary:
+                msgs.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+            # Everything not yet folded: the last K turns, plus any turns that left
+            # the window but whose background summary hasn't landed yet
+            msgs += self.turns[self.folded:]
+        return msgs + (extra or [])
+
+    def _schedule_fold(self, from_worker: bool = False):
+        if not self.summarize:
+            return
+        with self._lock:
+            stale = len(self.turns) - self.keep_messages - self.folded
+            busy = self._pending and not self._pending.done() and not from_worker
+            if stale <= 0 or busy:
+                return
+            self._pending = self._pool.submit(self._fold)
+
+    def _fold(self):
+        with self._lock:
+            end = len(self.turns) - self.keep_messages
+            batch = self.turns[self.folded:end]
+            summary = self.summary
+        if not batch:
+            return
+
+        transcript = "\n".join(f"{m['role'].upper()}: {m['content']}" for m in batch)
+        try:
+            updated = cached_completion(
+                self.client,
+                model=self.model,
+                max_tokens=300,
+                messages=[{"role": "user", "content": SUMMARY_PROMPT.format(
+                    summary=summary or "(none yet)", turns=transcript)}],
+            ).strip()
+        except Exception:
+            return  # keep the turns verbatim; the next fold retries
+
+        with self._lock:
+            self.summary = updated
+            self.folded = end
+        # More turns may have aged out while we were summarizing
+        self._schedule_fold(from_worker=True)
+
+    def flush(self):
+        """Wait for any in-flight background summary"""
+        while self._pending and not self._pending.done():
+            self._pending.result()
+
+    def close(self):
+        if self._pool:
+            self._pool.shutdown(wait=False)
@@ -0,0 +1,260 @@
+"""
+DAG Executor
+============
+Runs a pipeline described as a graph of steps on a thread pool, so steps
+whose inputs are ready overlap instead of waiting on each other.
+
+- Each step's console output is buffered and replayed in declaration order,
+  so the report reads exactly like a sequential run.
+- A timing report shows when each step ran and the critical path — the chain
+  of dependent steps that bounds total wall-clock time.
+- `on_event(event, run)` reports progress ("start", "end", "skipped") as
+  steps run; several pipelines may run at once in one process (e.g. web jobs).
+
+Example:
+    steps = [
+        Step("jd", load_jd),
+        Step("keywords", extract, deps=("jd",)),
+        Step("report", report, deps=("jd", "keywords")),
+    ]
+    results = run_dag(steps, max_workers=4)
+"""
+
+import io
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Step:
+    """A pipeline node. `fn` is called with the results of `deps`, in order."""
+    name: str
+    fn: callable
+    deps: tuple = ()
+
+
+@dataclass
+class StepRun:
+    name: str
+    start: float = 0.0
+    end: float = 0.0
+    output: str = ""
+    result: object = None
+    error: BaseException = None
+    skipped: bool = False
+    deps: tuple = field(default_factory=tuple)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class _ThreadRoutedStdout(io.TextIOBase):
+    """sys.stdout stand-in that sends each worker thread's prints to its own buffer"""
+
+    def __init__(self, real):
+        self._real = real
+        self._local = threading.local()
+
+    def capture(self, buffer):
+        self._local.buffer = buffer
+
+    def release(self):
+        self._local.buffer = None
+
+    def write(self, s):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._real).write(s)
+
+    def flush(self):
+        buffer = getattr(self._local, "buffer", None)
+        (buffer or self._real).flush()
+
+
+# One router for the whole process, installed while any pipeline or capture is active,
+# so concurrent run_dag calls don't restore each other's sys.stdout
+_router = None
+_router_users = 0
+_router_lock = threading.Lock()
+
+
+def _acquire_router() -> _ThreadRoutedStdout:
+    global _router, _router_users
+    with _router_lock:
+        if _router_users == 0:
+            _router = _ThreadRoutedStdout(sys.stdout)
+            sys.stdout = _router
+        _router_users += 1
+        return _router
+
+
+def _release_router():
+    global _router, _router_users
+    with _router_lock:
+        _router_users -= 1
+        if _router_users == 0:
+            if sys.stdout is _router:
+                sys.stdout = _router._real
+            _router = None
+
+
+@contextmanager
+def capture_output(stream):
+    """Send this thread's prints (including a pipeline's replayed output) to `stream`"""
+    router = _acquire_router()
+    previous = getattr(router._local, "buffer", None)
+    router.capture(stream)
+    try:
+        yield stream
+    finally:
+        router.capture(previous)
+        _release_router()
+
+
+def _validate(steps: list):
+    names = [s.name for s in steps]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate step names in pipeline: {names}")
+    for s in steps:
+        missing = [d for d in s.deps if d not in names]
+        if missing:
+            raise ValueError(f"Step '{s.name}' depends on unknown step(s): {missing}")
+
+    # Cycle check (Kahn)
+    indegree = {s.name: len(s.deps) for s in steps}
+    children = {s.name: [] for s in steps}
+    for s in steps:
+        for d in s.deps:
+            children[d].append(s.name)
+    ready = [n for n, deg in indegree.items() if deg == 0]
+    seen = 0
+    while ready:
+        n = ready.pop()
+        seen += 1
+        for c in children[n]:
+            indegree[c] -= 1
+            if indegree[c] == 0:
+                ready.append(c)
+    if seen != len(steps):
+        raise ValueError("Pipeline steps contain a dependency cycle")
+
+
+def critical_path(runs: dict) -> list:
+    """Chain of steps ending at the last finisher, following the latest-finishing dependency"""
+    finished = [r for r in runs.values() if not r.skipped]
+    if not finished:
+        return []
+    node = max(finished, key=lambda r: r.end)
+    path = [node.name]
+    while node.deps:
+        deps = [runs[d] for d in node.deps if not runs[d].skipped]
+        if not deps:
+            break
+        node = max(deps, key=lambda r: r.end)
+        path.append(node.name)
+    return list(reversed(path))
+
+
+def run_dag(steps: list, max_workers: int = 4, out=None, on_event=None) -> dict:
+    """Run steps concurrently, replay their output in order, return {name: StepRun}"""
+    _validate(steps)
+    out = out or sys.stdout
+    notify = on_event or (lambda event, run: None)
+    by_name = {s.name: s for s in steps}
+    runs = {s.name: StepRun(s.name, deps=tuple(s.deps)) for s in steps}
+    order = [s.name for s in steps]
+    pending = set(order)
+    next_to_flush = 0
+    t0 = time.perf_counter()
+
+    def execute(step: Step):
+        run = runs[step.name]
+        buffer = io.StringIO()
+        router.capture(buffer)
+        run.start = time.perf_counter() - t0
+        notify("start", run)
+        try:
+            run.result = step.fn(*[runs[d].result for d in step.deps])
+        except BaseException as e:
+            run.error = e
+        finally:
+            run.end = time.perf_counter() - t0
+            router.release()
+            run.output = buffer.getvalue()
+        notify("end", run)
+        return step.name
+
+    def flush_ready():
+        nonlocal next_to_flush
+        while next_to_flush < len(order) and order[next_to_flush] not in pending:
+            run = runs[order[next_to_flush]]
+            if run.output:
+                out.write(run.output)
+                out.flush()
+            next_to_flush += 1
+
+    router = _acquire_router()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            running = {}
+            while pending:
+                # Skip steps whose dependencies failed
+                for name in [n for n in order if n in pending and n not in running]:
+                    if any(runs[d].error or runs[d].skipped for d in by_name[name].deps):
+                        runs[name].skipped = True
+                        pending.discard(name)
+                        notify("skipped", runs[name])
+
+                # Submit every step whose dependencies are done
+                for name in order:
+                    if name in pending and name not in running and all(
+                        d not in pending for d in by_name[name].deps
+                    ):
+                        running[name] = pool.submit(execute, by_name[name])
+
+                flush_ready()
+                if not running:
+                    break
+                done, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = future.result()
+                    del running[name]
+                    pending.discard(name)
+                flush_ready()
+    finally:
+        _release_router()
+
+    flush_ready()
+    return runs
+
+
+def print_timing_report(runs: dict, out=None):
+    out = out or sys.stdout
+    finished = [r for r in runs.values() if not r.skipped]
+    wall = max((r.end for r in finished), default=0.0)
+    serial = sum(r.duration for r in finished)
+    path = critical_path(runs)
+    width = 30
+
+    out.write("\n⏱️  PIPELINE TIMING\n")
+    out.write("-" * 60 + "\n")
+    for r in runs.values():
+        if r.skipped:
+            out.write(f"  {r.name:<12} skipped (dependency failed)\n")
+            continue
+        lo = min(width - 1, int(r.start / wall * width)) if wall else 0
+        hi = min(width, max(lo + 1, int(r.end / wall * width))) if wall else 1
+        bar = " " * lo + "█" * (hi - lo) + " " * (width - hi)
+        mark = "★" if r.name in path else " "
+        status = "❌" if r.error else " "
+        out.write(f"{mark} {r.name:<12}[{bar}] {r.start:6.1f}s → {r.end:6.1f}s ({r.duration:5.1f}s){status}\n")
+
+    out.write(f"\n  Wall clock:    {wall:.1f}s\n")
+    out.write(f"  Sequential:    {serial:.1f}s (sum of step times)\n")
+    if wall:
+        out.write(f"  Speedup:       {serial / wall:.2f}x\n")
+    out.write(f"  Critical path: {' → '.join(path)} (★)\n")
@@ -0,0 +1,276 @@
+"""
+JD Cleaner
+==========
+Strips boilerplate from scraped job descriptions before they reach any
+prompt: EEO statements, benefits lists, "About us" paragraphs, legal
+footers, and paragraphs that repeat across many JDs from the same company.
+
+- Sections are classified by their headings ("Benefits", "About the
+  company", "Responsibilities", ...); requirement sections are always kept.
+  Requirement headings are checked first, and a heading only opens a
+  boilerplate section if it is one as a whole ("Who we are", not "Who we
+  are looking for").
+- Outside requirement sections, paragraphs are dropped if they match
+  boilerplate patterns, or repeat verbatim in at least REPEAT_FRACTION of
+  the corpus (and in min_repeat JDs or more).
+- A paragraph naming a skill, methodology or certification from the skill
+  taxonomy is never dropped, by those rules or by its section: a requirement
+  shared by several openings is exactly what the gap analyst counts as high
+  demand.
+- A per-JD report shows approximate tokens saved.
+
+Set JD_CLEAN_DISABLE=1 to feed raw JDs to the agents.
+
+Usage:
+    python jd_cleaner.py --jd_folder ./jds/
+    python jd_cleaner.py --jds jd1.txt --show
+"""
+
+import argparse
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+KEEP_SECTIONS = [
+    "responsibilit", "requirement", "qualification", "what you'll do", "what you will do",
+    "what you'll bring", "what we're looking for", "what we are looking for", "must have",
+    "nice to have", "good to have", "skills", "experience", "key result", "role", "job description",
+    "about the role", "about the job", "the opportunity", "your impact", "tech stack", "who you are",
+    "looking for", "ideal candidate",
+]
+# Whole-heading patterns (matched against the full heading, lower-cased, punctuation removed)
+DROP_SECTIONS = [
+    r"about (us|the company|company)", r"who we are", r"our (story|mission|culture|values)",
+    r"(our )?(benefits|perks)( .*)?", r"what we offer( you)?", r"why (join|work)( .*)?", r"life at .*",
+    r"compensation( .*)?", r"equal (employment )?opportunit.*", r"eeo( .*)?", r"diversity( .*)?",
+    r"disclaimer", r"privacy( .*)?", r"legal( .*)?", r"how to apply", r"application process",
+    r"recruitment fraud( .*)?",
+]
+_DROP_HEADING = re.compile("|".join(f"(?:{p})" for p in DROP_SECTIONS))
+
+BOILERPLATE_PATTERNS = [
+    ("eeo", r"equal (employment )?opportunity|without regard to (race|gender|age)|reasonable accommodation"
+            r"|protected (veteran|characteristic)|affirmative action|diverse and inclusive"),
+    ("benefits", r"health insurance|medical insurance|paid time off|\bpto\b|401\(?k\)?|wellness (program|allowance)"
+                 r"|parental leave|flexible working hours|employee stock|esops?\b|gym membership|free meals"),
+    ("legal", r"privacy (notice|policy)|recruitment fraud|unsolicited (resumes|cvs)|never ask for (money|payment)"
+              r"|background (check|verification) (will|may) be|personal data"),
+    ("about", r"^(we are|we're|founded in|headquartered in)\b|(fortune|inc\.?) \d+|leading (global )?provider of"),
+]
+_BOILERPLATE = [(reason, re.compile(p, re.IGNORECASE)) for reason, p in BOILERPLATE_PATTERNS]
+
+# Repeated paragraphs shorter than this (e.g. "Requirements:") are never dropped
+MIN_REPEAT_CHARS = 80
+# ...and a paragraph must appear in at least this share of the corpus to count as repeated
+REPEAT_FRACTION = 0.5
+# Taxonomy categories whose hits mark a paragraph as a requirement
+SKILL_CATEGORIES = ("hard_skills", "methodologies", "certifications")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _normalize(paragraph: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9 ]+", " ", paragraph.lower())).strip()
+
+
+def _fingerprint(paragraph: str) -> str:
+    return hashlib.sha1(_normalize(paragraph).encode("utf-8")).hexdigest()
+
+
+def _heading_section(line: str):
+    """'keep' / 'drop' if the line looks like a section heading, else None"""
+    raw = line.strip()
+    if re.match(r"^([-*•·▪–]|\d+[.)])\s", raw):
+        return None   # bullet points are content, not headings
+    text = raw.strip("#*:-•_ ").lower()
+    if not text or len(text) > 60 or len(text.split()) > 6 or text.endswith("."):
+        return None
+    # Requirement headings win: "Who we are looking for" is not "Who we are"
+    if any(k in text for k in KEEP_SECTIONS):
+        return "keep"
+    if _DROP_HEADING.fullmatch(" ".join(re.sub(r"[^a-z0-9&' ]+", " ", text).split())):
+        return "drop"
+    return None
+
+
+def split_blocks(text: str) -> list:
+    """Paragraph blocks; a recognized heading line always starts a new block"""
+    blocks, current = [], []
+    for line in text.splitlines():
+        if not line.strip():
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        if _heading_section(line) and current:
+            blocks.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def section_blocks(text: str) -> list:
+    """[(section, block)]: section is 'keep' (requirements), 'drop' (boilerplate) or None"""
+    out, section = [], None
+    for block in split_blocks(text):
+        heading = _heading_section(block.splitlines()[0])
+        if heading:
+            section = heading
+        elif "\n" not in block and len(block.split()) <= 8 and not block.rstrip().endswith("."):
+            section = None   # an unrecognized heading or job title ends the previous section
+        out.append((section, block))
+    return out
+
+
+def _has_skills(block: str) -> bool:
+    """True if the block names a skill, methodology or certification from the taxonomy"""
+    from keyword_extractor import get_extractor
+    found = get_extractor().extract(block)
+    return any(found.get(category) for category in SKILL_CATEGORIES)
+
+
+@dataclass
+class CleanResult:
+    text: str
+    original_tokens: int
+    cleaned_tokens: int
+    dropped: list = field(default_factory=list)   # (reason, first 60 chars)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.cleaned_tokens
+
+
+class JDCleaner:
+    def __init__(self, min_repeat: int = 2, repeat_fraction: float = REPEAT_FRACTION):
+        self.min_repeat = min_repeat
+        self.repeat_fraction = repeat_fraction
+        self.repeat_counts = {}
+        self.corpus_size = 0
+
+    def learn(self, texts):
+        """Count, per paragraph, how many JDs in the corpus contain it"""
+        for text in texts:
+            self.corpus_size += 1
+            for fp in {_fingerprint(b) for b in split_blocks(text) if len(b) >= MIN_REPEAT_CHARS}:
+                self.repeat_counts[fp] = self.repeat_counts.get(fp, 0) + 1
+
+    def _repeated(self, block: str) -> bool:
+        if len(block) < MIN_REPEAT_CHARS:
+            return False
+        count = self.repeat_counts.get(_fingerprint(block), 0)
+        return count >= max(self.min_repeat, self.repeat_fraction * self.corpus_size)
+
+    def _classify(self, block: str, section: str):
+        """Reason to drop the block, or None to keep it"""
+        if section == "keep":
+            return None
+        if section == "drop":
+            # A skill in a boilerplate section ("Perks: ISTQB certification sponsored") is still a signal
+            return None if _has_skills(block) else "section"
+        reason = "repeated" if self._repeated(block) else next(
+            (reason for reason, pattern in _BOILERPLATE if pattern.search(block)), None)
+        # The skill lookup is the slow check, so it only runs on blocks about to be dropped
+        if reason and _has_skills(block):
+            return None
+        return reason
+
+    def clean(self, text: str) -> CleanResult:
+        kept, dropped = [], []
+        for section, block in section_blocks(text):
+            reason = self._classify(block, section)
+            if reason:
+                dropped.append((reason, " ".join(block.split())[:60]))
+            else:
+                kept.append(block)
+
+        cleaned = "\n\n".join(kept).strip()
+        if not cleaned:
+            # Nothing recognizable as requirements — better to send the raw JD than nothing
+            cleaned, dropped = text.strip(), []
+        return CleanResult(cleaned, estimate_tokens(text), estimate_tokens(cleaned), dropped)
+
+
+def cleaning_enabled() -> bool:
+    return os.environ.get("JD_CLEAN_DISABLE", "").lower() not in ("1", "true", "yes")
+
+
+def clean_jds(jds: dict, verbose: bool = True) -> dict:
+    """Learn repeated paragraphs across the corpus, then clean each JD"""
+    if not cleaning_enabled() or not jds:
+        return jds
+    cleaner = JDCleaner()
+    cleaner.learn(jds.values())
+    results = {title: cleaner.clean(text) for title, text in jds.items()}
+    if verbose:
+        print_cleaning_report(results)
+    return {title: r.text for title, r in results.items()}
+
+
+def clean_jd(text: str) -> str:
+    """Single-JD cleaning (pattern and section rules only; no corpus to learn from)"""
+    if not cleaning_enabled():
+        return text
+    return JDCleaner().clean(text).text
+
+
+def load_jd_text(filepath: str) -> str:
+    with open(filepath, "r", encoding="utf-8") as f:
+        return clean_jd(f.read().strip())
+
+
+def print_cleaning_report(results: dict):
+    before = sum(r.original_tokens for r in results.values())
+    saved = sum(r.tokens_saved for r in results.values())
+    if not saved:
+        return
+    print(f"🧹 JD cleanup: ~{saved:,} of ~{before:,} tokens removed ({saved / before:.0%})")
+    for title, r in results.items():
+        if r.tokens_saved:
+            reasons = sorted({reason for reason, _ in r.dropped})
+            print(f"   • {title}: -{r.tokens_saved} tokens ({r.tokens_saved / r.original_tokens:.0%}) [{', '.join(reasons)}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strip boilerplate from job descriptions")
+    parser.add_argument("--jds", nargs="+", help="Paths to JD text files")
+    parser.add_argument("--jd_folder", help="Folder containing JD .txt files")
+    parser.add_argument("--show", action="store_true", help="Print the cleaned text and dropped paragraphs")
+    parser.add_argument("--output_folder", help="Write cleaned JDs to this folder")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.jds or []]
+    if args.jd_folder:
+        paths += sorted(Path(args.jd_folder).glob("*.txt"))
+    if not paths:
+        print("❌ Error: Provide at least one JD via --jds or --jd_folder")
+        return
+
+    jds = {p.stem: p.read_text(encoding="utf-8").strip() for p in paths}
+    cleaner = JDCleaner()
+    cleaner.learn(jds.values())
+    results = {title: cleaner.clean(text) for title, text in jds.items()}
+    print_cleaning_report(results)
+
+    if args.show:
+        for title, r in results.items():
+            print(f"\n{'='*60}\n📋 {title}\n{'='*60}\n{r.text}")
+            for reason, snippet in r.dropped:
+                print(f"   ✂️  [{reason}] {snippet}…")
+
+    if args.output_folder:
+        out = Path(args.output_folder)
+        out.mkdir(parents=True, exist_ok=True)
+        for title, r in results.items():
+            (out / f"{title}.txt").write_text(r.text, encoding="utf-8")
+        print(f"💾 Cleaned JDs written to: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+JD Near-Duplicate Detector
+==========================
+The same role is often reposted with small wording changes, or saved twice
+from Naukri and LinkedIn. Sending every copy to the gap analyst inflates the
+prompt and skews the "high demand" frequency signal.
+
+- Each JD is shingled into overlapping word 3-grams and reduced to a
+  MinHash signature (numpy, 128 permutations).
+- Locality-sensitive hashing (16 bands x 8 rows) proposes candidate pairs in
+  roughly linear time; pairs whose estimated Jaccard similarity is at least
+  the threshold (default 0.8) are clustered with union-find.
+- One representative per cluster (the longest copy) is kept, with the
+  cluster size as its weight.
+
+Usage:
+    python jd_dedup.py --jd_folder ./jds/
+    python jd_dedup.py --jds jd1.txt jd2.txt --threshold 0.7
+"""
+
+import argparse
+import re
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_CHUNK = 1 << 12   # shingles hashed per numpy batch (sized to stay in cache)
+
+
+class MinHasher:
+    """Vectorized MinHash over word n-grams"""
+
+    def __init__(self, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # Odd multipliers make each (a*x + b) mod 2^32 a permutation of the 32-bit shingle hashes
+        self.a = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint32) | np.uint32(1)
+        self.b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint32)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._mix = rng.integers(1, 1 << 63, size=shingle_size, dtype=np.uint64)
+
+    def _shingles(self, texts: list) -> tuple:
+        """32-bit hashes of every word n-gram, concatenated, plus each text's start offset"""
+        k = self.shingle_size
+        words, lengths = [], []
+        for text in texts:
+            tokens = _WORD.findall(text.lower())
+            tokens += [""] * (k - len(tokens))   # short texts still get one shingle
+            words += tokens
+            lengths.append(len(tokens))
+        # crc32 rather than hash(): str hashes are salted per process, which would make
+        # signatures (and which near-duplicates are caught) differ from run to run
+        vocab = {word: zlib.crc32(word.encode("utf-8")) for word in set(words)}
+        ids = np.fromiter(map(vocab.__getitem__, words), dtype=np.uint64, count=len(words))
+        lengths = np.array(lengths)
+
+        grams = np.zeros(len(ids) - k + 1, dtype=np.uint64)
+        for i in range(k):
+            grams = grams * np.uint64(0x9E3779B97F4A7C15) + ids[i:len(ids) - k + 1 + i] * self._mix[i]
+        # Drop n-grams that straddle two texts
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        counts = lengths - k + 1
+        valid = np.concatenate([np.arange(s, s + c) for s, c in zip(starts, counts)])
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        return (grams[valid] >> np.uint64(32)).astype(np.uint32), offsets
+
+    def signatures(self, texts: list) -> np.ndarray:
+        """(len(texts), num_perm) array of MinHash signatures"""
+        shingles, offsets = self._shingles(texts)
+        bounds = list(offsets) + [len(shingles)]
+        a, b = self.a[:, None], self.b[:, None]
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        first = 0
+        while first < len(texts):
+            # Whole texts per batch, about _CHUNK shingles at a time
+            last = first + 1
+            while last < len(texts) and bounds[last + 1] - bounds[first] <= _CHUNK:
+                last += 1
+            lo, hi = bounds[first], bounds[last]
+            hashed = a * shingles[None, lo:hi] + b
+            out[first:last] = np.minimum.reduceat(hashed, np.array(bounds[first:last]) - lo, axis=1).T
+            first = last
+        return out
+
+
+def _find(parent: list, i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_jds(jds: dict, threshold: float = DEFAULT_THRESHOLD, bands: int = BANDS) -> list:
+    """Groups of near-identical JD titles (singletons included), in input order"""
+    titles = list(jds)
+    if len(titles) < 2:
+        return [titles] if titles else []
+    hasher = MinHasher()
+    signatures = hasher.signatures([jds[t] for t in titles])
+    rows = hasher.num_perm // bands
+
+    parent = list(range(len(titles)))
+    for band in range(bands):
+        buckets = {}
+        for i, key in enumerate(map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+            buckets.setdefault(key, []).append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            first = members[0]
+            for other in members[1:]:
+                root_a, root_b = _find(parent, first), _find(parent, other)
+                if root_a == root_b:
+                    continue
+                if np.mean(signatures[first] == signatures[other]) >= threshold:
+                    parent[root_b] = root_a
+
+    clusters = {}
+    for i in range(len(titles)):
+        clusters.setdefault(_find(parent, i), []).append(titles[i])
+    return list(clusters.values())
+
+
+def dedupe_jds(jds: dict, threshold: float = DEFAULT_THRESHOLD, verbose: bool = True) -> tuple:
+    """Keep one JD per near-duplicate cluster: returns (jds, {title: cluster size})"""
+    clusters = cluster_jds(jds, threshold)
+    kept, weights = {}, {}
+    merged = []
+    for group in clusters:
+        representative = max(group, key=lambda t: len(jds[t]))
+        kept[representative] = jds[representative]
+        weights[representative] = len(group)
+        if len(group) > 1:
+            merged.append((representative, [t for t in group if t != representative]))
+
+    if verbose and merged:
+        print(f"🔁 Merged {sum(len(d) for _, d in merged)} near-duplicate JDs into {len(merged)}:")
+        for representative, duplicates in merged:
+            print(f"   • {representative} (x{len(duplicates) + 1}) ← {', '.join(duplicates)}")
+    return kept, weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate job descriptions")
+    parser.add_argument("--jds", nargs="+", help="Paths to JD text files")
+    parser.add_argument("--jd_folder", help="Folder containing JD .txt files")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Estimated Jaccard similarity at or above which JDs are merged")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.jds or []]
+    if args.jd_folder:
+        paths += sorted(Path(args.jd_folder).glob("*.txt"))
+    if not paths:
+        print("❌ Error: Provide at least one JD via --jds or --jd_folder")
+        return
+
+    jds = {p.stem: p.read_text(encoding="utf-8") for p in paths}
+    started = time.perf_counter()
+    kept, _ = dedupe_jds(jds, args.threshold)
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  {len(jds)} JDs → {len(kept)} distinct in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+JD Ranker
+=========
+Ranks hundreds or thousands of saved JDs against your resume locally, so the
+LLM agents only see the roles worth analyzing or tailoring for.
+
+- Every JD is turned into a hashed word 1-2-gram TF-IDF vector (sublinear tf,
+  smoothed idf, L2-normalized; numpy only). The whole corpus is one sparse
+  matrix held as CSR-style arrays.
+- The resume is scored against every JD in one sparse matrix-vector product
+  (cosine similarity); the top-k come back with the taxonomy skills they
+  share with the resume and the ones the resume is missing.
+- Building the matrix is the only per-corpus cost (tokens are hashed with
+  numpy over the raw bytes, not word by word); scoring 10k JDs then takes
+  tens of milliseconds.
+- `rank_jds` keeps the matrix: in memory for the last corpus, and on disk
+  under <LLM_CACHE_DIR>/jd_ranker/, keyed by a hash of the JD titles and
+  texts. Reranking an unchanged folder (a new resume, another --top_k) only
+  loads it; any added, edited or removed JD builds a new one.
+
+Configuration (environment variables):
+    LLM_CACHE_DIR       where saved indexes live (default: ~/.cache/career_agents)
+
+Usage:
+    python jd_ranker.py --resume my_resume.txt --jd_folder ./jds/ --top_k 10
+    python jd_ranker.py --resume my_resume.txt --jds jd1.txt jd2.txt --output ranking.json
+    python jd_ranker.py --resume my_resume.txt --benchmark 10000   # synthetic corpus timing
+
+Also available as `agent_1_gap_analyst.py --rank` and `run_all.py --jd_folder ... --top_k N`.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+N_FEATURES = 1 << 18        # a power of two
+DEFAULT_TOP_K = 10
+# Bump when tokenization or weighting changes; saved indexes with another version are rebuilt
+INDEX_VERSION = 1
+INDEX_ARRAYS = ("rows", "cols", "data", "idf")
+KEEP_INDEXES = 3            # saved corpora kept on disk (most recently used)
+
+_TOKEN_BYTES = np.zeros(256, dtype=bool)   # [a-z0-9+#], as in jd_dedup / ats_scorer
+_TOKEN_BYTES[np.frombuffer(b"abcdefghijklmnopqrstuvwxyz0123456789+#", dtype=np.uint8)] = True
+_HASH_BASE = 0x01000193                     # odd, so it is invertible mod 2^32
+_HASH_BASE_INV = pow(_HASH_BASE, -1, 1 << 32)
+_BIGRAM_MIX = np.uint64(0x9E3779B97F4A7C15)
+_CHUNK_BYTES = 1 << 22                      # corpus bytes hashed per numpy batch
+# Taxonomy categories reported as per-JD keyword overlap
+OVERLAP_CATEGORIES = ("hard_skills", "methodologies", "certifications", "domain_keywords")
+
+_powers_cache = (np.ones(1, dtype=np.uint32), np.ones(1, dtype=np.uint32))
+
+
+def _powers(n: int) -> tuple:
+    """BASE^i and BASE^-i (mod 2^32) for i < n"""
+    global _powers_cache
+    if len(_powers_cache[0]) < n:
+        size = 1 << (n - 1).bit_length()
+        powers = np.full(size, _HASH_BASE, dtype=np.uint32)
+        inverse = np.full(size, _HASH_BASE_INV, dtype=np.uint32)
+        powers[0] = inverse[0] = 1
+        _powers_cache = (np.cumprod(powers, dtype=np.uint32), np.cumprod(inverse, dtype=np.uint32))
+    return _powers_cache
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """Spread every input bit over the low bits (the feature index is taken modulo)"""
+    h = h.astype(np.uint64, copy=False)
+    h = h ^ (h >> np.uint64(33))
+    h = h * np.uint64(0xFF51AFD7ED558CCD)
+    return h ^ (h >> np.uint64(33))
+
+
+def _token_hashes(texts: list) -> tuple:
+    """Hash of every token in texts, in order, plus the index of the text it came from.
+
+    Tokenizing word by word in Python dominates at 10k JDs, so the texts are
+    scanned as one byte array: token boundaries come from a lookup table and
+    each token's hash from a polynomial prefix sum, position-normalized.
+    """
+    corpus = "\0".join(texts).lower().encode("utf-8")
+    buf = np.frombuffer(corpus, dtype=np.uint8)
+    doc_starts = np.concatenate(([0], np.flatnonzero(buf == 0) + 1))
+
+    is_token = np.empty(len(buf) + 2, dtype=bool)
+    is_token[0] = is_token[-1] = False
+    np.take(_TOKEN_BYTES, buf, out=is_token[1:-1])
+    starts = np.flatnonzero(is_token[1:] > is_token[:-1])
+    ends = np.flatnonzero(is_token[1:] < is_token[:-1])
+
+    hashes = np.empty(len(starts), dtype=np.uint32)
+    powers, inverse = _powers(min(len(buf), _CHUNK_BYTES))
+    lo = 0
+    while lo < len(starts):
+        # Tokens whose bytes fit in one window of the precomputed powers
+        base = starts[lo]
+        hi = max(int(np.searchsorted(ends, base + _CHUNK_BYTES, side="right")), lo + 1)
+        window = buf[base:ends[hi - 1]]
+        if len(window) > len(powers):
+            powers, inverse = _powers(len(window))
+        prefix = np.zeros(len(window) + 1, dtype=np.uint32)
+        np.cumsum(np.multiply(window, powers[:len(window)], dtype=np.uint32), dtype=np.uint32, out=prefix[1:])
+        s, e = starts[lo:hi] - base, ends[lo:hi] - base
+        hashes[lo:hi] = (prefix[e] - prefix[s]) * inverse[s]
+        lo = hi
+    per_doc = np.diff(np.searchsorted(starts, doc_starts), append=len(starts))
+    return _mix(hashes), np.repeat(np.arange(len(texts)), per_doc)
+
+
+def _features(texts: list, n_features: int) -> tuple:
+    """Hashed unigram + bigram ids of every text, concatenated, plus the text each id belongs to"""
+    ids, doc = _token_hashes(texts)
+    # Bigrams, minus the ones that straddle two texts
+    same_doc = doc[1:] == doc[:-1]
+    bigrams = _mix(ids[:-1] * _BIGRAM_MIX + ids[1:])[same_doc]
+    feats = (np.concatenate((ids, bigrams)) & np.uint64(n_features - 1)).astype(np.int64)
+    return feats, np.concatenate((doc, doc[1:][same_doc]))
+
+
+class JDRanker:
+    """TF-IDF index over a fixed set of JDs; `rank` scores a resume against all of them at once"""
+
+    def __init__(self, jds: dict, n_features: int = N_FEATURES, arrays: dict = None):
+        self.titles = list(jds)
+        self.texts = [jds[t] for t in self.titles]
+        self.n_features = n_features
+        n = len(self.titles)
+        if arrays is not None:   # a saved index of exactly these JDs (see load_ranker)
+            self.rows, self.cols, self.data, self.idf = (arrays[name] for name in INDEX_ARRAYS)
+            return
+
+        feats, doc = _features(self.texts, n_features)
+        # One sort gives per-JD term counts in row order: the CSR layout
+        shift = n_features.bit_length() - 1
+        keys = (doc << shift) | feats
+        keys.sort()
+        # Keys are non-negative, so the -1 sentinel marks the first key; no keys (no JD has a token) -> no rows
+        first = np.flatnonzero(np.diff(keys, prepend=-1))
+        counts = np.diff(first, append=len(keys))
+        keys = keys[first]
+        self.rows = keys >> shift
+        self.cols = keys & (n_features - 1)
+
+        df = np.bincount(self.cols, minlength=n_features)
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        data = ((1 + np.log(counts)) * self.idf[self.cols]).astype(np.float32)
+        norms = np.sqrt(np.bincount(self.rows, weights=data * data, minlength=n))
+        norms[norms == 0] = 1
+        self.data = data / norms[self.rows].astype(np.float32)
+        # Row and column ids fit in 32 bits; halves the matrix in memory and on disk
+        self.rows, self.cols = self.rows.astype(np.int32), self.cols.astype(np.int32)
+
+    def save(self, path: Path):
+        """Write the matrix to an .npz file (atomically, so readers never see half of it)"""
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, **{name: getattr(self, name) for name in INDEX_ARRAYS})
+        os.replace(tmp, path)
+
+    def vectorize(self, text: str) -> np.ndarray:
+        """Dense, L2-normalized TF-IDF vector of one document (the resume)"""
+        feats, _ = _features([text], self.n_features)
+        counts = np.bincount(feats, minlength=self.n_features).astype(np.float32)
+        present = counts > 0
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        vector[present] = (1 + np.log(counts[present])) * self.idf[present]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, resume: str) -> np.ndarray:
+        """Cosine similarity of the resume to every JD (sparse matrix x dense vector)"""
+        query = self.vectorize(resume)
+        scores = np.bincount(self.rows, weights=self.data * query[self.cols], minlength=len(self.titles))
+        return scores.astype(np.float64, copy=False)   # bincount of nothing comes back as ints
+
+    def rank(self, resume: str, top_k: int = DEFAULT_TOP_K, overlap: bool = True) -> list:
+        """[{title, score, matched, missing}] for the top_k best-fit JDs, best first"""
+        scores = self.scores(resume)
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        ranking = [{"title": self.titles[i], "score": round(float(scores[i]) * 100, 1)} for i in top]
+        if overlap:
+            _attach_overlap(ranking, resume, {t: self.texts[i] for t, i in zip([r["title"] for r in ranking], top)})
+        return ranking
+
+
+def _attach_overlap(ranking: list, resume: str, jds: dict):
+    """Skills each JD shares with the resume, and the ones it asks for that the resume lacks"""
+    from keyword_extractor import get_extractor
+
+    extractor = get_extractor()
+
+    def skills(text: str) -> list:
+        found = extractor.extract(text)
+        return [kw for category in OVERLAP_CATEGORIES for kw in found.get(category, [])]
+
+    have = set(skills(resume))
+    for entry in ranking:
+        wanted = skills(jds[entry["title"]])
+        entry["matched"] = [kw for kw in wanted if kw in have]
+        entry["missing"] = [kw for kw in wanted if kw not in have]
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("LLM_CACHE_DIR", "~/.cache/career_agents")).expanduser() / "jd_ranker"
+
+
+def corpus_key(jds: dict, n_features: int = N_FEATURES) -> str:
+    """Hash of everything the matrix depends on: the JDs in order, the feature count and the version"""
+    digest = hashlib.sha256(f"{INDEX_VERSION}:{n_features}".encode("ascii"))
+    for title, text in jds.items():
+        digest.update(b"\0" + str(title).encode("utf-8") + b"\0" + text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+_last = (None, None)   # (corpus key, ranker) of the most recent corpus in this process
+
+
+def load_ranker(jds: dict, n_features: int = N_FEATURES, cache_dir: Path = None) -> JDRanker:
+    """JDRanker for these JDs, reusing the last one in memory or a saved one before building"""
+    global _last
+    key = corpus_key(jds, n_features)
+    if _last[0] == key:
+        return _last[1]
+
+    folder = Path(cache_dir) if cache_dir else default_cache_dir()
+    path = folder / f"{key[:32]}.npz"
+    ranker = None
+    if path.exists():
+        try:
+            with np.load(path) as saved:
+                ranker = JDRanker(jds, n_features, {name: saved[name] for name in INDEX_ARRAYS})
+            os.utime(path)   # most recently used
+        except (OSError, KeyError, ValueError):
+            ranker = None    # unreadable or from an interrupted write: rebuild it
+    if ranker is None:
+        ranker = JDRanker(jds, n_features)
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            ranker.save(path)
+            for old in sorted(folder.glob("*.npz"), key=lambda p: p.stat().st_mtime, reverse=True)[KEEP_INDEXES:]:
+                old.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"⚠️  Could not save the JD index ({e}); it will be rebuilt next time")
+    _last = (key, ranker)
+    return ranker
+
+
+def rank_jds(resume: str, jds: dict, top_k: int = DEFAULT_TOP_K) -> list:
+    """Top-k best-fit JDs for the resume (see JDRanker.rank); the index is reused while the JDs don't change"""
+    if not jds:
+        return []
+    return load_ranker(jds).rank(resume, top_k)
+
+
+def top_jds(resume: str, jds: dict, top_k: int, verbose: bool = True) -> dict:
+    """Only the top_k best-fit JDs, best first — the filter in front of the LLM agents"""
+    if top_k is None or top_k >= len(jds):
+        return jds
+    ranking = rank_jds(resume, jds, top_k)
+    if verbose:
+        print(f"🏆 Ranked {len(jds)} JDs locally; keeping the top {len(ranking)}: "
+              f"{', '.join(r['title'] for r in ranking)}")
+    return {r["title"]: jds[r["title"]] for r in ranking}
+
+
+def print_ranking(ranking: list, total: int = None):
+    print("\n" + "=" * 60)
+    print(f"🏆 BEST-FIT JDS" + (f" (top {len(ranking)} of {total})" if total else ""))
+    print("=" * 60)
+    for i, entry in enumerate(ranking, 1):
+        print(f"\n  {i:>2}. {entry['title']} — fit {entry['score']}%")
+        if entry.get("matched"):
+            print(f"      ✅ {', '.join(entry['matched'][:10])}")
+        if entry.get("missing"):
+            print(f"      ❌ {', '.join(entry['missing'][:10])}")
+    print("\n" + "=" * 60)
+
+
+def _synthetic_jds(n: int, seed: int = 7) -> dict:
+    """n JD-sized texts drawn from the skill taxonomy, for timing"""
+    from keyword_extractor import load_taxonomy
+
+    vocab = [alias for entries in load_taxonomy().values() for names in entries.values() for alias in names]
+    filler = ("the team role you will we are looking for experience with strong ownership of quality across "
+              "services and platform delivery years in a fast paced product company").split()
+    rng = np.random.default_rng(seed)
+    jds = {}
+    for i in range(n):
+        picks = rng.choice(len(vocab), size=40)
+        words = rng.choice(len(filler), size=300)
+        jds[f"synthetic_{i:05d}"] = " ".join([vocab[p] for p in picks] + [filler[w] for w in words])
+    return jds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank JDs by fit to your resume (local, no LLM calls)")
+    parser.add_argument("--resume", required=True, help="Path to your resume .txt file")
+    parser.add_argument("--jds", nargs="+", help="Paths to JD text files")
+    parser.add_argument("--jd_folder", help="Folder containing JD .txt files")
+    parser.add_argument("--top_k", type=int, default=DEFAULT_TOP_K, help="How many best-fit JDs to show")
+    parser.add_argument("--output", help="Save the ranking as JSON to this file")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Time ranking against N synthetic JDs")
+    args = parser.parse_args()
+
+    resume = Path(args.resume).read_text(encoding="utf-8")
+
+    if args.benchmark:
+        jds = _synthetic_jds(args.benchmark)
+        started = time.perf_counter()
+        ranker = JDRanker(jds)
+        built = time.perf_counter()
+        ranker.scores(resume)
+        scored = time.perf_counter()
+        ranking = ranker.rank(resume, args.top_k)
+        ranked = time.perf_counter()
+        print(f"⏱️  {len(jds)} JDs: index built in {built - started:.2f}s, "
+              f"scored in {(scored - built) * 1000:.1f}ms, "
+              f"top {len(ranking)} with keyword overlap in {(ranked - scored) * 1000:.1f}ms")
+        return
+
+    from agent_1_gap_analyst import load_jds_from_folder
+    from jd_cleaner import load_jd_text
+
+    jds = load_jds_from_folder(args.jd_folder) if args.jd_folder else {}
+    for path in args.jds or []:
+        jds[Path(path).stem] = load_jd_text(path)
+    if not jds:
+        print("❌ Error: Provide at least one JD via --jds or --jd_folder")
+        return
+
+    started = time.perf_counter()
+    ranking = rank_jds(resume, jds, args.top_k)
+    elapsed = time.perf_counter() - started
+    print_ranking(ranking, len(jds))
+    print(f"⏱️  Ranked {len(jds)} JDs in {elapsed * 1000:.0f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(ranking, f, indent=2)
+        print(f"💾 Ranking saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
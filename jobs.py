@@ -0,0 +1,234 @@
+"""
+Background Pipeline Jobs
+========================
+Runs the full career pipeline (`run_all.orchestrate`) for the web server on a
+small pool of worker threads, so a multi-minute run never holds an HTTP worker.
+
+- Bounded: JOBS_WORKERS pipelines run at once, at most JOBS_MAX_QUEUED more
+  wait; beyond that `submit` raises QueueFull (the servers answer 503)
+- Persistent: each job lives in JOBS_DIR/<id>/ — job.json (status, per-step
+  progress, events), the inputs, the artifacts and the pipeline's console log.
+  Jobs that were queued or running when the server stopped are re-queued when
+  it starts again.
+- Progress: every step start/finish is recorded as an event; `events_since`
+  lets the servers poll or stream them
+
+Jobs are owned by one server process; don't point several servers at the same
+JOBS_DIR.
+
+Configuration (environment variables):
+    JOBS_DIR          where jobs are stored (default: ./jobs)
+    JOBS_WORKERS      pipelines running at once (default: 2)
+    JOBS_MAX_QUEUED   jobs allowed to wait for a worker (default: 20)
+"""
+
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dag_executor import capture_output
+
+INPUTS = {"resume": "resume.txt", "jd": "jd.txt", "profile": "profile.txt"}
+LOG_FILE = "log.txt"
+FINISHED = ("succeeded", "failed")
+JOB_ID = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{6}$")
+
+
+class JobNotFound(KeyError):
+    """Unknown job id"""
+
+
+class QueueFull(RuntimeError):
+    """Too many jobs are already waiting for a worker"""
+
+
+def _artifact_files() -> dict:
+    from run_all import ARTIFACTS
+    return dict(ARTIFACTS, log=LOG_FILE)
+
+
+class JobManager:
+    def __init__(self, root: str = "jobs", workers: int = 2, max_queued: int = 20):
+        self.root = os.path.abspath(root)
+        self.workers = workers
+        self.max_queued = max_queued
+        self._jobs = {}                  # id -> job record (as saved in job.json)
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        os.makedirs(self.root, exist_ok=True)
+        self._load()
+
+    # ── Persistence ────────────────────────────────────────
+    def _dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+
+    def _save(self, job: dict):
+        path = os.path.join(self._dir(job["id"]), "job.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=2)
+        os.replace(tmp, path)
+
+    def _load(self):
+        resumed = []
+        for job_id in sorted(os.listdir(self.root)):
+            path = os.path.join(self._dir(job_id), "job.json")
+            if not JOB_ID.match(job_id) or not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+            self._jobs[job_id] = job
+            if job["status"] not in FINISHED:
+                resumed.append(job)
+        for job in resumed:
+            # Interrupted by a restart: run it again from the start
+            job.update(status="queued", started=None, steps={})
+            self._event(job, "requeued")
+            self._save(job)
+            self._pool.submit(self._run, job["id"])
+
+    # ── Public API ─────────────────────────────────────────
+    def submit(self, resume: str, jd: str, profile: str = None) -> dict:
+        """Queue a pipeline run; returns the job record"""
+        with self._cond:
+            queued = sum(1 for j in self._jobs.values() if j["status"] == "queued")
+            if queued >= self.max_queued:
+                raise QueueFull(f"{queued} pipeline jobs are already waiting; try again later")
+            job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+            os.makedirs(self._dir(job_id))
+            for name, text in (("resume", resume), ("jd", jd), ("profile", profile)):
+                if text:
+                    with open(os.path.join(self._dir(job_id), INPUTS[name]), "w", encoding="utf-8") as f:
+                        f.write(text)
+            job = {"id": job_id, "status": "queued", "created": time.time(), "started": None,
+                   "finished": None, "has_profile": bool(profile), "error": None, "summary": {},
+                   "steps": {}, "artifacts": [], "events": []}
+            self._event(job, "queued")
+            self._jobs[job_id] = job
+            self._save(job)
+        self._pool.submit(self._run, job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise JobNotFound(job_id)
+            return json.loads(json.dumps(job))
+
+    def recent(self, limit: int = 50) -> list:
+        """Most recent jobs first, without their event history"""
+        with self._cond:
+            jobs = sorted(self._jobs.values(), key=lambda j: j["created"], reverse=True)[:limit]
+            return [{k: v for k, v in j.items() if k != "events"} for j in jobs]
+
+    def events_since(self, job_id: str, index: int = 0, timeout: float = 0.0):
+        """(events after `index`, finished?) — waits up to `timeout` seconds for a new event"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise JobNotFound(job_id)
+            if timeout and len(job["events"]) <= index and job["status"] not in FINISHED:
+                self._cond.wait(timeout)
+            return list(job["events"][index:]), job["status"] in FINISHED
+
+    def artifact_path(self, job_id: str, name: str) -> str:
+        """Path of a finished artifact (gap, tailored_resume, outreach, interview_prep, log), or None"""
+        self.get(job_id)
+        filename = _artifact_files().get(name)
+        if filename is None:
+            return None
+        path = os.path.join(self._dir(job_id), filename)
+        return path if os.path.exists(path) else None
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = {status: 0 for status in ("queued", "running") + FINISHED}
+            for job in self._jobs.values():
+                stats[job["status"]] = stats.get(job["status"], 0) + 1
+        stats["workers"] = self.workers
+        stats["max_queued"] = self.max_queued
+        return stats
+
+    # ── Worker ─────────────────────────────────────────────
+    def _event(self, job: dict, event: str, **fields):
+        job["events"].append(dict(fields, event=event, time=round(time.time(), 3)))
+
+    def _update(self, job_id: str, event: str = None, **fields):
+        with self._cond:
+            job = self._jobs[job_id]
+            job.update(fields)
+            if event:
+                self._event(job, event, **{k: v for k, v in fields.items() if k in ("status", "error")})
+            self._save(job)
+            self._cond.notify_all()
+
+    def _on_step(self, job_id: str, event: str, run):
+        status = {"start": "running", "skipped": "skipped"}.get(event) or ("failed" if run.error else "done")
+        with self._cond:
+            job = self._jobs[job_id]
+            step = {"status": status}
+            if event == "end":
+                step["duration"] = round(run.duration, 2)
+            job["steps"][run.name] = step
+            self._event(job, "step", step=run.name, **step)
+            self._save(job)
+            self._cond.notify_all()
+
+    def _run(self, job_id: str):
+        from run_all import orchestrate
+
+        folder = self._dir(job_id)
+        inputs = {name: os.path.join(folder, filename) for name, filename in INPUTS.items()}
+        self._update(job_id, "started", status="running", started=time.time())
+        error, runs = None, {}
+        try:
+            with open(os.path.join(folder, LOG_FILE), "w", encoding="utf-8", buffering=1) as log, \
+                    capture_output(log):
+                runs = orchestrate(inputs["resume"], inputs["jd"],
+                                   inputs["profile"] if os.path.exists(inputs["profile"]) else None,
+                                   output_dir=folder, on_step=lambda e, r: self._on_step(job_id, e, r))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        summary = {}
+        tailor = getattr(runs.get("tailor"), "result", None) or {}
+        gap = getattr(runs.get("gap"), "result", None) or {}
+        if tailor:
+            summary["ats_match_score"] = tailor.get("ats_match_score")
+            summary["local_ats_score"] = tailor.get("local_ats_score")
+        if gap:
+            summary["top_3_priorities"] = gap.get("top_3_priorities", [])
+        artifacts = [name for name, filename in _artifact_files().items()
+                     if os.path.exists(os.path.join(folder, filename))]
+        self._update(job_id, "finished", status="failed" if error else "succeeded", finished=time.time(),
+                     error=error, summary=summary, artifacts=artifacts)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_jobs() -> JobManager:
+    """Process-wide job manager, configured from the environment on first use (resumes pending jobs)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(
+                root=os.environ.get("JOBS_DIR", "jobs"),
+                workers=int(os.environ.get("JOBS_WORKERS", 2)),
+                max_queued=int(os.environ.get("JOBS_MAX_QUEUED", 20)),
+            )
+        return _manager
+
+
+def job_stats() -> dict:
+    """Job counts by status; empty until the job manager has been started"""
+    return _manager.stats() if _manager is not None else {}
@@ -0,0 +1,134 @@
+"""
+Incremental JSON Parser
+=======================
+Parses a JSON object while it is still streaming in, so callers can act on
+parts of a long model response before it finishes.
+
+    parser = IncrementalJSONParser()
+    for delta in cached_stream(...):
+        for event in parser.feed(delta):
+            ...
+
+Events:
+- ("field", key, value)       a top-level field is complete
+- ("item", key, index, value) an element of a top-level array is complete
+
+Anything before the first "{" (e.g. a ```json fence) is skipped. Events are
+a preview only: callers should still parse the full text at the end, so the
+final result is exactly what a batch parse would give.
+"""
+
+import json
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0            # next character of buffer to scan
+        self.stack = []         # open containers: "{" or "["
+        self.in_string = False
+        self.escaped = False
+        self.done = False
+        self._key = None        # current top-level key
+        self._key_start = None
+        self._value_start = None
+        self._expect_key = True
+        self._item_start = None
+        self._item_index = 0
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        events = []
+        buf = self.buffer
+        for i in range(self.pos, len(buf)):
+            if self.done:
+                break
+            self._scan(buf, i, buf[i], events)
+        self.pos = len(buf)
+        return events
+
+    def _scan(self, buf: str, i: int, c: str, events: list):
+        if not self.stack:
+            if c == "{":
+                self.stack.append("{")
+            return
+
+        depth = len(self.stack)
+        if self.in_string:
+            if self.escaped:
+                self.escaped = False
+            elif c == "\\":
+                self.escaped = True
+            elif c == '"':
+                self.in_string = False
+                if depth == 1 and self._expect_key and self._key_start is not None:
+                    self._key = self._decode(buf[self._key_start:i + 1])
+                    self._key_start = None
+            return
+
+        if c in " \t\r\n":
+            return
+
+        # First character of a top-level value or of a top-level array element
+        if depth == 1 and not self._expect_key and self._value_start is None and c not in ",}":
+            self._value_start = i
+        elif self._in_top_array() and self._item_start is None and c not in ",]":
+            self._item_start = i
+
+        if c == '"':
+            self.in_string = True
+            if depth == 1 and self._expect_key:
+                self._key_start = i
+        elif c == ":" and depth == 1:
+            self._expect_key = False
+        elif c in "{[":
+            self.stack.append(c)
+            if len(self.stack) == 2 and c == "[":
+                self._item_index = 0
+                self._item_start = None
+        elif c in "}]":
+            if self._in_top_array() and c == "]":
+                self._end_item(buf[self._item_start:i] if self._item_start is not None else None, events)
+            elif depth == 1:
+                self._end_value(buf[self._value_start:i] if self._value_start is not None else None, events)
+            self.stack.pop()
+            if not self.stack:
+                self.done = True
+            elif len(self.stack) == 1:
+                self._end_value(buf[self._value_start:i + 1], events)
+            elif self._in_top_array():
+                self._end_item(buf[self._item_start:i + 1], events)
+        elif c == ",":
+            if depth == 1:
+                self._end_value(buf[self._value_start:i] if self._value_start is not None else None, events)
+                self._expect_key = True
+            elif self._in_top_array():
+                self._end_item(buf[self._item_start:i] if self._item_start is not None else None, events)
+
+    def _in_top_array(self) -> bool:
+        return len(self.stack) == 2 and self.stack[1] == "["
+
+    def _end_value(self, text, events: list):
+        if text is not None and self._key is not None:
+            value = self._decode(text)
+            if value is not _INVALID:
+                events.append(("field", self._key, value))
+        self._value_start = None
+
+    def _end_item(self, text, events: list):
+        if text is not None:
+            value = self._decode(text)
+            if value is not _INVALID:
+                events.append(("item", self._key, self._item_index, value))
+            self._item_index += 1
+        self._item_start = None
+
+    @staticmethod
+    def _decode(text: str):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return _INVALID
+
+
+_INVALID = object()
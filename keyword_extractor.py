@@ -0,0 +1,193 @@
+"""
+Local Keyword Extractor
+=======================
+Fills the same seven-key keyword dict as `extract_keywords_from_jd`
+(hard_skills, soft_skills, methodologies, certifications, domain_keywords,
+action_verbs, title_variants) from a bundled QA/engineering skill taxonomy,
+without a round trip to the model.
+
+- Every alias in skill_taxonomy.json is matched in one Aho-Corasick pass
+  and reported under its canonical name ("k8s" → "Kubernetes").
+- Only categories the taxonomy can't fill confidently (too few hits, e.g.
+  domain_keywords or title_variants for an unusual JD) are sent to the LLM,
+  in one small call. With no client, extraction is fully offline.
+- Extend the taxonomy with your own JSON files (same shape) via
+  SKILL_TAXONOMY_EXTRA=path1.json:path2.json or --taxonomy.
+
+Usage:
+    python keyword_extractor.py --jds jd1.txt jd2.txt
+    python keyword_extractor.py --jd_folder ./jds/ --offline --output keywords.json
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from ats_scorer import KeywordMatcher
+
+KEYWORD_CATEGORIES = [
+    "hard_skills", "soft_skills", "methodologies", "certifications",
+    "domain_keywords", "action_verbs", "title_variants",
+]
+
+BUNDLED_TAXONOMY = Path(__file__).with_name("skill_taxonomy.json")
+
+# Fewer local hits than this means the JD probably uses terms the taxonomy lacks
+MIN_CONFIDENT_HITS = {"hard_skills": 3, "domain_keywords": 1, "title_variants": 1}
+
+
+def load_taxonomy(extra_paths: list = None) -> dict:
+    """Bundled taxonomy merged with any extra taxonomy files (later files win)"""
+    paths = [BUNDLED_TAXONOMY]
+    env_extra = os.environ.get("SKILL_TAXONOMY_EXTRA", "")
+    paths += [Path(p) for p in env_extra.split(os.pathsep) if p]
+    paths += [Path(p) for p in extra_paths or []]
+
+    taxonomy = {category: {} for category in KEYWORD_CATEGORIES}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for category, entries in data.items():
+            bucket = taxonomy.setdefault(category, {})
+            for canonical, aliases in entries.items():
+                merged = bucket.setdefault(canonical, [])
+                merged.extend(a for a in [canonical, *aliases] if a not in merged)
+    return taxonomy
+
+
+class LocalKeywordExtractor:
+    def __init__(self, taxonomy: dict = None):
+        self.taxonomy = taxonomy or load_taxonomy()
+        self._targets = []
+        aliases = []
+        for category, entries in self.taxonomy.items():
+            for canonical, names in entries.items():
+                for alias in names:
+                    aliases.append(alias)
+                    self._targets.append((category, canonical))
+        self.matcher = KeywordMatcher(aliases)
+
+    def extract(self, jd: str) -> dict:
+        found = self.matcher.find(jd)
+        keywords = {category: [] for category in KEYWORD_CATEGORIES}
+        for pid in sorted(found):
+            category, canonical = self._targets[pid]
+            bucket = keywords.setdefault(category, [])
+            if canonical not in bucket:
+                bucket.append(canonical)
+        return keywords
+
+    @staticmethod
+    def uncertain_categories(keywords: dict) -> list:
+        return [c for c, n in MIN_CONFIDENT_HITS.items() if len(keywords.get(c, [])) < n]
+
+
+_default_extractor = None
+_default_lock = threading.Lock()
+
+
+def get_extractor() -> LocalKeywordExtractor:
+    global _default_extractor
+    with _default_lock:
+        if _default_extractor is None:
+            _default_extractor = LocalKeywordExtractor()
+        return _default_extractor
+
+
+def llm_fill_categories(client, jd: str, categories: list) -> dict:
+    """One small LLM call for just the categories the taxonomy couldn't fill"""
+    from llm_cache import cached_completion
+
+    shape = ",\n".join(f'  "{c}": ["..."]' for c in categories)
+    raw = cached_completion(
+        client,
+        model="grok-beta",
+        max_tokens=400,
+        messages=[{
+            "role": "user",
+            "content": f"""Extract ATS keywords from this job description for these categories only:
+{{
+{shape}
+}}
+hard_skills = tools, technologies, frameworks; domain_keywords = industry/business domain
+(fintech, e-commerce, ...); title_variants = exact role titles mentioned.
+
+JOB DESCRIPTION:
+{jd}
+
+Return ONLY valid JSON."""
+        }]
+    ).strip()
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        match = re.search(r"\{.*\}", raw, re.DOTALL)
+        try:
+            return json.loads(match.group()) if match else {}
+        except json.JSONDecodeError:
+            return {}
+
+
+def extract_keywords(jd: str, client=None, extractor: LocalKeywordExtractor = None) -> dict:
+    """Local-first extraction; the LLM (if a client is given) only fills uncertain categories"""
+    extractor = extractor or get_extractor()
+    keywords = extractor.extract(jd)
+    uncertain = extractor.uncertain_categories(keywords)
+    if client is None or not uncertain:
+        return keywords
+
+    extra = llm_fill_categories(client, jd, uncertain)
+    for category in uncertain:
+        bucket = keywords[category]
+        seen = {k.lower() for k in bucket}
+        for kw in extra.get(category, []) or []:
+            if isinstance(kw, str) and kw.strip() and kw.lower() not in seen:
+                bucket.append(kw.strip())
+                seen.add(kw.lower())
+    return keywords
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local-first JD keyword extractor")
+    parser.add_argument("--jds", nargs="+", help="Paths to JD text files")
+    parser.add_argument("--jd_folder", help="Folder containing JD .txt files")
+    parser.add_argument("--taxonomy", nargs="+", help="Extra taxonomy JSON file(s) to merge in")
+    parser.add_argument("--offline", action="store_true", help="Never call the LLM")
+    parser.add_argument("--output", help="Save {jd_stem: keywords} JSON to this file")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.jds or []]
+    if args.jd_folder:
+        paths += sorted(Path(args.jd_folder).glob("*.txt"))
+    if not paths:
+        print("❌ Error: Provide at least one JD via --jds or --jd_folder")
+        return
+
+    extractor = LocalKeywordExtractor(load_taxonomy(args.taxonomy))
+    client = None
+    if not args.offline:
+        from xai_client import get_client
+        client = get_client()
+
+    started = time.perf_counter()
+    results = {}
+    for path in paths:
+        jd = path.read_text(encoding="utf-8")
+        results[path.stem] = extract_keywords(jd, client, extractor)
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Keywords for {len(results)} JDs saved to: {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+    print(f"⏱️  Extracted keywords from {len(results)} JDs in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
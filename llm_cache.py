@@ -0,0 +1,428 @@
+"""
+Shared LLM Response Cache
+=========================
+Content-addressed, on-disk cache for chat completions. Every agent and the
+Flask proxy route their calls through `cached_completion`, so re-running the
+pipeline on an unchanged resume + JD is served from disk instead of xAI.
+Cache misses go through resilience.py (deadlines, retries, circuit breaker).
+`async_cached_completion` / `async_cached_stream` are the asyncio versions
+used by the ASGI server (cache reads and writes run in a worker thread).
+
+- Key: SHA-256 of (model, messages, max_tokens, temperature)
+- Storage: a single SQLite file (safe across threads and processes)
+- Limits: max total size (LRU eviction by last access) and TTL
+
+Configuration (environment variables):
+    LLM_CACHE_DIR        cache directory (default: ~/.cache/career_agents)
+    LLM_CACHE_MAX_MB     max total size of cached responses (default: 200)
+    LLM_CACHE_TTL_HOURS  entry lifetime in hours (default: 168 = 7 days)
+    LLM_CACHE_DISABLE    set to 1 to bypass the cache entirely
+
+Usage:
+    python llm_cache.py --stats
+    python llm_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from resilience import async_resilient_call, resilient_call
+
+
+def cache_key(model: str, messages: list, max_tokens=None, temperature=None) -> str:
+    """Stable hash of everything that determines a completion"""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL, size limit and LRU eviction"""
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, "seconds_saved": 0.0}
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                content TEXT NOT NULL,
+                usage TEXT,
+                size INTEGER NOT NULL,
+                latency REAL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Return {"content", "usage"} for a fresh entry, or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, usage, latency, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            content, usage, latency, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._stats["misses"] += 1
+                self._stats["expired"] += 1
+                return None
+
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._stats["hits"] += 1
+            self._stats["seconds_saved"] += latency or 0.0
+
+        return {"content": content, "usage": json.loads(usage) if usage else None}
+
+    def put(self, key: str, content: str, model: str = None, usage: dict = None, latency: float = None):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, model, content, usage, size, latency, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, content, json.dumps(usage) if usage else None, size, latency, now, now),
+            )
+            self._stats["stores"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least-recently-used ones until under the size limit"""
+        cutoff = time.time() - self.ttl_seconds
+        cur = self._conn.execute("DELETE FROM entries WHERE created_at < ?", (cutoff,))
+        self._stats["expired"] += max(cur.rowcount, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus on-disk totals"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["seconds_saved"] = round(stats["seconds_saved"], 1)
+        stats["entries"] = entries
+        stats["size_bytes"] = size
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache shared by all agents (None when disabled)"""
+    global _cache
+    if os.environ.get("LLM_CACHE_DISABLE", "").lower() in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            cache_dir = os.environ.get("LLM_CACHE_DIR") or os.path.join(Path.home(), ".cache", "career_agents")
+            _cache = LLMCache(
+                os.path.join(cache_dir, "llm_cache.sqlite3"),
+                max_bytes=int(float(os.environ.get("LLM_CACHE_MAX_MB", 200)) * 1024 * 1024),
+                ttl_seconds=float(os.environ.get("LLM_CACHE_TTL_HOURS", 168)) * 3600,
+            )
+        return _cache
+
+
+_observers = []
+
+
+def add_call_observer(fn):
+    """fn(event) is called for every cache hit and around every upstream call.
+
+    Events carry model, messages and phase ("start" / "end", or cache_hit=True);
+    "end" events add latency, usage (when the API reports it) or error=True.
+    """
+    if fn not in _observers:
+        _observers.append(fn)
+
+
+def _notify(**event):
+    for fn in _observers:
+        try:
+            fn(event)
+        except Exception:
+            pass   # telemetry must never break a call
+
+
+def _usage_dict(usage):
+    if usage is None:
+        return None
+    return usage.model_dump() if hasattr(usage, "model_dump") else dict(usage)
+
+
+def _params(model: str, messages: list, max_tokens, temperature, stream: bool = False) -> dict:
+    params = {"model": model, "messages": messages}
+    if stream:
+        params["stream"] = True
+        params["stream_options"] = {"include_usage": True}   # token counts arrive in a final chunk
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    if temperature is not None:
+        params["temperature"] = temperature
+    return params
+
+
+def cached_completion(client, model: str, messages: list, max_tokens: int = None,
+                      temperature: float = None, use_cache: bool = True) -> str:
+    """Drop-in for client.chat.completions.create(...).choices[0].message.content"""
+    cache = get_cache() if use_cache else None
+    key = cache_key(model, messages, max_tokens, temperature)
+
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            if _observers:
+                _notify(model=model, messages=messages, cache_hit=True)
+            return hit["content"]
+
+    params = _params(model, messages, max_tokens, temperature)
+
+    if _observers:
+        _notify(model=model, messages=messages, phase="start")
+    started = time.time()
+    try:
+        response = resilient_call(lambda timeout: client.chat.completions.create(**params, timeout=timeout))
+    except Exception:
+        if _observers:
+            _notify(model=model, messages=messages, phase="end", error=True, latency=time.time() - started)
+        raise
+    latency = time.time() - started
+    content = response.choices[0].message.content
+    usage = _usage_dict(getattr(response, "usage", None))
+    if _observers:
+        _notify(model=model, messages=messages, phase="end", latency=latency, usage=usage)
+
+    if cache is not None and content:
+        cache.put(key, content, model=model, usage=usage, latency=latency)
+
+    return content
+
+
+def cached_stream(client, model: str, messages: list, max_tokens: int = None,
+                  temperature: float = None, use_cache: bool = True):
+    """Streaming variant of cached_completion: yields content deltas as they arrive.
+
+    A cache hit is yielded as a single delta. The full text is cached only when
+    the upstream stream finishes; closing the generator early (e.g. the HTTP
+    client went away) closes the upstream response so no more tokens are spent.
+    """
+    cache = get_cache() if use_cache else None
+    key = cache_key(model, messages, max_tokens, temperature)
+
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            if _observers:
+                _notify(model=model, messages=messages, cache_hit=True)
+            yield hit["content"]
+            return
+
+    params = _params(model, messages, max_tokens, temperature, stream=True)
+
+    if _observers:
+        _notify(model=model, messages=messages, phase="start")
+    started = time.time()
+    failed = True
+    usage = None
+    parts = []
+    try:
+        # Only opening the stream is retried; once deltas have been yielded they can't be taken back
+        stream = resilient_call(lambda timeout: client.chat.completions.create(**params, timeout=timeout),
+                                hedge=False)
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = _usage_dict(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            failed = False
+        finally:
+            stream.close()
+    except GeneratorExit:
+        failed = False   # the consumer stopped early; not an upstream error
+        raise
+    finally:
+        if _observers:
+            _notify(model=model, messages=messages, phase="end", error=failed,
+                    latency=time.time() - started, usage=usage)
+
+    if cache is not None and parts:
+        cache.put(key, "".join(parts), model=model, usage=usage, latency=time.time() - started)
+
+
+async def async_cached_completion(client, model: str, messages: list, max_tokens: int = None,
+                                  temperature: float = None, use_cache: bool = True) -> str:
+    """cached_completion for an AsyncOpenAI client"""
+    import asyncio   # only async callers need it, and they have already loaded it
+    cache = get_cache() if use_cache else None
+    key = cache_key(model, messages, max_tokens, temperature)
+
+    if cache is not None:
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            if _observers:
+                _notify(model=model, messages=messages, cache_hit=True)
+            return hit["content"]
+
+    params = _params(model, messages, max_tokens, temperature)
+
+    if _observers:
+        _notify(model=model, messages=messages, phase="start")
+    started = time.time()
+    try:
+        response = await async_resilient_call(
+            lambda timeout: client.chat.completions.create(**params, timeout=timeout))
+    except BaseException as exc:
+        if _observers:
+            _notify(model=model, messages=messages, phase="end", latency=time.time() - started,
+                    error=not isinstance(exc, asyncio.CancelledError))
+        raise
+    latency = time.time() - started
+    content = response.choices[0].message.content
+    usage = _usage_dict(getattr(response, "usage", None))
+    if _observers:
+        _notify(model=model, messages=messages, phase="end", latency=latency, usage=usage)
+
+    if cache is not None and content:
+        await asyncio.to_thread(cache.put, key, content, model=model, usage=usage, latency=latency)
+
+    return content
+
+
+async def async_cached_stream(client, model: str, messages: list, max_tokens: int = None,
+                              temperature: float = None, use_cache: bool = True):
+    """cached_stream for an AsyncOpenAI client (an async generator of deltas).
+
+    Cancelling the consumer, or calling aclose(), closes the upstream response.
+    """
+    import asyncio
+    cache = get_cache() if use_cache else None
+    key = cache_key(model, messages, max_tokens, temperature)
+
+    if cache is not None:
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            if _observers:
+                _notify(model=model, messages=messages, cache_hit=True)
+            yield hit["content"]
+            return
+
+    params = _params(model, messages, max_tokens, temperature, stream=True)
+
+    if _observers:
+        _notify(model=model, messages=messages, phase="start")
+    started = time.time()
+    failed = True
+    usage = None
+    parts = []
+    try:
+        stream = await async_resilient_call(
+            lambda timeout: client.chat.completions.create(**params, timeout=timeout), hedge=False)
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = _usage_dict(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            failed = False
+        finally:
+            await stream.close()
+    except (GeneratorExit, asyncio.CancelledError):
+        failed = False   # the consumer stopped early; not an upstream error
+        raise
+    finally:
+        if _observers:
+            _notify(model=model, messages=messages, phase="end", error=failed,
+                    latency=time.time() - started, usage=usage)
+
+    if cache is not None and parts:
+        await asyncio.to_thread(cache.put, key, "".join(parts), model=model, usage=usage,
+                                latency=time.time() - started)
+
+
+def print_cache_stats():
+    cache = get_cache()
+    if cache is None:
+        return
+    s = cache.stats()
+    print(f"🗄️  LLM cache: {s['hits']} hits / {s['misses']} misses "
+          f"({s['hit_rate']:.0%} hit rate, ~{s['seconds_saved']}s saved) — "
+          f"{s['entries']} entries, {s['size_bytes'] / 1024 / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared LLM response cache")
+    parser.add_argument("--stats", action="store_true", help="Show cache statistics")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached responses")
+    args = parser.parse_args()
+
+    cache = get_cache()
+    if cache is None:
+        print("⏭️  Cache disabled (LLM_CACHE_DISABLE is set)")
+        return
+
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Cache cleared: {cache.path}")
+    else:
+        print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Prometheus Metrics
+==================
+In-process counters, gauges and histograms for the Flask proxy, rendered in
+the Prometheus text exposition format at /api/metrics. No client library is
+needed; each update is a dict lookup and an add under one lock, cheap enough
+to leave on under load.
+
+Upstream calls are observed through llm_cache (cache hits included), labelled
+by model and by the agent whose system prompt drove the call. Requests set
+the agent with `agent_context(...)`; unknown agents are labelled by a short
+hash of their system prompt, capped at MAX_PROMPT_LABELS distinct values.
+
+Cache, connection-pool, resilience, coalescing, session and background-job
+counters are collected at scrape time.
+"""
+
+import contextvars
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+KNOWN_AGENTS = {"gap", "tailor", "outreach", "interview"}
+MAX_PROMPT_LABELS = 50
+
+_lock = threading.Lock()
+_metrics = {}            # name -> metric
+_collectors = []         # callables returning [(name, type, help, [(labels, value)])]
+
+current_agent = contextvars.ContextVar("current_agent", default="")
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        return [(self.name, key, (), value) for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        self.inc(1, **labels)
+        try:
+            yield
+        finally:
+            self.dec(1, **labels)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help = name, help_text
+        self.buckets = tuple(buckets)
+        self.values = {}     # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with _lock:
+            row = self.values.get(key)
+            if row is None:
+                row = self.values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def samples(self):
+        out = []
+        for key, row in self.values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                out.append((self.name + "_bucket", key, (("le", _format_value(bound)),), cumulative))
+            out.append((self.name + "_bucket", key, (("le", "+Inf"),), row[-1]))
+            out.append((self.name + "_sum", key, (), row[-2]))
+            out.append((self.name + "_count", key, (), row[-1]))
+        return out
+
+
+def _register(metric):
+    with _lock:
+        return _metrics.setdefault(metric.name, metric)
+
+
+def counter(name: str, help_text: str) -> Counter:
+    return _register(Counter(name, help_text))
+
+
+def gauge(name: str, help_text: str) -> Gauge:
+    return _register(Gauge(name, help_text))
+
+
+def histogram(name: str, help_text: str, buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, buckets))
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of raw samples (0.0 for none), for batch progress lines and benchmarks"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def register_collector(fn):
+    """fn() -> [(name, type, help, [(labels dict, value)])], called on every scrape"""
+    with _lock:
+        _collectors.append(fn)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    with _lock:
+        metrics = list(_metrics.values())
+        families = [(m.name, m.type, m.help, m.samples()) for m in metrics]
+        collectors = list(_collectors)
+    for name, kind, help_text, samples in families:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f"{sample}{_format_labels(key, extra)} {_format_value(value)}"
+                  for sample, key, extra, value in samples]
+    for collect in collectors:
+        try:
+            collected = collect()
+        except Exception:
+            continue   # a broken collector must not take down the scrape
+        for name, kind, help_text, values in collected:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}" for labels, value in values]
+    return "\n".join(lines) + "\n"
+
+
+# ── Agent attribution ──────────────────────────────────────
+_prompt_labels = {}
+
+
+def agent_label(agent: str = "", messages: list = None) -> str:
+    """Known agent name, else a short hash of the system prompt (bounded cardinality)"""
+    if agent in KNOWN_AGENTS:
+        return agent
+    system = next((m.get("content", "") for m in messages or [] if m.get("role") == "system"), "")
+    if not system:
+        return "none"
+    digest = "sys_" + hashlib.sha1(system.encode("utf-8")).hexdigest()[:8]
+    with _lock:
+        if digest not in _prompt_labels:
+            if len(_prompt_labels) >= MAX_PROMPT_LABELS:
+                return "other"
+            _prompt_labels[digest] = True
+    return digest
+
+
+@contextmanager
+def agent_context(agent: str):
+    token = current_agent.set(agent)
+    try:
+        yield
+    finally:
+        current_agent.reset(token)
+
+
+# ── Standard metrics ───────────────────────────────────────
+HTTP_REQUESTS = counter("career_agents_http_requests_total", "HTTP requests by endpoint, model and status")
+HTTP_DURATION = histogram("career_agents_http_request_duration_seconds", "Total request latency by endpoint")
+HTTP_IN_FLIGHT = gauge("career_agents_http_in_flight_requests", "Requests currently being served")
+LLM_CALLS = counter("career_agents_llm_calls_total", "LLM calls by model, agent and outcome (hit/miss/error)")
+LLM_IN_FLIGHT = gauge("career_agents_llm_in_flight_calls", "Upstream LLM calls currently running")
+LLM_LATENCY = histogram("career_agents_llm_upstream_duration_seconds", "Upstream call latency (cache misses)")
+PROMPT_TOKENS = histogram("career_agents_llm_prompt_tokens", "Prompt tokens per upstream call", TOKEN_BUCKETS)
+COMPLETION_TOKENS = histogram("career_agents_llm_completion_tokens", "Completion tokens per upstream call",
+                              TOKEN_BUCKETS)
+TOKENS = counter("career_agents_llm_tokens_total", "Tokens used by model, agent and kind (prompt/completion)")
+
+
+def observe_llm_call(event: dict):
+    """llm_cache call observer: one event per cache hit, upstream call or failure"""
+    model = event.get("model", "")
+    if event.get("phase") == "start":
+        LLM_IN_FLIGHT.inc(model=model)
+        return
+    if event.get("phase") == "end":
+        LLM_IN_FLIGHT.dec(model=model)
+    agent = current_agent.get() or agent_label(messages=event.get("messages"))
+    outcome = "error" if event.get("error") else ("hit" if event.get("cache_hit") else "miss")
+    LLM_CALLS.inc(model=model, agent=agent, outcome=outcome)
+    if outcome != "miss":
+        return
+    LLM_LATENCY.observe(event.get("latency", 0.0), model=model, agent=agent)
+    usage = event.get("usage") or {}
+    for kind, hist in (("prompt", PROMPT_TOKENS), ("completion", COMPLETION_TOKENS)):
+        n = usage.get(f"{kind}_tokens")
+        if n is not None:
+            hist.observe(n, model=model, agent=agent)
+            TOKENS.inc(n, model=model, agent=agent, kind=kind)
+
+
+@contextmanager
+def track_request(endpoint: str):
+    """Times a request and yields a dict the caller fills with model/status"""
+    info = {"model": "", "status": 200}
+    started = time.perf_counter()
+    with HTTP_IN_FLIGHT.track(endpoint=endpoint):
+        try:
+            yield info
+        except Exception:
+            info["status"] = 500
+            raise
+        finally:
+            HTTP_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+            HTTP_REQUESTS.inc(endpoint=endpoint, model=info["model"], status=str(info["status"]))
+
+
+def _collect_dependencies():
+    from jobs import job_stats
+    from llm_cache import get_cache
+    from resilience import resilience_stats
+    from session_store import get_store
+    from singleflight import coalescing_stats
+    from xai_client import connection_stats
+
+    families = []
+    cache = get_cache()
+    if cache is not None:
+        s = cache.stats()
+        families += [
+            ("career_agents_cache_lookups_total", "counter", "LLM cache lookups by result",
+             [({"result": "hit"}, s["hits"]), ({"result": "miss"}, s["misses"])]),
+            ("career_agents_cache_size_bytes", "gauge", "LLM cache size on disk", [({}, s["size_bytes"])]),
+            ("career_agents_cache_entries", "gauge", "LLM cache entries", [({}, s["entries"])]),
+        ]
+    c = connection_stats()
+    families += [
+        ("career_agents_upstream_requests_total", "counter", "HTTP requests sent to the xAI API",
+         [({}, c["requests"])]),
+        ("career_agents_upstream_new_connections_total", "counter", "New upstream TCP connections opened",
+         [({}, c["new_connections"])]),
+    ]
+    r = resilience_stats()
+    families += [
+        ("career_agents_llm_retries_total", "counter", "Retried upstream attempts", [({}, r["retries"])]),
+        ("career_agents_llm_hedges_total", "counter", "Hedged (duplicate) upstream requests",
+         [({"won": "true"}, r["hedge_wins"]), ({"won": "false"}, r["hedges"] - r["hedge_wins"])]),
+        ("career_agents_llm_failures_total", "counter", "Calls that failed after retries", [({}, r["failures"])]),
+        ("career_agents_llm_short_circuited_total", "counter", "Calls rejected by the open circuit breaker",
+         [({}, r["short_circuited"])]),
+        ("career_agents_circuit_breaker_open", "gauge", "1 if the circuit breaker is open or half-open",
+         [({}, 0 if r["breaker_state"] == "closed" else 1)]),
+    ]
+    f = coalescing_stats()
+    families += [
+        ("career_agents_chat_upstream_flights_total", "counter",
+         "Chat requests that made their own upstream call (coalescing leaders)", [({}, f["leaders"])]),
+        ("career_agents_chat_coalesced_total", "counter",
+         "Chat requests that joined an identical in-flight call instead", [({}, f["coalesced"])]),
+    ]
+    st = get_store().stats()
+    families += [
+        ("career_agents_chat_sessions", "gauge", "Server-side chat sessions held in memory", [({}, st["active"])]),
+        ("career_agents_chat_session_history_chars", "gauge", "Characters of history held across all sessions",
+         [({}, st["history_chars"])]),
+        ("career_agents_chat_session_evictions_total", "counter", "Sessions evicted by reason",
+         [({"reason": "idle"}, st["evicted_idle"]), ({"reason": "lru"}, st["evicted_lru"])]),
+        ("career_agents_chat_session_trimmed_messages_total", "counter",
+         "Old messages dropped to keep sessions under SESSION_MAX_CHARS", [({}, st["trimmed_messages"])]),
+    ]
+    j = job_stats()
+    if j:
+        families += [
+            ("career_agents_pipeline_jobs", "gauge", "Background pipeline jobs by status",
+             [({"status": status}, j[status]) for status in ("queued", "running", "succeeded", "failed")]),
+        ]
+    return families
+
+
+register_collector(_collect_dependencies)
@@ -0,0 +1,354 @@
+"""
+Mock xAI Server
+===============
+Local OpenAI-compatible chat-completions server for offline benchmarks and
+demos. Point the agents at it with XAI_BASE_URL:
+
+    python mock_server.py --port 8099 --latency lognormal:0.8,0.5 --error_rate 0.02
+    XAI_BASE_URL=http://127.0.0.1:8099/v1 XAI_API_KEY=mock python run_all.py --resume r.txt --jd jd.txt
+
+- POST /v1/chat/completions, with and without "stream": true (SSE chunks; a
+  final usage chunk when stream_options.include_usage is set)
+- Latency distributions: fixed:S, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA
+  (time to the full response, or to the first chunk when streaming)
+- Error injection: --error_rate with --error_status (e.g. 429,503); 429s carry Retry-After
+- Canned JSON payloads in the shapes the agents parse (gap report, per-JD
+  requirements, keywords, full and section-level tailoring), chosen by prompt content;
+  --payloads adds or overrides {"prompt substring": response} pairs
+- GET /stats returns request counters
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GAP_PAYLOAD = {
+    "skills_i_have": [
+        {"skill": "Selenium", "evidence_in_resume": "Built Selenium framework for 400+ tests", "frequency_in_jds": "high"},
+        {"skill": "Team Leadership", "evidence_in_resume": "Led team of 8 SDETs", "frequency_in_jds": "high"},
+    ],
+    "skills_i_lack": [
+        {"skill": "Playwright", "why_it_matters": "Required in most modern QA roles", "urgency": "critical",
+         "learning_effort": "1-2 weeks"},
+        {"skill": "Kubernetes", "why_it_matters": "Test infra runs on k8s", "urgency": "important",
+         "learning_effort": "1 month+"},
+    ],
+    "ats_keywords_to_add": [
+        {"keyword": "Shift-Left", "appears_in_n_jds": 3, "where_to_add_in_resume": "Summary"},
+        {"keyword": "CI/CD", "appears_in_n_jds": 4, "where_to_add_in_resume": "Experience"},
+    ],
+    "title_mismatch": "Your title matches the target roles.",
+    "top_3_priorities": ["Learn Playwright", "Add CI/CD keywords", "Quantify team impact"],
+    "india_market_insight": "Gurugram GCCs are hiring QA managers with automation depth.",
+}
+
+NARRATIVE_PAYLOAD = {
+    "title_mismatch": GAP_PAYLOAD["title_mismatch"],
+    "top_3_priorities": GAP_PAYLOAD["top_3_priorities"],
+    "india_market_insight": GAP_PAYLOAD["india_market_insight"],
+    "learning_effort": {"Playwright": "1-2 weeks", "Kubernetes": "1 month+"},
+    "where_to_add": {"Shift-Left": "Summary", "CI/CD": "Experience"},
+}
+
+REQUIREMENTS_PAYLOAD = {
+    "skills": ["Selenium", "Playwright", "CI/CD", "Kubernetes", "API Testing"],
+    "keywords": ["Shift-Left", "fintech", "stakeholder management"],
+    "title": "QA Manager",
+}
+
+KEYWORDS_PAYLOAD = {
+    "hard_skills": ["Selenium", "Playwright", "Jenkins", "REST Assured"],
+    "soft_skills": ["Leadership", "Stakeholder Management"],
+    "methodologies": ["Agile", "Shift-Left"],
+    "certifications": ["ISTQB"],
+    "domain_keywords": ["Fintech"],
+    "action_verbs": ["Led", "Architected"],
+    "title_variants": ["QA Manager", "Test Lead"],
+}
+
+TAILOR_PAYLOAD = {
+    "ats_match_score": "84",
+    "score_reasoning": "Strong automation and leadership overlap; cloud skills are thin.",
+    "bullets_rewritten": [
+        {"original": "Managed QA team", "rewritten": "Led team of 8 SDETs delivering Shift-Left quality gates",
+         "keywords_added": ["Shift-Left", "SDET"]},
+        {"original": "Wrote automation scripts",
+         "rewritten": "Architected Selenium and Playwright framework running in Jenkins CI/CD",
+         "keywords_added": ["Playwright", "Jenkins", "CI/CD"]},
+    ],
+    "gaps_flagged": ["Kubernetes"],
+    "summary_rewrite": "QA leader with 12 years building automation-first quality engineering teams.",
+    "tailored_resume": "QA MANAGER\n\nSUMMARY\nQA leader with 12 years building automation-first teams.\n\n"
+                       "EXPERIENCE\n- Led team of 8 SDETs delivering Shift-Left quality gates\n"
+                       "- Architected Selenium and Playwright framework running in Jenkins CI/CD\n",
+}
+
+SECTION_TAILOR_PAYLOAD = {
+    "ats_match_score": "84",
+    "score_reasoning": "Strong automation and leadership overlap; cloud skills are thin.",
+    "bullets_rewritten": [
+        {"id": 1, "rewritten": "Led team of 8 SDETs delivering Shift-Left quality gates",
+         "keywords_added": ["Shift-Left", "SDET"]},
+        {"id": 2, "rewritten": "Architected Selenium and Playwright framework running in Jenkins CI/CD",
+         "keywords_added": ["Playwright", "Jenkins", "CI/CD"]},
+    ],
+    "gaps_flagged": ["Kubernetes"],
+    "summary_rewrite": "QA leader with 12 years building automation-first quality engineering teams.",
+}
+
+# First matching prompt substring wins; anything else gets plain text
+DEFAULT_PAYLOADS = [
+    ("Measured demand", NARRATIVE_PAYLOAD),
+    ("Analyze my resume against", GAP_PAYLOAD),
+    ("List the requirements of this job description", REQUIREMENTS_PAYLOAD),
+    ("Extract ATS keywords from this job description", KEYWORDS_PAYLOAD),
+    ("Extract all ATS-critical keywords", KEYWORDS_PAYLOAD),
+    ("Rewrite my resume to maximize ATS match", TAILOR_PAYLOAD),
+    ("Rewrite only the numbered resume bullets", SECTION_TAILOR_PAYLOAD),
+]
+
+FILLER_WORDS = ("quality automation leadership pipeline stakeholder release regression coverage "
+                "framework metrics strategy delivery reliability team").split()
+
+
+def parse_latency(spec: str):
+    """'lognormal:0.8,0.5' → a function returning a sampled delay in seconds"""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockConfig:
+    def __init__(self, latency: str = "fixed:0", token_delay: float = 0.0, chunk_chars: int = 16,
+                 error_rate: float = 0.0, error_status: str = "503", retry_after: float = 1.0,
+                 text_words: int = 120, payloads: dict = None, seed: int = None):
+        self.latency_spec = latency
+        self.latency = parse_latency(latency)
+        self.token_delay = token_delay
+        self.chunk_chars = max(1, chunk_chars)
+        self.error_rate = error_rate
+        self.error_status = [int(s) for s in str(error_status).split(",") if s]
+        self.retry_after = retry_after
+        self.text_words = text_words
+        self.payloads = list((payloads or {}).items()) + DEFAULT_PAYLOADS
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def sample(self, fn):
+        with self.rng_lock:
+            return fn(self.rng)
+
+    def reply_for(self, messages: list) -> str:
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        for needle, payload in self.payloads:
+            if needle in prompt:
+                return payload if isinstance(payload, str) else json.dumps(payload, indent=2)
+        words = self.sample(lambda rng: [rng.choice(FILLER_WORDS) for _ in range(self.text_words)])
+        return "Mock reply: " + " ".join(words) + "."
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so client connection pooling behaves like the real API
+    server_version = "MockXAI/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def _count(self, name: str):
+        with self.server.stats_lock:
+            self.server.stats[name] += 1
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with self.server.stats_lock:
+                self._send_json(200, dict(self.server.stats))
+        elif self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "grok-beta", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "Not found"}})
+
+        config = self.server.config
+        self._count("requests")
+        delay = config.sample(config.latency)
+        if config.error_rate and config.sample(lambda rng: rng.random()) < config.error_rate:
+            self._count("errors")
+            time.sleep(delay)
+            status = config.sample(lambda rng: rng.choice(config.error_status))
+            headers = {"Retry-After": f"{config.retry_after:g}"} if status == 429 else None
+            return self._send_json(status, {"error": {"message": f"Injected mock error {status}"}}, headers)
+
+        model = request.get("model", "grok-beta")
+        content = config.reply_for(request.get("messages", []))
+        time.sleep(delay)
+        usage = _usage(request.get("messages", []), content)
+        if request.get("stream"):
+            self._count("streams")
+            include_usage = (request.get("stream_options") or {}).get("include_usage")
+            return self._stream(model, content, usage if include_usage else None)
+
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        })
+
+    def _stream(self, model: str, content: str, usage: dict = None):
+        config = self.server.config
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        def send(data: str):
+            raw = data.encode("utf-8")
+            self.wfile.write(f"{len(raw):x}\r\n".encode("ascii") + raw + b"\r\n")
+            self.wfile.flush()
+
+        def event(delta: dict, finish=None, **extra) -> str:
+            choices = [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish}]
+            return "data: " + json.dumps({
+                "id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": choices, **extra,
+            }) + "\n\n"
+
+        try:
+            send(event({"role": "assistant", "content": ""}))
+            for i in range(0, len(content), config.chunk_chars):
+                if i and config.token_delay:
+                    time.sleep(config.token_delay)
+                send(event({"content": content[i:i + config.chunk_chars]}))
+            send(event({}, finish="stop"))
+            if usage:
+                send(event(None, usage=usage))   # OpenAI's include_usage shape: no choices, just usage
+            send("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self._count("disconnects")   # the client closed the stream early
+            self.close_connection = True
+
+
+def _usage(messages: list, content: str) -> dict:
+    """Rough token counts (4 characters per token)"""
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+    completion_tokens = max(1, len(content) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 1024   # the default backlog of 5 refuses bursts of concurrent clients
+
+
+class MockServer:
+    """Mock server on a background thread: `url = MockServer(config).start()`"""
+
+    def __init__(self, config: MockConfig = None, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = _MockHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = config or MockConfig()
+        self.httpd.stats = {"requests": 0, "streams": 0, "errors": 0, "disconnects": 0}
+        self.httpd.stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self) -> dict:
+        with self.httpd.stats_lock:
+            return dict(self.httpd.stats)
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser, latency: str = "fixed:0"):
+    parser.add_argument("--latency", default=latency,
+                        help="Latency distribution: fixed:S | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--token_delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--chunk_chars", type=int, default=16, help="Characters per streamed chunk")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error_status", default="503", help="Status code(s) for injected errors, e.g. 429,503")
+    parser.add_argument("--retry_after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--payloads", help='JSON file of {"prompt substring": response} overrides')
+    parser.add_argument("--seed", type=int, help="Random seed for latency and error sampling")
+
+
+def config_from_args(args) -> MockConfig:
+    payloads = None
+    if args.payloads:
+        with open(args.payloads, "r", encoding="utf-8") as f:
+            payloads = json.load(f)
+    return MockConfig(latency=args.latency, token_delay=args.token_delay, chunk_chars=args.chunk_chars,
+                      error_rate=args.error_rate, error_status=args.error_status, retry_after=args.retry_after,
+                      payloads=payloads, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock of the xAI API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockServer(config_from_args(args), args.host, args.port)
+    print(f"\n🧪 Mock xAI server on {server.base_url}")
+    print(f"   latency={args.latency} error_rate={args.error_rate} ({args.error_status})")
+    print(f"   export XAI_BASE_URL={server.base_url} XAI_API_KEY=mock")
+    print("\n   Press Ctrl+C to stop\n")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Resilient LLM Calls
+===================
+One wrapper around every upstream call (used by `cached_completion` and
+`cached_stream`, so all agents and the Flask proxy get it):
+
+- Deadline: each call has an overall time budget; every attempt gets the
+  remaining budget as its request timeout.
+- Retries: timeouts, connection errors, 408/409/429 and 5xx are retried with
+  exponential backoff and full jitter, honouring Retry-After when present.
+- Hedging (optional): if a non-streaming call is still running after the
+  observed p95 latency, a second identical request is sent and whichever
+  finishes first wins.
+- Circuit breaker: after several consecutive failed attempts, calls fail fast
+  with CircuitOpenError until a cool-down passes; then one trial call decides
+  whether to close it again.
+
+`acall` / `async_resilient_call` are the asyncio equivalents (used by the
+ASGI server); they share the breaker, latency window and counters.
+
+Configuration (environment variables):
+    LLM_DEADLINE           overall seconds per call, retries included (default: 180)
+    LLM_MAX_RETRIES        retries after the first attempt (default: 3)
+    LLM_BACKOFF_BASE       first backoff in seconds (default: 0.5)
+    LLM_BACKOFF_MAX        backoff cap in seconds (default: 20)
+    LLM_HEDGE              set to 1 to hedge slow non-streaming calls
+    LLM_BREAKER_FAILURES   consecutive failures that open the breaker (default: 5)
+    LLM_BREAKER_RESET      seconds the breaker stays open (default: 30)
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+HEDGE_MIN_SAMPLES = 20   # latencies needed before the p95 is trusted
+
+
+class CircuitOpenError(RuntimeError):
+    """The upstream has been failing; the call was not attempted"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call's overall time budget ran out"""
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _status(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None and getattr(exc, "response", None) is not None:
+        status = getattr(exc.response, "status_code", None)
+    return status
+
+
+def is_retryable(exc: Exception) -> bool:
+    status = _status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # No HTTP status: timeouts and connection failures (openai / httpx / socket)
+    name = type(exc).__name__
+    return isinstance(exc, (TimeoutError, ConnectionError)) or any(
+        s in name for s in ("Timeout", "Connection", "RemoteProtocol")
+    )
+
+
+def retry_after(exc: Exception):
+    """Seconds the server asked us to wait, if it said so"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    import email.utils   # HTTP-date form is rare; keep it off the import path
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """"call" (closed), "trial" (the one half-open probe) or None (rejected)"""
+        with self._lock:
+            if self.state == "closed":
+                return "call"
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return "trial"
+            return None
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def release_trial(self):
+        """The trial call ended without an outcome (cancelled, interrupted): let the next call probe"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Returns True if this failure opened the breaker"""
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class ResilientCaller:
+    def __init__(self, deadline: float = None, max_retries: int = None, backoff_base: float = None,
+                 backoff_max: float = None, hedge: bool = None, breaker: CircuitBreaker = None):
+        self.deadline = deadline if deadline is not None else _env_float("LLM_DEADLINE", 180)
+        self.max_retries = int(max_retries if max_retries is not None else _env_float("LLM_MAX_RETRIES", 3))
+        self.backoff_base = backoff_base if backoff_base is not None else _env_float("LLM_BACKOFF_BASE", 0.5)
+        self.backoff_max = backoff_max if backoff_max is not None else _env_float("LLM_BACKOFF_MAX", 20)
+        if hedge is None:
+            hedge = os.environ.get("LLM_HEDGE", "").lower() in ("1", "true", "yes")
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker(
+            int(_env_float("LLM_BREAKER_FAILURES", 5)), _env_float("LLM_BREAKER_RESET", 30))
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+                       "failures": 0, "short_circuited": 0, "breaker_opens": 0}
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    def p95(self):
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def backoff(self, attempt: int, exc: Exception) -> float:
+        hinted = retry_after(exc)
+        if hinted is not None:
+            return min(hinted, self.backoff_max)
+        # Full jitter: uniform in [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, fn, hedge: bool = None):
+        """Run fn(timeout=seconds) with deadline, retries, optional hedging and the breaker"""
+        self._count("calls")
+        hedge = self.hedge if hedge is None else hedge
+        give_up_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            remaining, trial = self._start(give_up_at)
+            started = time.monotonic()
+            try:
+                if hedge:
+                    result = self._hedged(fn, remaining)
+                else:
+                    self._count("attempts")
+                    result = fn(timeout=remaining)
+            except Exception as exc:
+                time.sleep(self._failed(exc, attempt, give_up_at))
+                attempt += 1
+                continue
+            except BaseException:
+                if trial:
+                    self.breaker.release_trial()   # e.g. KeyboardInterrupt: no verdict on the upstream
+                raise
+            self._succeeded(started)
+            return result
+
+    def _start(self, give_up_at: float) -> tuple:
+        """Breaker and deadline checks before an attempt; returns (remaining budget, is the breaker trial)"""
+        admitted = self.breaker.admit()
+        if admitted is None:
+            self._count("short_circuited")
+            raise CircuitOpenError("xAI API circuit breaker is open after repeated failures; "
+                                   f"retrying in up to {self.breaker.reset_seconds:.0f}s")
+        remaining = give_up_at - time.monotonic()
+        if remaining <= 0:
+            if admitted == "trial":
+                self.breaker.release_trial()
+            self._count("failures")
+            raise DeadlineExceeded(f"LLM call exceeded its {self.deadline:.0f}s deadline")
+        return remaining, admitted == "trial"
+
+    def _failed(self, exc: Exception, attempt: int, give_up_at: float) -> float:
+        """Book-keeping for a failed attempt; returns the backoff delay or raises"""
+        retryable = is_retryable(exc)
+        if not retryable:
+            # e.g. a 400: the upstream answered, so it isn't down
+            self.breaker.record_success()
+        elif self.breaker.record_failure():
+            self._count("breaker_opens")
+        if not retryable or attempt >= self.max_retries:
+            self._count("failures")
+            raise exc
+        delay = self.backoff(attempt, exc)
+        if time.monotonic() + delay >= give_up_at:
+            self._count("failures")
+            raise DeadlineExceeded(f"LLM call exceeded its {self.deadline:.0f}s deadline "
+                                   f"after {attempt + 1} attempt(s): {exc}") from exc
+        self._count("retries")
+        return delay
+
+    def _succeeded(self, started: float):
+        self.breaker.record_success()
+        with self._lock:
+            self._latencies.append(time.monotonic() - started)
+
+    async def acall(self, fn, hedge: bool = None):
+        """Async call(): fn(timeout=seconds) returns an awaitable"""
+        import asyncio   # only async callers need it, and they have already loaded it
+        self._count("calls")
+        hedge = self.hedge if hedge is None else hedge
+        give_up_at = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            remaining, trial = self._start(give_up_at)
+            started = time.monotonic()
+            try:
+                if hedge:
+                    result = await self._ahedged(fn, remaining)
+                else:
+                    self._count("attempts")
+                    result = await fn(timeout=remaining)
+            except Exception as exc:
+                await asyncio.sleep(self._failed(exc, attempt, give_up_at))
+                attempt += 1
+                continue
+            except BaseException:
+                if trial:
+                    self.breaker.release_trial()   # cancelled (client went away): the trial never finished
+                raise
+            self._succeeded(started)
+            return result
+
+    async def _ahedged(self, fn, remaining: float):
+        import asyncio
+        self._count("attempts")
+        primary = asyncio.ensure_future(fn(timeout=remaining))
+        p95 = self.p95()
+        if p95 is None or p95 >= remaining:
+            return await primary
+        done, _ = await asyncio.wait([primary], timeout=p95)
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        self._count("attempts")
+        backup = asyncio.ensure_future(fn(timeout=max(0.001, remaining - p95)))
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is backup:
+                            self._count("hedge_wins")
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            for future in pending:
+                future.cancel()   # unlike threads, the losing request can be abandoned
+
+    def _hedged(self, fn, remaining: float):
+        """Primary request, plus a backup if the primary outlives the p95 latency
+
+        Without a usable p95 the primary simply runs on the calling thread.
+        Otherwise each request gets its own daemon thread (no shared pool, so
+        concurrent hedged calls never queue behind each other) and the caller
+        returns as soon as either succeeds.
+        """
+        self._count("attempts")
+        p95 = self.p95()
+        if p95 is None or p95 >= remaining:
+            return fn(timeout=remaining)
+        primary = _in_thread(fn, remaining)
+        done, _ = wait([primary], timeout=p95)
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        self._count("attempts")
+        backup = _in_thread(fn, max(0.001, remaining - p95))
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count("hedge_wins")
+                    return future.result()   # the loser finishes in the background and is discarded
+                error = future.exception()
+        raise error
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        counts["breaker_state"] = self.breaker.state
+        p95 = self.p95()
+        counts["p95_latency"] = round(p95, 3) if p95 is not None else None
+        return counts
+
+
+def _in_thread(fn, timeout: float) -> Future:
+    """Run fn(timeout=...) on a new daemon thread; a Future for its outcome"""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(timeout=timeout))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, name="llm-hedge", daemon=True).start()
+    return future
+
+
+_caller = None
+_caller_lock = threading.Lock()
+
+
+def get_caller() -> ResilientCaller:
+    """Process-wide shared caller, configured from the environment on first use"""
+    global _caller
+    with _caller_lock:
+        if _caller is None:
+            _caller = ResilientCaller()
+        return _caller
+
+
+def resilient_call(fn, hedge: bool = None):
+    return get_caller().call(fn, hedge=hedge)
+
+
+async def async_resilient_call(fn, hedge: bool = None):
+    return await get_caller().acall(fn, hedge=hedge)
+
+
+def resilience_stats() -> dict:
+    return get_caller().stats()
+
+
+def print_resilience_stats():
+    s = resilience_stats()
+    if not s["retries"] and not s["hedges"] and not s["failures"] and not s["short_circuited"]:
+        return
+    print(f"🛡️  LLM calls: {s['calls']} | retries: {s['retries']} | hedges: {s['hedges']} "
+          f"({s['hedge_wins']} won) | failures: {s['failures']} | breaker: {s['breaker_state']}")
@@ -0,0 +1,259 @@
+"""
+Resume Model
+============
+Parses a plain-text resume into sections and bullets, so tailoring can send
+the model only the lines worth rewriting and splice the rewrites back into
+the original layout (spacing, markers, indentation and untouched sections
+stay exactly as written).
+
+- Sections start at known headings ("Experience", "Education", ...); other
+  ALL CAPS or "...:" lines are sub-headings (company names) inside them.
+  Everything before the first known heading (name, job title, contact
+  line) is header text and is never rewritten.
+- Contact-like lines (e-mail, phone number, URL) are never bullets.
+- Bullets are list lines (-, *, •, 1. ...) plus plain sentences of
+  MIN_BULLET_WORDS or more inside rewritable sections. A wrapped bullet's
+  continuation lines (indented past its marker, or carrying on a sentence
+  in lower case) belong to it, and a rewrite replaces all of them.
+- Contact details, education, certifications, languages and similar
+  sections are never rewritten; the summary is replaced as a whole.
+- `select_bullets` ranks bullets against the JD locally: ATS keywords the
+  bullet already carries and word overlap with the JD's requirement lines.
+  Bullets with no connection to the JD come back unchanged, so they are not
+  sent at all.
+
+Usage:
+    python resume_model.py --resume my_resume.txt
+    python resume_model.py --resume my_resume.txt --jd target_jd.txt --max_bullets 8
+"""
+
+import argparse
+import re
+from dataclasses import dataclass, field
+
+from ats_scorer import KeywordMatcher, normalize
+from jd_cleaner import section_blocks
+
+SUMMARY_SECTIONS = ["summary", "profile", "objective", "about me"]
+FIXED_SECTIONS = [
+    "contact", "personal", "education", "academic", "certification", "language", "interest",
+    "hobbies", "reference", "declaration", "publication",
+]
+KNOWN_SECTIONS = SUMMARY_SECTIONS + FIXED_SECTIONS + [
+    "experience", "employment", "work history", "career history", "projects", "skills",
+    "technical skills", "core competencies", "achievements", "awards", "accomplishments", "training",
+]
+
+# Plain (unmarked) lines with fewer words are role titles, dates, company names...
+MIN_BULLET_WORDS = 6
+
+_BULLET = re.compile(r"^(\s*(?:[-*•·▪–●○◦➤]|\d+[.)])\s+)(\S.*)$")
+_WORD = re.compile(r"[a-z0-9+#]+")
+_LETTERS = re.compile(r"[A-Za-z]{2,}")
+_CONTACT = re.compile(r"@|https?://|www\.|linkedin\.com|github\.com", re.IGNORECASE)
+_PHONE = re.compile(r"\+?\(?\d[\d\s().-]{8,}\d")
+MIN_PHONE_DIGITS = 10   # fewer is a date range ("2019 - 2021") or a number in a bullet
+STOPWORDS = set("""a an and are as at be by for from has have in into is it its of on or our the their this
+to was were will with you your we who what able strong good experience years year work working
+using use across within etc""".split())
+
+
+@dataclass
+class Bullet:
+    id: int
+    line: int          # index into ResumeModel.lines
+    prefix: str        # marker and indentation, kept when the rewrite is spliced back
+    text: str
+    section: str
+    end: int = None    # one past the bullet's last line (wrapped bullets span several)
+
+    def __post_init__(self):
+        if self.end is None:
+            self.end = self.line + 1
+
+
+@dataclass
+class ResumeModel:
+    lines: list
+    sections: list = field(default_factory=list)   # (heading, first line, end line)
+    bullets: list = field(default_factory=list)
+    summary_lines: list = field(default_factory=list)
+
+    @property
+    def summary(self) -> str:
+        return " ".join(self.lines[i].strip() for i in self.summary_lines)
+
+    def splice(self, rewrites: dict, summary: str = None) -> str:
+        """Original text with {bullet id: new text} and the summary replaced"""
+        lines = list(self.lines)
+        for bullet in self.bullets:
+            new = " ".join(str(rewrites.get(bullet.id) or "").split())
+            if new:
+                lines[bullet.line] = bullet.prefix + new
+                for i in range(bullet.line + 1, bullet.end):
+                    lines[i] = None
+        summary = " ".join(str(summary or "").split())
+        if summary and self.summary_lines:
+            first = self.summary_lines[0]
+            indent = self.lines[first][:len(self.lines[first]) - len(self.lines[first].lstrip())]
+            lines[first] = indent + summary
+            for i in self.summary_lines[1:]:
+                lines[i] = None
+        return "\n".join(line for line in lines if line is not None)
+
+
+def _heading(line: str):
+    """Section name if the line looks like a heading, else None"""
+    raw = line.strip()
+    if not raw or _BULLET.match(line):
+        return None
+    text = raw.strip("#*:-=_ ").strip()
+    words = text.split()
+    if not text or len(text) > 40 or len(words) > 5 or text.endswith("."):
+        return None
+    lower = text.lower()
+    if _known(lower) or raw.endswith(":") or (text.isupper() and any(c.isalpha() for c in text)):
+        return lower
+    return None
+
+
+def _known(heading: str) -> bool:
+    return any(heading.startswith(k) or heading.endswith(k) for k in KNOWN_SECTIONS)
+
+
+def _contact(line: str) -> bool:
+    """True for e-mail / URL / phone lines, which are never rewritten"""
+    return bool(_CONTACT.search(line)) or any(
+        sum(c.isdigit() for c in m.group()) >= MIN_PHONE_DIGITS for m in _PHONE.finditer(line))
+
+
+def _kind(section: str) -> str:
+    if any(k in section for k in SUMMARY_SECTIONS):
+        return "summary"
+    if any(k in section for k in FIXED_SECTIONS):
+        return "fixed"
+    return "rewrite"
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _continues(bullet: Bullet, line: str) -> bool:
+    """True if the line is a wrapped continuation of the bullet above it"""
+    heading = _heading(line)
+    if _BULLET.match(line) or (heading and _known(heading)) or _contact(line):
+        return False
+    if _indent(line) > _indent(bullet.prefix):
+        return True   # hanging indent under the marker
+    return line.lstrip()[:1].islower() and not bullet.text.endswith((".", "!", "?", ";"))
+
+
+def parse_resume(text: str) -> ResumeModel:
+    """Sections, bullets and summary lines of a plain-text resume"""
+    model = ResumeModel(lines=text.splitlines())
+    section, start = "header", 0
+    last = None   # the bullet on the previous line, while continuation lines may follow
+    for i, line in enumerate(model.lines):
+        if last and line.strip() and _continues(last, line):
+            last.text = f"{last.text} {line.strip()}"
+            last.end = i + 1
+            continue
+        last = None
+        heading = _heading(line)
+        if heading and _known(heading):
+            model.sections.append((section, start, i))
+            section, start = heading, i
+            continue
+        if heading:
+            continue   # a job title, company name or sub-heading inside the current section
+        if not line.strip() or _contact(line):
+            continue
+        kind = "fixed" if section == "header" else _kind(section)
+        if kind == "summary" and not _BULLET.match(line):
+            model.summary_lines.append(i)
+            continue
+        if kind == "fixed":
+            continue
+        match = _BULLET.match(line)
+        if match:
+            prefix, body = match.group(1), match.group(2)
+        elif len(_LETTERS.findall(line)) >= MIN_BULLET_WORDS and kind == "rewrite":
+            body = line.strip()
+            prefix = line[:len(line) - len(line.lstrip())]
+        else:
+            continue
+        last = Bullet(len(model.bullets) + 1, i, prefix, body.rstrip(), section)
+        model.bullets.append(last)
+    model.sections.append((section, start, len(model.lines)))
+    return model
+
+
+def _words(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS}
+
+
+def requirement_lines(jd: str) -> list:
+    """The JD's requirement lines (all lines if no requirement section is recognized)"""
+    blocks = [block for section, block in section_blocks(jd) if section == "keep"] or [jd]
+    return [line.strip() for block in blocks for line in block.splitlines() if _words(line)]
+
+
+def select_bullets(model: ResumeModel, jd: str, keywords: dict, max_bullets: int = 12) -> list:
+    """Bullets worth rewriting for this JD, in resume order: [(bullet, JD keywords it already has)]
+
+    Score = 2 per JD keyword in the bullet + words shared with its closest
+    requirement line. Bullets sharing nothing with the JD are left alone.
+    """
+    phrases = [kw for values in keywords.values() if isinstance(values, list)
+               for kw in values if isinstance(kw, str) and normalize(kw).strip()]
+    matcher = KeywordMatcher(phrases)
+    requirements = [_words(line) for line in requirement_lines(jd)]
+
+    scored = []
+    for bullet in model.bullets:
+        found = sorted({phrases[pid] for pid in matcher.find(bullet.text)})
+        words = _words(bullet.text)
+        overlap = max((len(words & req) for req in requirements), default=0)
+        score = 2 * len(found) + overlap
+        if score:
+            scored.append((score, bullet, found))
+    scored.sort(key=lambda s: (-s[0], s[1].id))
+    chosen = sorted(scored[:max_bullets], key=lambda s: s[1].id)
+    return [(bullet, found) for _, bullet, found in chosen]
+
+
+def print_model(model: ResumeModel, selected: list = None):
+    chosen = {bullet.id for bullet, _ in selected or []}
+    print(f"\n📄 {len(model.sections)} sections, {len(model.bullets)} bullets, "
+          f"{len(model.summary_lines)} summary lines")
+    for heading, start, end in model.sections:
+        print(f"\n  [{heading}] ({_kind(heading) if heading != 'header' else 'fixed'})")
+        for bullet in model.bullets:
+            if start <= bullet.line < end:
+                mark = "✍️ " if bullet.id in chosen else "  "
+                print(f"   {mark}{bullet.id:>3}. {bullet.text[:90]}")
+    if selected is not None:
+        print(f"\n✍️  {len(selected)} of {len(model.bullets)} bullets selected for rewriting")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show how a resume is split into sections and bullets")
+    parser.add_argument("--resume", required=True, help="Path to resume .txt")
+    parser.add_argument("--jd", help="Also show which bullets would be rewritten for this JD")
+    parser.add_argument("--max_bullets", type=int, default=12, help="Bullets to select for rewriting")
+    args = parser.parse_args()
+
+    with open(args.resume, "r", encoding="utf-8") as f:
+        model = parse_resume(f.read().strip())
+    selected = None
+    if args.jd:
+        from jd_cleaner import load_jd_text
+        from keyword_extractor import extract_keywords
+        jd = load_jd_text(args.jd)
+        selected = select_bullets(model, jd, extract_keywords(jd), args.max_bullets)
+    print_model(model, selected)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,94 @@
 """
 Master Orchestrator: Run All Agents in a Pipeline
 ==================================================
-Orchestrates all 4 agents in the optimal sequence for your job search.
+Orchestrates all 4 agents for your job search. Steps run as a dependency
+graph, so independent LLM calls (gap analysis, keyword extraction,
+behavioral prep) overlap; the report is still printed in step order.
+
+Artifacts (gap_analysis.json, tailored_resume.txt, outreach_messages.txt,
+interview_prep.txt) are written to --output_dir (default: current directory).
 
 Usage:
     python run_all.py --resume my_resume.txt --jd target_jd.txt --profile linkedin.txt
+    python run_all.py --resume my_resume.txt --jd target_jd.txt --workers 1   # sequential
+    python run_all.py --resume my_resume.txt --jd target_jd.txt --output_dir out/
+    python run_all.py --resume my_resume.txt --jd_folder ./jds/ --top_k 3   # best-fit JDs only
+
+With --jd_folder, every JD is ranked against the resume locally (jd_ranker.py,
+no LLM calls) and the pipeline runs only for the --top_k best fits, each into
+its own <output_dir>/<jd name>/ folder.
+
+The agent modules (and the openai client behind them) are imported when the
+pipeline first runs, so --help and argument errors return immediately.
 """
 
-from openai import OpenAI
 import argparse
+import json
 import sys
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file if it exists
-load_dotenv()
-
-# Import all agents
-sys.path.insert(0, os.path.dirname(__file__))
-from agent_1_gap_analyst import load_text, load_jds_from_folder, run_gap_analysis, print_gap_report
-from agent_2_resume_tailor import extract_keywords_from_jd, tailor_resume, print_tailor_report
-from agent_3_outreach import generate_outreach
-from agent_4_interview import run_behavioral_prep, INTERVIEWER_PERSONAS
-
-
-def orchestrate(resume_path: str, jd_path: str, profile_path: str = None):
-    client = OpenAI(
-        api_key=os.environ.get("XAI_API_KEY"),
-        base_url="https://api.x.ai/v1"
-    )
+from pathlib import Path
+from llm_cache import print_cache_stats
+from xai_client import get_client, load_env, print_connection_stats
+from resilience import CircuitOpenError, DeadlineExceeded, print_resilience_stats
+from dag_executor import Step, run_dag, print_timing_report
+from jd_cleaner import load_jd_text
+
+
+ARTIFACTS = {
+    "gap": "gap_analysis.json",
+    "tailored_resume": "tailored_resume.txt",
+    "outreach": "outreach_messages.txt",
+    "interview_prep": "interview_prep.txt",
+}
+
+
+def orchestrate(resume_path: str, jd_path: str, profile_path: str = None, max_workers: int = 4,
+                output_dir: str = ".", on_step=None) -> dict:
+    """Run the pipeline and return {step name: StepRun}; `on_step(event, run)` reports progress"""
+    from agent_1_gap_analyst import load_text, run_gap_analysis, print_gap_report
+    from agent_2_resume_tailor import extract_keywords_from_jd, tailor_resume, attach_local_scores, print_tailor_report
+    from agent_3_outreach import generate_outreach
+    from agent_4_interview import run_behavioral_prep
+
+    client = get_client()
+    os.makedirs(output_dir, exist_ok=True)
+    artifact = {name: os.path.join(output_dir, filename) for name, filename in ARTIFACTS.items()}
 
     resume = load_text(resume_path)
-    jd = load_text(jd_path)
+    jd = load_jd_text(jd_path)
 
     print("\n" + "🚀 " * 20)
     print("   CAREER AGENT PIPELINE STARTING")
     print("🚀 " * 20)
 
+    # Steps are declared in report order; each runs as soon as its deps finish.
+    # Only outreach and the final summary wait on gap_data.
+
     # ── STEP 1: Gap Analysis ──────────────────────────────
-    print("\n\n📊 STEP 1/4: GAP ANALYSIS")
-    print("-" * 40)
-    jds = {"target_role": jd}
-    gap_data = run_gap_analysis(resume, jds)
-    print_gap_report(gap_data)
+    def gap_step():
+        print("\n\n📊 STEP 1/4: GAP ANALYSIS")
+        print("-" * 40)
+        jds = {"target_role": jd}
+        gap_data = run_gap_analysis(resume, jds, client)
+        print_gap_report(gap_data)
+        with open(artifact["gap"], "w", encoding="utf-8") as f:
+            json.dump(gap_data, f, indent=2)
+        return gap_data
 
     # ── STEP 2: Resume Tailoring ──────────────────────────
-    print("\n\n✍️  STEP 2/4: RESUME TAILORING")
-    print("-" * 40)
-    keywords = extract_keywords_from_jd(client, jd)
-    tailor_data = tailor_resume(client, resume, jd, keywords)
-    print_tailor_report(tailor_data, "tailored_resume.txt")
+    def keywords_step():
+        print("\n\n✍️  STEP 2/4: RESUME TAILORING")
+        print("-" * 40)
+        return extract_keywords_from_jd(client, jd)
+
+    def tailor_step(keywords):
+        tailor_data = tailor_resume(client, resume, jd, keywords)
+        attach_local_scores(tailor_data, resume, keywords)
+        print_tailor_report(tailor_data, artifact["tailored_resume"])
+        return tailor_data
 
     # ── STEP 3: Outreach (if profile provided) ────────────
-    if profile_path:
+    def outreach_step(gap_data):
         print("\n\n🤝 STEP 3/4: LINKEDIN OUTREACH")
         print("-" * 40)
         profile = load_text(profile_path)
@@ -61,43 +97,102 @@ def orchestrate(resume_path: str, jd_path: str, profile_path: str = None):
         )
         outreach = generate_outreach(client, profile, skills_summary, "job_interest")
         print(outreach)
-        with open("outreach_messages.txt", "w") as f:
+        with open(artifact["outreach"], "w", encoding="utf-8") as f:
             f.write(outreach)
-        print("\n💾 Outreach saved to: outreach_messages.txt")
-    else:
+        print(f"\n💾 Outreach saved to: {artifact['outreach']}")
+
+    def skip_outreach_step():
         print("\n⏭️  STEP 3/4: SKIPPED (no --profile provided)")
 
     # ── STEP 4: Interview Prep Summary ───────────────────
-    print("\n\n🎙️  STEP 4/4: INTERVIEW PREP — TOP 5 BEHAVIORAL QUESTIONS")
-    print("-" * 40)
-    run_behavioral_prep(client, "QA Director / Principal SDET")
+    def behavioral_step():
+        print("\n\n🎙️  STEP 4/4: INTERVIEW PREP — TOP 5 BEHAVIORAL QUESTIONS")
+        print("-" * 40)
+        questions = run_behavioral_prep(client, "QA Director / Principal SDET")
+        with open(artifact["interview_prep"], "w", encoding="utf-8") as f:
+            f.write(questions or "")
 
     # ── FINAL SUMMARY ─────────────────────────────────────
-    print("\n\n" + "=" * 60)
-    print("✅ PIPELINE COMPLETE — YOUR ACTION PLAN")
-    print("=" * 60)
-
-    priorities = gap_data.get("top_3_priorities", [])
-    for i, p in enumerate(priorities, 1):
-        print(f"  Week {i}: {p}")
-
-    score = tailor_data.get("ats_match_score", "?")
-    print(f"\n  📊 Resume ATS Score: {score}%")
-    print(f"  📄 Tailored resume: tailored_resume.txt")
-    if profile_path:
-        print(f"  🤝 Outreach messages: outreach_messages.txt")
-    print("\n  Good luck! 🎯")
-    print("=" * 60)
+    def summary_step(gap_data, tailor_data):
+        print("\n\n" + "=" * 60)
+        print("✅ PIPELINE COMPLETE — YOUR ACTION PLAN")
+        print("=" * 60)
+
+        priorities = gap_data.get("top_3_priorities", [])
+        for i, p in enumerate(priorities, 1):
+            print(f"  Week {i}: {p}")
+
+        score = tailor_data.get("ats_match_score", "?")
+        print(f"\n  📊 Resume ATS Score: {score}%")
+        local = tailor_data.get("local_ats_score")
+        if local:
+            print(f"  🧮 Local keyword score: {local['before']}% → {local['after']}%")
+        print(f"  📄 Tailored resume: {artifact['tailored_resume']}")
+        if profile_path:
+            print(f"  🤝 Outreach messages: {artifact['outreach']}")
+        print("\n  Good luck! 🎯")
+        print("=" * 60)
+
+    steps = [
+        Step("gap", gap_step),
+        Step("keywords", keywords_step),
+        Step("tailor", tailor_step, deps=("keywords",)),
+        Step("outreach", outreach_step, deps=("gap",)) if profile_path else Step("outreach", skip_outreach_step),
+        Step("behavioral", behavioral_step),
+        Step("summary", summary_step, deps=("gap", "tailor")),
+    ]
+    runs = run_dag(steps, max_workers=max_workers, on_event=on_step)
+
+    print_timing_report(runs)
+    print_cache_stats()
+    print_connection_stats()
+    print_resilience_stats()
+
+    failed = [r for r in runs.values() if r.error]
+    for r in failed:
+        print(f"\n❌ Step '{r.name}' failed: {r.error}")
+    if failed:
+        raise failed[0].error
+    return runs
 
 
 def main():
     parser = argparse.ArgumentParser(description="Career Agent Pipeline Orchestrator")
     parser.add_argument("--resume", required=True, help="Path to your resume .txt")
-    parser.add_argument("--jd", required=True, help="Path to target JD .txt")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--jd", help="Path to target JD .txt")
+    target.add_argument("--jd_folder", help="Folder of JD .txt files; run for the --top_k best fits")
     parser.add_argument("--profile", help="(Optional) LinkedIn profile .txt for outreach")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Max pipeline steps running at once (1 = sequential)")
+    parser.add_argument("--output_dir", default=".", help="Where to write the pipeline artifacts")
+    parser.add_argument("--top_k", type=int, default=1,
+                        help="With --jd_folder: how many best-fit JDs to run the pipeline for")
     args = parser.parse_args()
-
-    orchestrate(args.resume, args.jd, args.profile)
+    load_env()
+
+    from openai import APIError
+
+    targets = [(args.jd, args.output_dir)]
+    if args.jd_folder:
+        from agent_1_gap_analyst import load_jds_from_folder, load_text
+        from jd_ranker import print_ranking, rank_jds
+        jds = load_jds_from_folder(args.jd_folder, verbose=False)
+        if not jds:
+            print(f"❌ Error: No JD .txt files in {args.jd_folder}")
+            sys.exit(1)
+        ranking = rank_jds(load_text(args.resume), jds, args.top_k)
+        print_ranking(ranking, len(jds))
+        targets = [(str(Path(args.jd_folder) / f"{r['title']}.txt"),
+                    os.path.join(args.output_dir, r["title"]) if len(ranking) > 1 else args.output_dir)
+                   for r in ranking]
+
+    try:
+        for jd_path, output_dir in targets:
+            orchestrate(args.resume, jd_path, args.profile, args.workers, output_dir=output_dir)
+    except (APIError, CircuitOpenError, DeadlineExceeded):
+        # Upstream failures were already reported per step; no stack trace needed
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,364 @@
+"""
+JD & Profile Search Index
+=========================
+A local inverted index over the JD and LinkedIn-profile folders the agents
+read, answering "which JDs mention Playwright and fintech" in milliseconds
+without grepping or asking the model.
+
+- BM25 ranking with field boosts: the title line counts 3x and requirement
+  sections ("Requirements", "Skills", "Experience", ... as recognized by
+  jd_cleaner.py) 1.5x
+- Queries: all words must match by default (--any for at least one);
+  "quoted phrases" match consecutive words (ci/cd counts as a phrase too)
+- Stored in one SQLite file and updated incrementally: only new or changed
+  files are re-read (by size and mtime), deleted ones are dropped. Folders
+  given with a query are synced first, and the search is limited to them.
+
+The output feeds the agents directly: --paths prints one file per line (for
+--jds), --link_dir fills a folder with links to the hits (for --jd_folder /
+--profiles_folder).
+
+Configuration (environment variables):
+    SEARCH_INDEX_PATH   index file (default: <LLM_CACHE_DIR>/search_index.sqlite,
+                        i.e. ~/.cache/career_agents/search_index.sqlite)
+
+Usage:
+    python search_index.py --jd_folder ./jds/ --profiles_folder ./profiles/ --update
+    python search_index.py --query 'playwright fintech'
+    python search_index.py --query '"test automation" director' --kind jd --top 20
+    python agent_1_gap_analyst.py --resume my_resume.txt \\
+        --jds $(python search_index.py --jd_folder ./jds/ --query 'playwright fintech' --paths)
+    python search_index.py --profiles_folder ./profiles/ --query 'engineering manager payments' \\
+        --link_dir ./matched_profiles/
+    python agent_3_outreach.py --profiles_folder ./matched_profiles/
+"""
+
+import argparse
+import math
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from jd_cleaner import section_blocks
+from xai_client import load_env
+
+# Bump when tokenization or the schema changes; older index files are rebuilt
+INDEX_VERSION = 1
+# Names of the copies link_hits made, kept in the link folder
+LINKS_MANIFEST = ".search_links"
+
+K1 = 1.2
+B = 0.75
+FIELDS = ("body", "requirements", "title")          # stored as 0 / 1 / 2 with each position
+BOOSTS = {"body": 1.0, "requirements": 1.5, "title": 3.0}
+KINDS = ("jd", "profile")
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_CLAUSE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def default_index_path() -> Path:
+    if os.environ.get("SEARCH_INDEX_PATH"):
+        return Path(os.environ["SEARCH_INDEX_PATH"]).expanduser()
+    cache_dir = Path(os.environ.get("LLM_CACHE_DIR", "~/.cache/career_agents")).expanduser()
+    return cache_dir / "search_index.sqlite"
+
+
+def tokenize(text: str) -> list:
+    return _WORD.findall(text.lower())
+
+
+def analyze(text: str) -> tuple:
+    """({term: (weighted tf, encoded positions)}, length, title) for one document.
+
+    Positions are encoded as position * 4 + field, so phrase matches know
+    which field they fell in.
+    """
+    stripped = text.strip()
+    title = stripped.splitlines()[0].strip() if stripped else ""
+    postings, pos = {}, 0
+    blocks = section_blocks(stripped)
+    for i, (section, block) in enumerate(blocks):
+        parts = [(FIELDS.index("requirements") if section == "keep" else 0, block)]
+        if i == 0:
+            head, _, rest = block.partition("\n")
+            parts = [(FIELDS.index("title"), head), (parts[0][0], rest)]
+        for field, part in parts:
+            boost = BOOSTS[FIELDS[field]]
+            for term in tokenize(part):
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = [0.0, array("I")]
+                entry[0] += boost
+                entry[1].append(pos * 4 + field)
+                pos += 1
+        pos += 1   # phrases don't run across blocks
+    return postings, pos, title
+
+
+def parse_query(query: str) -> list:
+    """Clauses: tuples of terms; one term is a word, several are a phrase"""
+    clauses = []
+    for quoted, word in _CLAUSE.findall(query):
+        terms = tuple(tokenize(quoted if quoted else word))
+        if terms and terms not in clauses:
+            clauses.append(terms)
+    return clauses
+
+
+def _phrase_matches(positions: list) -> list:
+    """Encoded positions of the first word wherever the words occur consecutively"""
+    first, rest = positions[0], [{p >> 2 for p in later} for later in positions[1:]]
+    return [p for p in first if all((p >> 2) + i + 1 in later for i, later in enumerate(rest))]
+
+
+class SearchIndex:
+    def __init__(self, path: str = None):
+        self.path = Path(path) if path else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or int(row[0]) != INDEX_VERSION:
+            self._conn.executescript("DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS docs;")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                folder TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                title TEXT,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_docs_folder ON docs(folder);
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc INTEGER NOT NULL,
+                weight REAL NOT NULL,
+                positions BLOB NOT NULL,
+                PRIMARY KEY (term, doc)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc);
+        """)
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    # ── Indexing ───────────────────────────────────────────
+    def sync(self, folder: str, kind: str = "jd") -> dict:
+        """Bring the index up to date with the .txt files in `folder` (incremental)"""
+        folder_key = str(Path(folder).resolve())
+        stored = {path: (doc_id, mtime_ns, size) for doc_id, path, mtime_ns, size in self._conn.execute(
+            "SELECT id, path, mtime_ns, size FROM docs WHERE folder = ?", (folder_key,))}
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+        with self._conn:
+            for file in sorted(Path(folder_key).glob("*.txt")):
+                st = file.stat()
+                known = stored.pop(str(file), None)
+                if known and known[1:] == (st.st_mtime_ns, st.st_size):
+                    stats["unchanged"] += 1
+                    continue
+                if known:
+                    self._delete(known[0])
+                self._add(file, folder_key, kind, st)
+                stats["updated" if known else "added"] += 1
+            for doc_id, _, _ in stored.values():
+                self._delete(doc_id)
+                stats["removed"] += 1
+        return stats
+
+    def _add(self, file: Path, folder: str, kind: str, st):
+        postings, length, title = analyze(file.read_text(encoding="utf-8", errors="replace"))
+        doc_id = self._conn.execute(
+            "INSERT INTO docs (path, folder, kind, title, mtime_ns, size, length) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (str(file), folder, kind, title[:200], st.st_mtime_ns, st.st_size, length)).lastrowid
+        self._conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)",
+                               [(term, doc_id, weight, positions.tobytes())
+                                for term, (weight, positions) in postings.items()])
+
+    def _delete(self, doc_id: int):
+        self._conn.execute("DELETE FROM postings WHERE doc = ?", (doc_id,))
+        self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    # ── Search ─────────────────────────────────────────────
+    def _postings(self, term: str, filter_sql: str, params: list, positions: bool = False) -> dict:
+        """{doc: weight} or {doc: positions} for one term, limited to the docs the filter allows"""
+        column = "p.positions" if positions else "p.weight"
+        rows = self._conn.execute(
+            f"SELECT p.doc, {column} FROM postings p JOIN docs d ON d.id = p.doc WHERE p.term = ?{filter_sql}",
+            [term] + params)
+        return {doc: array("I", blob) for doc, blob in rows} if positions else dict(rows)
+
+    def _clause_weights(self, clause: tuple, filter_sql: str = "", params: list = ()) -> dict:
+        """{doc: field-weighted frequency} of a word or phrase"""
+        if len(clause) == 1:
+            return self._postings(clause[0], filter_sql, list(params))
+        per_term = [self._postings(term, filter_sql, list(params), positions=True) for term in clause]
+        weights = {}
+        for doc in set.intersection(*(set(p) for p in per_term)):
+            matches = _phrase_matches([p[doc] for p in per_term])
+            if matches:
+                weights[doc] = sum(BOOSTS[FIELDS[m & 3]] for m in matches)
+        return weights
+
+    def search(self, query: str, kind: str = None, folders: list = None, limit: int = 20,
+               any_terms: bool = False) -> list:
+        """BM25-ranked hits: [{path, kind, title, score, matched}]"""
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        filter_sql, params = "", []
+        if kind:
+            filter_sql += " AND d.kind = ?"
+            params.append(kind)
+        if folders:
+            filter_sql += f" AND d.folder IN ({','.join('?' * len(folders))})"
+            params += [str(Path(f).resolve()) for f in folders]
+        # BM25 statistics (N, average length, df) are taken over the docs the filter allows
+        n, avg_length = self._conn.execute(
+            "SELECT COUNT(*), AVG(length) FROM docs d WHERE 1 = 1" + filter_sql, params).fetchone()
+        if not n:
+            return []
+
+        weights = [(clause, self._clause_weights(clause, filter_sql, params)) for clause in clauses]
+        candidates = set().union(*(w for _, w in weights)) if any_terms else \
+            set.intersection(*(set(w) for _, w in weights))
+        if not candidates:
+            return []
+        lengths = dict(self._conn.execute(
+            f"SELECT id, length FROM docs WHERE id IN ({','.join('?' * len(candidates))})", list(candidates)))
+
+        scores, matched = dict.fromkeys(candidates, 0.0), {doc: [] for doc in candidates}
+        for clause, clause_weights in weights:
+            df = len(clause_weights)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for doc in candidates.intersection(clause_weights):
+                tf = clause_weights[doc]
+                norm = K1 * (1 - B + B * lengths[doc] / (avg_length or 1.0))
+                scores[doc] += idf * tf * (K1 + 1) / (tf + norm)
+                matched[doc].append(" ".join(clause))
+
+        top = sorted(candidates, key=lambda doc: -scores[doc])[:limit]
+        info = {doc_id: rest for doc_id, *rest in self._conn.execute(
+            f"SELECT id, path, kind, title FROM docs WHERE id IN ({','.join('?' * len(top))})", top)}
+        return [{"path": info[doc][0], "kind": info[doc][1], "title": info[doc][2],
+                 "score": round(scores[doc], 3), "matched": matched[doc]} for doc in top]
+
+    def stats(self) -> dict:
+        counts = dict(self._conn.execute("SELECT kind, COUNT(*) FROM docs GROUP BY kind"))
+        terms = self._conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+        return {"docs": sum(counts.values()), "by_kind": counts, "terms": terms,
+                "size_bytes": self.path.stat().st_size if self.path.exists() else 0, "path": str(self.path)}
+
+
+def link_hits(hits: list, folder: str) -> int:
+    """Fill `folder` with links (or copies) of the hit files, replacing earlier ones; returns how many
+
+    Names are prefixed with the hit's rank ("01_acme_qa.txt"), so same-named
+    files from different folders never collide and the folder lists best
+    first. Copies (where symlinks are not allowed) are recorded in
+    LINKS_MANIFEST so the next run removes them too; other files are left alone.
+    """
+    target = Path(folder)
+    target.mkdir(parents=True, exist_ok=True)
+    manifest = target / LINKS_MANIFEST
+    copied = set(manifest.read_text(encoding="utf-8").split("\n")) if manifest.exists() else set()
+    for old in target.glob("*.txt"):
+        if old.is_symlink() or old.name in copied:
+            old.unlink()
+
+    width = max(2, len(str(len(hits))))
+    copies, linked = [], 0
+    for rank, hit in enumerate(hits, 1):
+        link = target / f"{rank:0{width}d}_{Path(hit['path']).name}"
+        if link.exists():
+            print(f"⚠️  {link} already exists and is not one of our links; skipped", file=sys.stderr)
+            continue
+        try:
+            link.symlink_to(Path(hit["path"]).resolve())
+        except OSError:
+            shutil.copyfile(hit["path"], link)
+            copies.append(link.name)
+        linked += 1
+    if copies:
+        manifest.write_text("\n".join(copies), encoding="utf-8")
+    elif manifest.exists():
+        manifest.unlink()
+    return linked
+
+
+def print_hits(hits: list, query: str, elapsed: float):
+    print(f"\n🔎 {len(hits)} hits for {query!r} ({elapsed * 1000:.1f}ms)")
+    print("-" * 60)
+    for i, hit in enumerate(hits, 1):
+        icon = "📄" if hit["kind"] == "jd" else "👤"
+        print(f"  {i:>2}. {icon} {Path(hit['path']).stem} — {hit['score']:.2f}")
+        if hit["title"]:
+            print(f"      {hit['title'][:80]}")
+        print(f"      matched: {', '.join(hit['matched'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search saved JDs and LinkedIn profiles (local BM25 index)")
+    parser.add_argument("--jd_folder", nargs="+", default=[], help="JD folder(s) to index / search")
+    parser.add_argument("--profiles_folder", nargs="+", default=[], help="Profile folder(s) to index / search")
+    parser.add_argument("--update", action="store_true", help="Only bring the index up to date")
+    parser.add_argument("--query", help='Words must all match; "quoted phrases" match exactly')
+    parser.add_argument("--any", action="store_true", help="Match documents with any of the words")
+    parser.add_argument("--kind", choices=KINDS, help="Only return JDs or only profiles")
+    parser.add_argument("--top", type=int, default=20, help="Max hits to return")
+    parser.add_argument("--paths", action="store_true", help="Print only the hit file paths (for --jds)")
+    parser.add_argument("--link_dir", help="Link the hits into this folder (for --jd_folder / --profiles_folder)")
+    parser.add_argument("--index", help="Index file (default: SEARCH_INDEX_PATH or the cache directory)")
+    parser.add_argument("--stats", action="store_true", help="Show index size")
+    args = parser.parse_args()
+    load_env()   # SEARCH_INDEX_PATH / LLM_CACHE_DIR may come from .env
+
+    # With --paths, stdout carries only the paths so it can be used in $(...)
+    log = sys.stderr if args.paths else sys.stdout
+    index = SearchIndex(args.index)
+
+    folders = [(f, "jd") for f in args.jd_folder] + [(f, "profile") for f in args.profiles_folder]
+    for folder, kind in folders:
+        started = time.perf_counter()
+        s = index.sync(folder, kind)
+        print(f"🗂️  {folder}: {s['added']} added, {s['updated']} updated, {s['removed']} removed, "
+              f"{s['unchanged']} unchanged ({time.perf_counter() - started:.2f}s)", file=log)
+
+    if args.stats:
+        s = index.stats()
+        print(f"📊 {s['docs']} documents {s['by_kind']}, {s['terms']:,} terms, "
+              f"{s['size_bytes'] / 1024:.0f} KB at {s['path']}", file=log)
+    if not args.query:
+        if not (args.update or args.stats or folders):
+            parser.error("give --query, or folders with --update")
+        return
+
+    started = time.perf_counter()
+    hits = index.search(args.query, kind=args.kind, folders=[f for f, _ in folders] or None,
+                        limit=args.top, any_terms=args.any)
+    elapsed = time.perf_counter() - started
+
+    if args.paths:
+        for hit in hits:
+            print(hit["path"])
+    else:
+        print_hits(hits, args.query, elapsed)
+    if args.link_dir:
+        linked = link_hits(hits, args.link_dir)
+        print(f"🔗 Linked {linked} files into {args.link_dir}", file=log)
+
+
+if __name__ == "__main__":
+    main()
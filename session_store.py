@@ -0,0 +1,166 @@
+"""
+Chat Session Store
+==================
+Server-side conversation history for the web UI, so each /api/chat request
+carries only the new user message and a session id instead of the system
+prompt plus the whole history.
+
+- Bounded: at most SESSION_MAX sessions (least recently used evicted first)
+- Idle eviction: sessions unused for SESSION_IDLE_MINUTES are dropped
+- Per-session cap: system prompt + history is kept under SESSION_MAX_CHARS by
+  dropping the oldest turns first (the latest exchange is always kept)
+- One turn at a time per session; a second concurrent message is rejected
+
+Configuration (environment variables):
+    SESSION_MAX            sessions kept in memory (default: 1000)
+    SESSION_IDLE_MINUTES   idle time before a session is evicted (default: 60)
+    SESSION_MAX_CHARS      history budget per session, in characters (default: 64000)
+"""
+
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+# A turn still "busy" after this long lost its client before the reply was recorded
+BUSY_TIMEOUT = 600
+
+
+class SessionNotFound(KeyError):
+    """Unknown id, or the session was evicted; the client should create a new one"""
+
+
+class SessionBusy(RuntimeError):
+    """The session is still answering its previous message"""
+
+
+class Session:
+    def __init__(self, session_id: str, agent: str, system: str):
+        self.id = session_id
+        self.agent = agent
+        self.system = system
+        self.turns = []          # user / assistant messages after the system prompt
+        self.chars = len(system)
+        self.trimmed = 0         # messages dropped to stay under the budget
+        self.busy = False
+        self.busy_since = 0.0
+        self.last_used = time.monotonic()
+
+    def messages(self, extra: list = None) -> list:
+        msgs = [{"role": "system", "content": self.system}] if self.system else []
+        return msgs + self.turns + (extra or [])
+
+    def _append(self, role: str, content: str):
+        self.turns.append({"role": role, "content": content})
+        self.chars += len(content)
+
+    def _trim(self, max_chars: int):
+        # Drop whole exchanges from the front so the history never starts with an assistant reply
+        while self.chars > max_chars and len(self.turns) > 2:
+            drop = 2 if len(self.turns) > 3 and self.turns[1]["role"] == "assistant" else 1
+            for message in self.turns[:drop]:
+                self.chars -= len(message["content"])
+            del self.turns[:drop]
+            self.trimmed += drop
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int = 1000, idle_seconds: float = 3600, max_chars: int = 64000):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.max_chars = max_chars
+        self._sessions = OrderedDict()   # id -> Session, least recently used first
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "evicted_idle": 0, "evicted_lru": 0, "trimmed_messages": 0}
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used > self.idle_seconds and not session.busy:
+                self._stats["evicted_idle"] += 1
+            elif len(self._sessions) > self.max_sessions:
+                self._stats["evicted_lru"] += 1
+            else:
+                break
+            self._sessions.popitem(last=False)
+
+    def create(self, agent: str = "", system: str = "", history: list = None) -> Session:
+        """New session; `history` seeds it (e.g. when re-creating an evicted one)"""
+        if len(system) > self.max_chars:
+            raise ValueError(f"System prompt exceeds the {self.max_chars}-character session budget")
+        session = Session(secrets.token_urlsafe(16), agent, system)
+        for message in history or []:
+            if isinstance(message, dict) and message.get("role") in ("user", "assistant") \
+                    and isinstance(message.get("content"), str):
+                session._append(message["role"], message["content"])
+        session._trim(self.max_chars)
+        with self._lock:
+            self._sessions[session.id] = session
+            self._stats["created"] += 1
+            self._stats["trimmed_messages"] += session.trimmed
+            self._evict()
+        return session
+
+    def get(self, session_id: str) -> Session:
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise SessionNotFound(session_id)
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def begin_turn(self, session_id: str, content: str):
+        """Reserve the session for one exchange; returns (session, messages to send upstream)"""
+        session = self.get(session_id)
+        with self._lock:
+            if session.busy and time.monotonic() - session.busy_since < BUSY_TIMEOUT:
+                raise SessionBusy("This session is still answering the previous message")
+            session.busy = True
+            session.busy_since = time.monotonic()
+        return session, session.messages([{"role": "user", "content": content}])
+
+    def end_turn(self, session: Session, content: str, reply: str = None):
+        """Record the exchange and release the session; a failed turn (no reply) is not recorded,
+        so the client can simply resend the message"""
+        with self._lock:
+            if reply is not None:
+                before = session.trimmed
+                session._append("user", content)
+                session._append("assistant", reply)
+                session._trim(self.max_chars)
+                self._stats["trimmed_messages"] += session.trimmed - before
+            session.busy = False
+            session.last_used = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["active"] = len(self._sessions)
+            stats["history_chars"] = sum(s.chars for s in self._sessions.values())
+        stats["max_sessions"] = self.max_sessions
+        return stats
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    """Process-wide store, configured from the environment on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(
+                max_sessions=int(os.environ.get("SESSION_MAX", 1000)),
+                idle_seconds=float(os.environ.get("SESSION_IDLE_MINUTES", 60)) * 60,
+                max_chars=int(os.environ.get("SESSION_MAX_CHARS", 64000)),
+            )
+        return _store
@@ -0,0 +1,255 @@
+"""
+Request Coalescing (singleflight)
+=================================
+Concurrent identical requests share one upstream call: the first caller for a
+key runs it, callers that arrive while it is still in flight wait for the same
+result (or exception). Once the call finishes the key is forgotten, so later
+requests go through as usual (and typically hit the LLM cache).
+
+- SingleFlight / AsyncSingleFlight: one result shared by every waiter
+- StreamFlight / AsyncStreamFlight: one upstream stream fanned out to every
+  subscriber; late joiners first replay the deltas already received. The
+  upstream is closed only when the last subscriber goes away.
+
+The proxies key requests by `flight_key(...)` (model, messages, max_tokens,
+temperature, streaming or not).
+
+Configuration (environment variables):
+    CHAT_COALESCE_DISABLE   set to 1 to send every request upstream on its own
+"""
+
+import asyncio
+import os
+import threading
+
+from llm_cache import cache_key
+
+_stats_lock = threading.Lock()
+_stats = {"leaders": 0, "coalesced": 0}
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def coalescing_enabled() -> bool:
+    return os.environ.get("CHAT_COALESCE_DISABLE", "").lower() not in ("1", "true", "yes")
+
+
+def flight_key(model: str, messages: list, max_tokens=None, temperature=None, stream: bool = False) -> str:
+    return ("stream:" if stream else "call:") + cache_key(model, messages, max_tokens, temperature)
+
+
+def coalescing_stats() -> dict:
+    """leaders: upstream calls made; coalesced: requests that joined one instead"""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats["leaders"] + stats["coalesced"]
+    stats["coalesce_rate"] = round(stats["coalesced"] / total, 3) if total else 0.0
+    return stats
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn):
+        """fn() once per key at a time; every concurrent caller gets its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            _count("coalesced")
+            call.done.wait()
+        else:
+            _count("leaders")
+            try:
+                call.result = fn()
+            except Exception as exc:
+                call.error = exc
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class _Broadcast:
+    def __init__(self, source):
+        self.source = source
+        self.items = []
+        self.finished = False
+        self.error = None
+        self.fetching = False
+        self.subscribers = 0
+        self.cond = threading.Condition()
+
+
+class StreamFlight:
+    """Fans one generator out to concurrent subscribers, without a driver thread.
+
+    Whichever subscriber reaches the end of the shared buffer first pulls the
+    next item from the upstream; the others wait for it, so a slow reader never
+    holds the rest back.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def stream(self, key: str, make_source):
+        """Yield the items of make_source(), shared with concurrent callers of the same key"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                _count("leaders")
+                flight = self._flights[key] = _Broadcast(make_source())
+            else:
+                _count("coalesced")
+            with flight.cond:
+                flight.subscribers += 1
+        try:
+            yield from self._read(key, flight)
+        finally:
+            with self._lock, flight.cond:
+                flight.subscribers -= 1
+                abandoned = flight.subscribers == 0 and not flight.finished
+                if abandoned:
+                    # Last reader left early: new requests for this key start afresh
+                    self._flights.pop(key, None)
+                    flight.finished = True
+            if abandoned:
+                flight.source.close()
+
+    def _read(self, key: str, flight: _Broadcast):
+        index = 0
+        while True:
+            with flight.cond:
+                while index >= len(flight.items) and not flight.finished and flight.fetching:
+                    flight.cond.wait()
+                if index < len(flight.items):
+                    item = flight.items[index]
+                    index += 1
+                elif flight.finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                else:
+                    flight.fetching = True
+                    item = None
+            if item is not None:
+                yield item
+                continue
+
+            finished, error = False, None
+            try:
+                item = next(flight.source)
+            except StopIteration:
+                finished = True
+            except Exception as exc:
+                finished, error = True, exc
+            with self._lock, flight.cond:
+                if finished:
+                    flight.finished, flight.error = True, error
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                else:
+                    flight.items.append(item)
+                flight.fetching = False
+                flight.cond.notify_all()
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines: the shared call keeps running while anyone still waits"""
+
+    def __init__(self):
+        self._tasks = {}     # key -> [task, waiters]
+
+    async def do(self, key: str, make_coro):
+        entry = self._tasks.get(key)
+        if entry is None:
+            _count("leaders")
+            entry = self._tasks[key] = [asyncio.ensure_future(make_coro()), 0]
+            entry[0].add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            _count("coalesced")
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                task.cancel()   # every waiter went away
+
+
+class _AsyncBroadcast:
+    def __init__(self):
+        self.items = []
+        self.finished = False
+        self.error = None
+        self.subscribers = 0
+        self.changed = asyncio.Event()
+        self.task = None
+
+
+class AsyncStreamFlight:
+    """StreamFlight for async generators; one driver task per shared stream"""
+
+    def __init__(self):
+        self._flights = {}
+
+    async def stream(self, key: str, make_source):
+        flight = self._flights.get(key)
+        if flight is None:
+            _count("leaders")
+            flight = self._flights[key] = _AsyncBroadcast()
+            flight.task = asyncio.ensure_future(self._drive(key, flight, make_source()))
+        else:
+            _count("coalesced")
+        flight.subscribers += 1
+        index = 0
+        try:
+            while True:
+                if index < len(flight.items):
+                    index += 1
+                    yield flight.items[index - 1]
+                elif flight.finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                else:
+                    flight.changed.clear()
+                    await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.finished:
+                self._flights.pop(key, None)
+                flight.task.cancel()
+
+    async def _drive(self, key: str, flight: _AsyncBroadcast, source):
+        try:
+            async for item in source:
+                flight.items.append(item)
+                flight.changed.set()
+        except Exception as exc:
+            flight.error = exc
+        finally:
+            await source.aclose()
+            flight.finished = True
+            flight.changed.set()
+            if self._flights.get(key) is flight:
+                del self._flights[key]
@@ -0,0 +1,43 @@
+"""
+JD Cleaner Tests
+================
+Regression tests for section headings in `jd_cleaner.clean_jd`.
+
+Usage:
+    python -m pytest -q test_jd_cleaner.py
+"""
+
+from jd_cleaner import _heading_section, clean_jd
+
+JD = """Senior SDET - Acme
+
+Who we are looking for
+- 5+ years with Selenium and Playwright
+- ISTQB certification
+
+About us
+Acme is a leading fintech building payments for millions of customers worldwide.
+
+Benefits & Perks
+- Health insurance and free meals
+
+We sponsor one AWS certification a year."""
+
+
+def test_looking_for_heading_keeps_requirements():
+    cleaned = clean_jd(JD)
+    for skill in ("Selenium", "Playwright", "ISTQB"):
+        assert skill in cleaned
+    assert "leading fintech" not in cleaned
+    assert "free meals" not in cleaned
+
+
+def test_drop_headings_match_whole_heading():
+    assert _heading_section("Who we are looking for") == "keep"
+    assert _heading_section("Who we are:") == "drop"
+    assert _heading_section("About the company") == "drop"
+    assert _heading_section("Why join Acme?") == "drop"
+
+
+def test_skills_in_a_drop_section_are_kept():
+    assert "AWS certification" in clean_jd(JD)
@@ -0,0 +1,75 @@
+"""
+Resume Model Tests
+==================
+Regression tests for wrapped bullets in `resume_model.parse_resume`.
+
+Usage:
+    python -m pytest -q test_resume_model.py
+"""
+
+from resume_model import parse_resume
+
+RESUME = """Jane Doe
+jane@example.com
+
+SUMMARY
+QA leader with 12 years in test automation.
+
+EXPERIENCE
+ACME CORP
+Senior Test Engineer, 2014 - 2019
+- Built a Selenium regression suite covering 1,200 checkout scenarios and
+  cut release testing from three days to four hours
+- Introduced contract testing between payment services
+* Led a team of five engineers across two time zones, mentoring juniors
+and running the weekly triage of flaky tests
+
+EDUCATION
+BSc Computer Science"""
+
+
+def test_wrapped_bullets_are_one_bullet():
+    model = parse_resume(RESUME)
+    texts = [bullet.text for bullet in model.bullets]
+    assert texts == [
+        "Built a Selenium regression suite covering 1,200 checkout scenarios and "
+        "cut release testing from three days to four hours",
+        "Introduced contract testing between payment services",
+        "Led a team of five engineers across two time zones, mentoring juniors "
+        "and running the weekly triage of flaky tests",
+    ]
+    first = model.bullets[0]
+    assert (first.line, first.end) == (9, 11)
+
+
+def test_splice_replaces_every_line_of_a_wrapped_bullet():
+    model = parse_resume(RESUME)
+    out = parse_resume(RESUME).splice({1: "Built a Playwright suite", 3: "Led five engineers"})
+    assert "- Built a Playwright suite\n- Introduced contract testing" in out
+    assert "* Led five engineers\n\nEDUCATION" in out
+    assert "cut release testing" not in out and "weekly triage" not in out
+    assert model.splice({}) == RESUME
+
+
+def test_role_lines_and_headings_are_not_continuations():
+    model = parse_resume(RESUME + "\n\nPROJECTS\n- Open-source test runner\nGLOBEX\nLead SDET, 2019 - 2024")
+    assert model.bullets[-1].text == "Open-source test runner"
+    assert [heading for heading, _, _ in model.sections][-1] == "projects"
+
+
+HEADER_RESUME = """Jane Doe
+SENIOR QA MANAGER
+jane@example.com | +91 98765 43210 | linkedin.com/in/janedoe
+
+EXPERIENCE
+- Built a Selenium regression suite covering 1,200 checkout scenarios
+- Contact: jane.doe@example.com for references on the payments platform work"""
+
+
+def test_title_and_contact_lines_stay_in_the_header():
+    model = parse_resume(HEADER_RESUME)
+    assert [heading for heading, _, _ in model.sections] == ["header", "experience"]
+    assert [bullet.text for bullet in model.bullets] == [
+        "Built a Selenium regression suite covering 1,200 checkout scenarios"]
+    out = model.splice({1: "Built a Playwright suite"})
+    assert out.splitlines()[:3] == HEADER_RESUME.splitlines()[:3]
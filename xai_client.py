@@ -0,0 +1,211 @@
+"""
+xAI Client Factory
+==================
+One pooled, keep-alive OpenAI-compatible client shared by every agent and the
+Flask proxy, so repeated calls reuse open HTTP connections instead of paying
+a new TCP + TLS handshake each time.
+
+Configuration (environment variables):
+    XAI_API_KEY               API key (required for real calls)
+    XAI_BASE_URL              OpenAI-compatible endpoint (default: https://api.x.ai/v1;
+                              e.g. http://127.0.0.1:8099/v1 for mock_server.py)
+    XAI_MAX_CONNECTIONS       connection pool size (default: 20)
+    XAI_KEEPALIVE_CONNECTIONS idle connections kept open (default: 20)
+    XAI_KEEPALIVE_EXPIRY      seconds an idle connection stays open (default: 60)
+    XAI_HTTP2                 1/0 to force HTTP/2 on/off (default: on if `h2` is installed)
+    XAI_TIMEOUT               read/write timeout in seconds (default: 120)
+    XAI_CONNECT_TIMEOUT       connect timeout in seconds (default: 10)
+    XAI_ASYNC_MAX_CONNECTIONS pool size of the async client (default: 256; one
+                              connection per in-flight call unless HTTP/2 is on)
+
+get_async_client() is the AsyncOpenAI counterpart used by the ASGI server;
+both clients feed the same connection_stats().
+
+Tests can inject a fake with set_client(fake) and undo it with reset_client().
+
+httpx, openai and python-dotenv are imported on first use, not at import
+time, so CLI --help and local-only commands start fast. `load_env()` reads
+.env once per process; get_client() calls it, and so do the agents' CLIs
+right after parsing their arguments.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+DEFAULT_BASE_URL = "https://api.x.ai/v1"
+
+
+def base_url() -> str:
+    return os.environ.get("XAI_BASE_URL") or DEFAULT_BASE_URL
+
+_client = None
+_async_client = None
+_env_loaded = False
+_client_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "new_connections": 0, "http2_requests": 0}
+
+
+def load_env():
+    """Load variables from .env (if present) into the environment, once per process"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+    _env_loaded = True
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _trace(event_name: str, info: dict):
+    """httpcore trace hook: a connect event means the pool had no reusable connection"""
+    if event_name == "connection.connect_tcp.complete":
+        _count("new_connections")
+    elif event_name == "http2.send_request_headers.started":
+        _count("http2_requests")
+
+
+def _on_request(request: httpx.Request):
+    _count("requests")
+    request.extensions["trace"] = _trace
+
+
+async def _atrace(event_name: str, info: dict):
+    _trace(event_name, info)
+
+
+async def _on_async_request(request: httpx.Request):
+    _count("requests")
+    request.extensions["trace"] = _atrace
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _limits(max_connections: int) -> httpx.Limits:
+    import httpx
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=int(os.environ.get("XAI_KEEPALIVE_CONNECTIONS", 20)),
+        keepalive_expiry=float(os.environ.get("XAI_KEEPALIVE_EXPIRY", 60)),
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    import httpx
+    return httpx.Timeout(
+        float(os.environ.get("XAI_TIMEOUT", 120)),
+        connect=float(os.environ.get("XAI_CONNECT_TIMEOUT", 10)),
+    )
+
+
+def build_http_client() -> httpx.Client:
+    import httpx
+    return httpx.Client(
+        limits=_limits(int(os.environ.get("XAI_MAX_CONNECTIONS", 20))),
+        timeout=_timeout(),
+        http2=_env_bool("XAI_HTTP2", http2_available()) and http2_available(),
+        event_hooks={"request": [_on_request]},
+    )
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    import httpx
+    return httpx.AsyncClient(
+        limits=_limits(int(os.environ.get("XAI_ASYNC_MAX_CONNECTIONS", 256))),
+        timeout=_timeout(),
+        http2=_env_bool("XAI_HTTP2", http2_available()) and http2_available(),
+        event_hooks={"request": [_on_async_request]},
+    )
+
+
+def get_client() -> OpenAI:
+    """Process-wide shared client (created on first use)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+            load_env()
+            _client = OpenAI(
+                api_key=os.environ.get("XAI_API_KEY"),
+                base_url=base_url(),
+                http_client=build_http_client(),
+                max_retries=0,   # retries are handled by resilience.py
+            )
+        return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+    """Shared async client; create and use it from a single event loop"""
+    global _async_client
+    with _client_lock:
+        if _async_client is None:
+            from openai import AsyncOpenAI
+            load_env()
+            _async_client = AsyncOpenAI(
+                api_key=os.environ.get("XAI_API_KEY"),
+                base_url=base_url(),
+                http_client=build_async_http_client(),
+                max_retries=0,
+            )
+        return _async_client
+
+
+async def close_async_client():
+    global _async_client
+    with _client_lock:
+        client, _async_client = _async_client, None
+    if client is not None and hasattr(client, "close"):
+        await client.close()
+
+
+def set_client(client):
+    """Inject a client (e.g. a fake for tests) for every later get_client() call"""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def reset_client():
+    """Close the shared client; the next get_client() builds a fresh one"""
+    global _client
+    with _client_lock:
+        if _client is not None and hasattr(_client, "close"):
+            _client.close()
+        _client = None
+
+
+def connection_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["reused_connections"] = max(0, stats["requests"] - stats["new_connections"])
+    stats["reuse_rate"] = round(stats["reused_connections"] / stats["requests"], 3) if stats["requests"] else 0.0
+    return stats
+
+
+def print_connection_stats():
+    s = connection_stats()
+    if not s["requests"]:
+        return
+    print(f"🔌 xAI connections: {s['requests']} requests over {s['new_connections']} new connections "
+          f"({s['reuse_rate']:.0%} reused, {s['http2_requests']} via HTTP/2)")